@@ -1,30 +1,43 @@
 # app/api/v1/analytics.py
-from fastapi import APIRouter, Query
+from typing import Optional
+
+from fastapi import APIRouter, Depends, Query
+from app.core.content_negotiation import BINARY_RESPONSES, JSON, negotiate, rows_response
 from app.services.analytics_service import AnalyticsService
 
 router = APIRouter(prefix="/analytics", tags=["Analytics"])
 
 analytics_service = AnalyticsService()
 
-@router.get("/gpa", summary="Average GPA per course")
-def average_gpa():
+SEMESTER = Query(None, description="Only this semester's enrollments (default: all)")
+
+
+def _respond(fmt: str, result):
+    # reports are cached as plain rows, so binary formats encode them as they are
+    return result if fmt == JSON else rows_response(fmt, result)
+
+
+@router.get("/gpa", summary="Average GPA per course", responses=BINARY_RESPONSES)
+def average_gpa(semester: Optional[str] = SEMESTER, fmt: str = Depends(negotiate)):
     """
-    Returns average GPA per course from MongoDB.
+    Returns average GPA per course (MongoDB or SQL, see ANALYTICS_BACKEND).
     """
-    return analytics_service.get_average_gpa()
+    return _respond(fmt, analytics_service.get_average_gpa(semester))
 
 
-@router.get("/top-students", summary="Top students by GPA")
-def top_students(limit: int = Query(5, ge=1, le=50)):
+@router.get("/top-students", summary="Top students by GPA", responses=BINARY_RESPONSES)
+def top_students(
+    limit: int = Query(5, ge=1, le=50), semester: Optional[str] = SEMESTER, fmt: str = Depends(negotiate),
+):
     """
     Returns the top students based on GPA.
     """
-    return analytics_service.get_top_students(limit)
+    return _respond(fmt, analytics_service.get_top_students(limit, semester))
 
 
-@router.get("/enrollments", summary="Course enrollment count")
-def course_enrollments():
+@router.get("/enrollments", summary="Course enrollment count", responses=BINARY_RESPONSES)
+def course_enrollments(semester: Optional[str] = SEMESTER, fmt: str = Depends(negotiate)):
     """
     Returns how many students enrolled in each course.
     """
-    return analytics_service.get_course_enrollments()
+    return _respond(fmt, analytics_service.get_course_enrollments(semester))
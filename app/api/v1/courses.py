@@ -1,16 +1,33 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from typing import Any, Dict, List, Optional
+
+from fastapi import APIRouter, Body, Depends, HTTPException, Query, status
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from app.db.sql_db import get_db
-from app.models.pydantic import CourseCreate, CourseOut, CourseUpdate
+from app.db.async_db import get_async_db, get_async_read_db
+from app.db.sql_db import get_db, get_read_db
+from app.config import settings
+from app.models.pydantic import BulkResult, CourseCreate, CourseOut, CourseUpdate, Page
+from app.models.sqlalchemy_models import Course
+from app.services.async_services import AsyncCourseService
+from app.services.bulk_service import BulkService
 from app.services.course_service import CourseService
 from app.core.security import role_required
+from app.core.content_negotiation import BINARY_RESPONSES, JSON, negotiate, page_response
 
 router = APIRouter(prefix="/courses", tags=["Courses"])
 
-# 🔍 Public route
-@router.get("/", response_model=list[CourseOut])
-def get_courses(db: Session = Depends(get_db)):
-    return CourseService(db).get_all_courses()
+# 🔍 Public route. Sync on purpose: a cold catalog page makes concurrent callers
+# wait for one computation (result_cache), which must block a threadpool slot, not the event loop.
+@router.get("/", response_model=Page[CourseOut], responses=BINARY_RESPONSES)
+def get_courses(
+    limit: int = Query(settings.PAGE_SIZE_DEFAULT, ge=1, le=settings.PAGE_SIZE_MAX),
+    after: Optional[str] = None,
+    fmt: str = Depends(negotiate),
+    db: Session = Depends(get_read_db),
+):
+    if fmt != JSON:
+        return page_response(fmt, CourseService(db).get_courses_rows(limit, after), Course.__table__)
+    return CourseService(db).get_courses_page(limit, after)
 
 # ➕ Admin-only: Create
 @router.post(
@@ -19,8 +36,22 @@ def get_courses(db: Session = Depends(get_db)):
     status_code=status.HTTP_201_CREATED,
     dependencies=[Depends(role_required(["admin"]))],
 )
-def create_course(payload: CourseCreate, db: Session = Depends(get_db)):
-    return CourseService(db).create_course(payload)
+async def create_course(payload: CourseCreate, db: AsyncSession = Depends(get_async_db)):
+    return await AsyncCourseService(db).create_course(payload)
+
+# 📥 Admin-only: Bulk create
+@router.post(
+    "/bulk",
+    response_model=BulkResult,
+    dependencies=[Depends(role_required(["admin"]))],
+)
+def bulk_create_courses(rows: List[Dict[str, Any]] = Body(...), db: Session = Depends(get_db)):
+    return BulkService(db, "courses").create_many(rows)
+
+# 🔍 Public route: one course (served from the entity cache)
+@router.get("/{course_id}", response_model=CourseOut)
+async def get_course(course_id: int, db: AsyncSession = Depends(get_async_read_db)):
+    return await AsyncCourseService(db).get_course_by_id(course_id)
 
 # ✏️ Admin-only: Update
 @router.put(
@@ -28,13 +59,13 @@ def create_course(payload: CourseCreate, db: Session = Depends(get_db)):
     response_model=CourseOut,
     dependencies=[Depends(role_required(["admin"]))],
 )
-def update_course(course_id: int, payload: CourseUpdate, db: Session = Depends(get_db)):
-    return CourseService(db).update_course(course_id, payload)
+async def update_course(course_id: int, payload: CourseUpdate, db: AsyncSession = Depends(get_async_db)):
+    return await AsyncCourseService(db).update_course(course_id, payload)
 
 # ❌ Admin-only: Delete
 @router.delete(
     "/{course_id}",
     dependencies=[Depends(role_required(["admin"]))],
 )
-def delete_course(course_id: int, db: Session = Depends(get_db)):
-    return CourseService(db).delete_course(course_id)
+async def delete_course(course_id: int, db: AsyncSession = Depends(get_async_db)):
+    return await AsyncCourseService(db).delete_course(course_id)
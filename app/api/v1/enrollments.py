@@ -1,37 +1,87 @@
 # app/api/v1/enrollments.py
-from fastapi import APIRouter, Depends, status
+from typing import Any, Dict, List, Optional
+
+from fastapi import APIRouter, Body, Depends, File, HTTPException, Query, UploadFile, status
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
+from app.db.async_db import get_async_db, get_async_read_db
 from app.db.sql_db import get_db
-from app.models.pydantic import EnrollmentCreate, EnrollmentOut, EnrollmentUpdate
-from app.services.enrollment_service import EnrollmentService
+from app.config import settings
+from app.models.pydantic import (
+    BulkResult, EnrollmentCreate, EnrollmentOut, EnrollmentUpdate, GradeImportResult, Page,
+)
+from app.models.sqlalchemy_models import Enrollment
+from app.services.async_services import AsyncEnrollmentService
+from app.services.bulk_service import BulkService
+from app.services.grade_import_service import GradeImportService
 from app.core.security import role_required
+from app.core.content_negotiation import BINARY_RESPONSES, JSON, negotiate, page_response
 
 router = APIRouter(prefix="/enrollments", tags=["Enrollments"])
 
-def get_service(db: Session = Depends(get_db)):
-    return EnrollmentService(db)
+async def get_service(db: AsyncSession = Depends(get_async_db)):
+    return AsyncEnrollmentService(db)
+
+async def get_read_service(db: AsyncSession = Depends(get_async_read_db)):
+    return AsyncEnrollmentService(db)
 
 # Public: list enrollments (or protect as you prefer)
-@router.get("/", response_model=list[EnrollmentOut])
-def list_enrollments(service: EnrollmentService = Depends(get_service)):
-    return service.list_enrollments()
+@router.get("/", response_model=Page[EnrollmentOut], responses=BINARY_RESPONSES)
+async def list_enrollments(
+    limit: int = Query(settings.PAGE_SIZE_DEFAULT, ge=1, le=settings.PAGE_SIZE_MAX),
+    after: Optional[str] = None,
+    fmt: str = Depends(negotiate),
+    service: AsyncEnrollmentService = Depends(get_read_service),
+):
+    if fmt != JSON:
+        return page_response(fmt, await service.list_enrollment_rows(limit, after), Enrollment.__table__)
+    return await service.list_enrollments(limit, after)
 
 # Create enrollment (admins/lecturers may be required depending on policy)
 @router.post("/", response_model=EnrollmentOut, status_code=status.HTTP_201_CREATED)
-def create_enrollment(payload: EnrollmentCreate, service: EnrollmentService = Depends(get_service)):
-    return service.create_enrollment(payload)
+async def create_enrollment(payload: EnrollmentCreate, service: AsyncEnrollmentService = Depends(get_service)):
+    return await service.create_enrollment(payload)
+
+# Bulk create (admin only): term-start loads, one transaction, per-row results
+@router.post("/bulk", response_model=BulkResult, dependencies=[Depends(role_required(["admin"]))])
+def bulk_create_enrollments(rows: List[Dict[str, Any]] = Body(...), db: Session = Depends(get_db)):
+    return BulkService(db, "enrollments").create_many(rows)
+
+# Grade upload for a whole class (admin/lecturer): CSV or NDJSON file,
+# rows keyed by student_id + course_id or student_email + course_code
+@router.post(
+    "/grades/import",
+    response_model=GradeImportResult,
+    dependencies=[Depends(role_required(["admin", "lecturer"]))],
+)
+def import_grades(
+    file: UploadFile = File(...),
+    format: Optional[str] = Query(None, pattern="^(csv|ndjson)$"),
+    create_missing: bool = Query(False, description="Enroll students that are not enrolled yet"),
+    db: Session = Depends(get_db),
+):
+    fmt = format or _import_format(file)
+    return GradeImportService(db).import_file(file.file, fmt, create_missing)
+
+def _import_format(file: UploadFile) -> str:
+    name = (file.filename or "").lower()
+    if name.endswith((".ndjson", ".jsonl")) or "ndjson" in (file.content_type or ""):
+        return "ndjson"
+    if name.endswith(".csv") or "csv" in (file.content_type or ""):
+        return "csv"
+    raise HTTPException(status_code=400, detail="Pass ?format=csv|ndjson or upload a .csv / .ndjson file")
 
 # Get single
 @router.get("/{enr_id}", response_model=EnrollmentOut)
-def get_enrollment(enr_id: int, service: EnrollmentService = Depends(get_service)):
-    return service.get_enrollment(enr_id)
+async def get_enrollment(enr_id: int, service: AsyncEnrollmentService = Depends(get_read_service)):
+    return await service.get_enrollment(enr_id)
 
 # Update (grade / semester) - default admin/lecturer only; change decorator to allow others
 @router.put("/{enr_id}", response_model=EnrollmentOut, dependencies=[Depends(role_required(["admin", "lecturer"]))])
-def update_enrollment(enr_id: int, payload: EnrollmentUpdate, service: EnrollmentService = Depends(get_service)):
-    return service.update_enrollment(enr_id, payload)
+async def update_enrollment(enr_id: int, payload: EnrollmentUpdate, service: AsyncEnrollmentService = Depends(get_service)):
+    return await service.update_enrollment(enr_id, payload)
 
 # Delete (admin only)
 @router.delete("/{enr_id}", dependencies=[Depends(role_required(["admin"]))])
-def delete_enrollment(enr_id: int, service: EnrollmentService = Depends(get_service)):
-    return service.delete_enrollment(enr_id)
+async def delete_enrollment(enr_id: int, service: AsyncEnrollmentService = Depends(get_service)):
+    return await service.delete_enrollment(enr_id)
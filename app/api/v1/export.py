@@ -0,0 +1,90 @@
+# app/api/v1/export.py
+from typing import Optional
+
+from fastapi import APIRouter, Depends, Header, Query
+from fastapi.responses import StreamingResponse
+
+from app.core.security import role_required
+from app.services.export_service import ExportService
+from app.services.snapshot_service import byte_range, iter_range, snapshot_job, snapshot_store
+
+router = APIRouter(prefix="/export", tags=["Export"])
+
+
+# --------------------------------------------------------
+# 🧊 Columnar snapshots (Admin only)
+# Registered before /{entity}, which would otherwise match "snapshot".
+# --------------------------------------------------------
+@router.get(
+    "/snapshot",
+    summary="Manifest of the latest Parquet / Arrow snapshot",
+    dependencies=[Depends(role_required(["admin"]))],
+)
+def snapshot_manifest(version: Optional[str] = Query(None, description="Default: the latest")):
+    """
+    Tables, row counts and files of a snapshot version; download each file
+    from /export/snapshot/{version}/{name}.
+    """
+    return snapshot_store.manifest(version)
+
+
+@router.post(
+    "/snapshot",
+    status_code=202,
+    summary="Build a new snapshot in the background",
+    dependencies=[Depends(role_required(["admin"]))],
+)
+def build_snapshot():
+    started = snapshot_job.build_in_background()
+    return {"status": "started" if started else "already running"}
+
+
+@router.get(
+    "/snapshot/{version}/{filename}",
+    summary="Download a snapshot file (supports Range requests)",
+    dependencies=[Depends(role_required(["admin"]))],
+)
+def download_snapshot(version: str, filename: str, range_header: Optional[str] = Header(None, alias="Range")):
+    """
+    Served from a read-only memory map of the published file. A single
+    `Range: bytes=...` gets 206 with that slice, so interrupted downloads
+    resume and Arrow / Parquet readers can fetch just the footer and the
+    columns they need.
+    """
+    mapped, media_type = snapshot_store.open(version, filename)
+    size = len(mapped)
+    headers = {
+        "Accept-Ranges": "bytes",
+        "ETag": f'"{version}-{filename}"',
+        "Cache-Control": "private, max-age=31536000, immutable",   # versions never change
+        "Content-Disposition": f'attachment; filename="{filename}"',
+    }
+    window = byte_range(range_header, size)
+    if window is None:
+        start, end, status = 0, size - 1, 200
+    else:
+        (start, end), status = window, 206
+        headers["Content-Range"] = f"bytes {start}-{end}/{size}"
+    headers["Content-Length"] = str(end - start + 1)
+    return StreamingResponse(iter_range(mapped, start, end), status_code=status, media_type=media_type, headers=headers)
+
+
+# --------------------------------------------------------
+# 📤 Full-table export for Power BI (Admin only)
+# --------------------------------------------------------
+@router.get(
+    "/{entity}",
+    summary="Stream a full table as NDJSON or CSV",
+    dependencies=[Depends(role_required(["admin"]))],
+)
+def export_entity(entity: str, format: str = Query("ndjson", pattern="^(ndjson|csv)$")):
+    """
+    Streams every row of `students`, `courses`, `lecturers` or `enrollments`.
+    Rows are fetched and written in chunks, so large tables never sit in memory.
+    """
+    exporter = ExportService(entity, format)
+    return StreamingResponse(
+        exporter.stream(),
+        media_type=exporter.media_type,
+        headers={"Content-Disposition": f'attachment; filename="{exporter.filename}"'},
+    )
@@ -1,9 +1,17 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from typing import Any, Dict, List, Optional
+
+from fastapi import APIRouter, Body, Depends, HTTPException, Query, status
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
+from app.db.async_db import get_async_db, get_async_read_db
 from app.db.sql_db import get_db
 from app.core.security import role_required
-from app.services.lecturer_service import LecturerService
-from app.models.pydantic import LecturerCreate, LecturerUpdate, LecturerOut
+from app.core.content_negotiation import BINARY_RESPONSES, JSON, negotiate, page_response
+from app.services.async_services import AsyncLecturerService
+from app.services.bulk_service import BulkService
+from app.config import settings
+from app.models.pydantic import BulkResult, LecturerCreate, LecturerUpdate, LecturerOut, Page
+from app.models.sqlalchemy_models import Lecturer
 
 router = APIRouter(prefix="/lecturers", tags=["Lecturers"])
 
@@ -17,8 +25,20 @@ router = APIRouter(prefix="/lecturers", tags=["Lecturers"])
     status_code=status.HTTP_201_CREATED,
     response_model=LecturerOut
 )
-def create_lecturer(payload: LecturerCreate, db: Session = Depends(get_db)):
-    return LecturerService(db).create_lecturer(payload)
+async def create_lecturer(payload: LecturerCreate, db: AsyncSession = Depends(get_async_db)):
+    return await AsyncLecturerService(db).create_lecturer(payload)
+
+
+# --------------------------------------------------------
+# 📥 Bulk create Lecturers (Admin only)
+# --------------------------------------------------------
+@router.post(
+    "/bulk",
+    dependencies=[Depends(role_required(["admin"]))],
+    response_model=BulkResult
+)
+def bulk_create_lecturers(rows: List[Dict[str, Any]] = Body(...), db: Session = Depends(get_db)):
+    return BulkService(db, "lecturers").create_many(rows)
 
 
 # --------------------------------------------------------
@@ -29,24 +49,31 @@ def create_lecturer(payload: LecturerCreate, db: Session = Depends(get_db)):
     dependencies=[Depends(role_required(["admin"]))],
     response_model=LecturerOut
 )
-def update_lecturer(lecturer_id: int, payload: LecturerUpdate, db: Session = Depends(get_db)):
-    return LecturerService(db).update_lecturer(lecturer_id, payload)
+async def update_lecturer(lecturer_id: int, payload: LecturerUpdate, db: AsyncSession = Depends(get_async_db)):
+    return await AsyncLecturerService(db).update_lecturer(lecturer_id, payload)
 
 
 # --------------------------------------------------------
-# 📖 Get all lecturers (Public)
+# 📖 Get lecturers, one page at a time (Public)
 # --------------------------------------------------------
-@router.get("/", response_model=list[LecturerOut])
-def get_all_lecturers(db: Session = Depends(get_db)):
-    return LecturerService(db).get_all_lecturers()
+@router.get("/", response_model=Page[LecturerOut], responses=BINARY_RESPONSES)
+async def get_all_lecturers(
+    limit: int = Query(settings.PAGE_SIZE_DEFAULT, ge=1, le=settings.PAGE_SIZE_MAX),
+    after: Optional[str] = None,
+    fmt: str = Depends(negotiate),
+    db: AsyncSession = Depends(get_async_read_db),
+):
+    if fmt != JSON:
+        return page_response(fmt, await AsyncLecturerService(db).get_lecturers_rows(limit, after), Lecturer.__table__)
+    return await AsyncLecturerService(db).get_lecturers_page(limit, after)
 
 
 # --------------------------------------------------------
 # 🔍 Get Lecturer by ID (Public)
 # --------------------------------------------------------
 @router.get("/{lecturer_id}", response_model=LecturerOut)
-def get_lecturer(lecturer_id: int, db: Session = Depends(get_db)):
-    return LecturerService(db).get_lecturer_by_id(lecturer_id)
+async def get_lecturer(lecturer_id: int, db: AsyncSession = Depends(get_async_read_db)):
+    return await AsyncLecturerService(db).get_lecturer_by_id(lecturer_id)
 
 
 # --------------------------------------------------------
@@ -56,5 +83,5 @@ def get_lecturer(lecturer_id: int, db: Session = Depends(get_db)):
     "/{lecturer_id}",
     dependencies=[Depends(role_required(["admin"]))],
 )
-def delete_lecturer(lecturer_id: int, db: Session = Depends(get_db)):
-    return LecturerService(db).delete_lecturer(lecturer_id)
+async def delete_lecturer(lecturer_id: int, db: AsyncSession = Depends(get_async_db)):
+    return await AsyncLecturerService(db).delete_lecturer(lecturer_id)
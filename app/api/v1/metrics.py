@@ -0,0 +1,17 @@
+# app/api/v1/metrics.py
+from fastapi import APIRouter, Depends
+
+from app.core.security import role_required
+from app.services.entity_cache import entity_cache_stats
+from app.services.gpa_summary import student_gpa_cache
+from app.services.result_cache import result_cache_stats
+
+router = APIRouter(prefix="/metrics", tags=["Metrics"])
+
+
+# --------------------------------------------------------
+# 🗂 In-process cache counters (Admin only, per worker)
+# --------------------------------------------------------
+@router.get("/cache", summary="Hit / miss / eviction counters", dependencies=[Depends(role_required(["admin"]))])
+async def cache_metrics():
+    return {"entities": entity_cache_stats(), "student_gpa": student_gpa_cache.stats(), "results": result_cache_stats()}
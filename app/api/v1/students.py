@@ -1,12 +1,19 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from typing import Any, Dict, List, Optional
+
+from fastapi import APIRouter, Body, Depends, HTTPException, Query, status
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from app.db.sql_db import get_db
-from app.models.pydantic import StudentCreate, StudentOut, StudentUpdate
+from app.db.async_db import get_async_db, get_async_read_db
+from app.db.sql_db import get_db, get_read_db
+from app.config import settings
+from app.models.pydantic import BulkResult, Page, StudentCreate, StudentOut, StudentUpdate
 from app.models.sqlalchemy_models import Student
 from app.services.student_service import StudentService
+from app.services.async_services import AsyncStudentService
+from app.services.bulk_service import BulkService
 from app.core.security import get_current_user, role_required
+from app.core.content_negotiation import BINARY_RESPONSES, JSON, negotiate, page_response
 from app.repositories.student_repo import StudentRepository
-from app.repositories.mongo_repo import MongoRepository
 
 router = APIRouter(prefix="/students", tags=["Students"])
 
@@ -14,13 +21,22 @@ router = APIRouter(prefix="/students", tags=["Students"])
 # -----------------------------
 # 🧾  Get all students  (Admin/Lecturer)
 # -----------------------------
-@router.get("/", response_model=list[StudentOut],
+@router.get("/", response_model=Page[StudentOut], responses=BINARY_RESPONSES,
             dependencies=[Depends(role_required(["admin", "lecturer"]))])
-def get_students(db: Session = Depends(get_db)):
+async def get_students(
+    limit: int = Query(settings.PAGE_SIZE_DEFAULT, ge=1, le=settings.PAGE_SIZE_MAX),
+    after: Optional[str] = None,
+    fmt: str = Depends(negotiate),
+    db: AsyncSession = Depends(get_async_read_db),
+):
     """
-    Return all registered students (Admin or Lecturer only)
+    Return registered students one page at a time (Admin or Lecturer only).
+    Pass the returned `next_cursor` as `after` to fetch the next page.
+    Also served as MessagePack or Arrow (see Accept).
     """
-    return StudentService(db).get_all_students()
+    if fmt != JSON:
+        return page_response(fmt, await AsyncStudentService(db).get_students_rows(limit, after), Student.__table__)
+    return await AsyncStudentService(db).get_students_page(limit, after)
 
 
 # -----------------------------
@@ -28,11 +44,23 @@ def get_students(db: Session = Depends(get_db)):
 # -----------------------------
 @router.post("/", response_model=StudentOut,
              dependencies=[Depends(role_required(["admin"]))])
-def create_student(payload: StudentCreate, db: Session = Depends(get_db)):
+async def create_student(payload: StudentCreate, db: AsyncSession = Depends(get_async_db)):
     """
     Admin can create new student records.
     """
-    return StudentService(db).create_student(payload)
+    return await AsyncStudentService(db).create_student(payload)
+
+
+# -----------------------------
+# 📥  Bulk create students  (Admin only)
+# -----------------------------
+@router.post("/bulk", response_model=BulkResult,
+             dependencies=[Depends(role_required(["admin"]))])
+def bulk_create_students(rows: List[Dict[str, Any]] = Body(...), db: Session = Depends(get_db)):
+    """
+    Create many students in one transaction; each row is reported as created or rejected.
+    """
+    return BulkService(db, "students").create_many(rows)
 
 
 # -----------------------------
@@ -40,11 +68,11 @@ def create_student(payload: StudentCreate, db: Session = Depends(get_db)):
 # -----------------------------
 @router.get("/{student_id}", response_model=StudentOut,
             dependencies=[Depends(role_required(["admin", "lecturer"]))])
-def get_student(student_id: int, db: Session = Depends(get_db)):
+async def get_student(student_id: int, db: AsyncSession = Depends(get_async_read_db)):
     """
     Fetch one student record by ID (Admin or Lecturer only)
     """
-    result = StudentService(db).get_student_by_id(student_id)
+    result = await AsyncStudentService(db).get_student_by_id(student_id)
     if not result:
         raise HTTPException(status_code=404, detail="Student not found")
     return result
@@ -55,12 +83,12 @@ def get_student(student_id: int, db: Session = Depends(get_db)):
 # -----------------------------
 @router.put("/{student_id}",
             dependencies=[Depends(role_required(["admin"]))])
-def update_student(student_id: int, payload: StudentUpdate,
-                   db: Session = Depends(get_db)):
+async def update_student(student_id: int, payload: StudentUpdate,
+                         db: AsyncSession = Depends(get_async_db)):
     """
     Admin can edit student details by ID.
     """
-    updated = StudentService(db).update_student(student_id, payload)
+    updated = await AsyncStudentService(db).update_student(student_id, payload)
     if not updated:
         raise HTTPException(status_code=404, detail="Student not found")
     return {"message": "Student updated successfully"}
@@ -71,11 +99,11 @@ def update_student(student_id: int, payload: StudentUpdate,
 # -----------------------------
 @router.delete("/{student_id}",
                dependencies=[Depends(role_required(["admin"]))])
-def delete_student(student_id: int, db: Session = Depends(get_db)):
+async def delete_student(student_id: int, db: AsyncSession = Depends(get_async_db)):
     """
     Admin can delete a student record by ID.
     """
-    StudentService(db).delete_student(student_id)
+    await AsyncStudentService(db).delete_student(student_id)
     return {"message": "Student deleted successfully"}
 
 
@@ -83,7 +111,11 @@ def delete_student(student_id: int, db: Session = Depends(get_db)):
 # 🎓  Student self GPA view  (Student/Admin)
 # -----------------------------
 @router.get("/me/gpa")
-def my_gpa(current_user: dict = Depends(get_current_user)):
+def my_gpa(
+    username: Optional[str] = None,
+    current_user: dict = Depends(get_current_user),
+    db: Session = Depends(get_read_db),
+):
     """
     Student or Admin can view GPA.
     - Student: sees own GPA only.
@@ -92,11 +124,7 @@ def my_gpa(current_user: dict = Depends(get_current_user)):
     if current_user["role"] not in ["student", "admin"]:
         raise HTTPException(status_code=403, detail="Not authorized")
 
-    repo = MongoRepository()
-    username = current_user["username"]
-
-    gpa = repo.gpa_for_student(username)
-    if gpa is None:
-        raise HTTPException(status_code=404, detail="GPA record not found")
+    if current_user["role"] != "admin" or not username:
+        username = current_user["username"]
 
-    return {"student": username, "gpa": gpa}
+    return StudentService(db).get_student_gpa(username)
@@ -1,3 +1,5 @@
+from typing import Literal, Optional
+
 from pydantic_settings import BaseSettings
 
 
@@ -8,6 +10,26 @@ class Settings(BaseSettings):
 
     # 🗃 SQL Database
     SQLALCHEMY_DATABASE_URL: str
+    MIGRATE_ON_STARTUP: bool = False       # dev convenience; deploys run `python -m app.db.migrations`
+    QUERY_COUNT_HEADER: bool = False       # add X-Query-Count (SQL statements per request) to responses
+    # Async routes' driver URL; derived from SQLALCHEMY_DATABASE_URL (aiosqlite / asyncpg) when unset
+    ASYNC_SQLALCHEMY_DATABASE_URL: Optional[str] = None
+
+    # 📖 Read routing (GET routes, exports, SQL analytics)
+    SQLALCHEMY_READ_REPLICA_URLS: str = ""   # comma-separated; reads round-robin over them
+    SQLITE_READ_ONLY_READER: bool = True     # no replicas + SQLite file: read through the profile's reader pool
+    READ_YOUR_WRITES_SECONDS: float = 5.0    # a client's reads stay on the primary this long after it writes
+
+    # 🪶 SQLite profile (SQLite file databases only; see app/db/sqlite_profile.py)
+    SQLITE_PROFILE: bool = True
+    SQLITE_SYNCHRONOUS: Literal["OFF", "NORMAL", "FULL"] = "NORMAL"   # NORMAL is durable-enough under WAL
+    SQLITE_CACHE_SIZE_KB: int = 65536      # page cache per connection
+    SQLITE_MMAP_SIZE: int = 268435456      # bytes of the file read through mmap
+    SQLITE_BUSY_TIMEOUT_MS: int = 5000     # wait this long for a lock before "database is locked"
+    SQLITE_READER_POOL_SIZE: int = 8
+    SQLITE_WRITER_POOL_TIMEOUT: float = 30.0   # seconds a write waits for the single writer connection
+    SQLITE_CHECKPOINT_INTERVAL: float = 30.0   # background WAL checkpoint; 0 = SQLite's autocheckpoint
+    SQLITE_WAL_TRUNCATE_MB: int = 64       # truncate the WAL file once it grows past this
 
     # 🍃 MongoDB (Analytics DB)
     MONGO_URI: str
@@ -18,6 +40,77 @@ class Settings(BaseSettings):
     MONGO_COLLECTION_COURSES: str = "dimCourses"
     MONGO_COLLECTION_LECTURERS: str = "dimLecturers"
     MONGO_COLLECTION_FACTS: str = "factEnrollments"
+    MONGO_COLLECTION_COURSE_GPA: str = "courseGpaSummary"
+    MONGO_COLLECTION_STUDENT_GPA: str = "studentGpaSummary"
+    MONGO_ENSURE_INDEXES: bool = True     # create declared indexes on connect
+    MONGO_SERVER_SELECTION_TIMEOUT_MS: int = 7000
+
+    # 📊 Analytics engine: "mongo" (star schema), "sql" (GROUP BY over enrollments),
+    # "columnar" (in-process NumPy arrays), or "auto" (Mongo when connected, SQL otherwise)
+    ANALYTICS_BACKEND: Literal["auto", "mongo", "sql", "columnar"] = "auto"
+    COLUMNAR_SOURCE: Literal["sql", "mongo"] = "sql"   # where the columnar engine loads from
+    COLUMNAR_REFRESH_SECONDS: int = 0      # periodic reload; set > 0 when running several workers
+
+    # 🗄 Cache backend: "memory" (per process) or "shared" (mmap-ed file every worker on the host maps)
+    CACHE_BACKEND: Literal["memory", "shared"] = "memory"
+    SHARED_CACHE_DIR: Optional[str] = None   # default /dev/shm, else the temp dir
+
+    # 🧮 Precomputed results (analytics reports, course catalog pages)
+    RESULT_CACHE_SIZE: int = 256
+    RESULT_CACHE_TTL: float = 60.0
+    RESULT_CACHE_SLOT_BYTES: int = 262144  # shared backend: larger results are recomputed, not cached
+    ANALYTICS_CACHE_TTL: float = 15.0      # analytics reports are fresh this long (or until a write)
+    ANALYTICS_STALE_TTL: float = 300.0     # once expired, served stale this long while one refresh runs
+    RESULT_REFRESH_WORKERS: int = 2        # background refresh threads per worker
+    CLOSED_SEMESTERS: str = ""             # comma-separated; their reports are cached until a rename
+
+    # 🎓 /students/me/gpa LRU (also invalidated by enrollment writes; see CACHE_BACKEND)
+    STUDENT_GPA_CACHE_SIZE: int = 10000
+    STUDENT_GPA_CACHE_TTL: float = 30.0    # bounds staleness across workers
+
+    # 🗂 Entity cache (students / courses / lecturers by id and unique fields)
+    ENTITY_CACHE_SIZE: int = 50000
+    ENTITY_CACHE_TTL: float = 300.0        # bounds staleness across workers
+    ENTITY_CACHE_NEGATIVE_TTL: float = 5.0  # "not found" answers
+    ENTITY_CACHE_SLOT_BYTES: int = 512     # shared backend slot size
+
+    # 📄 Pagination (keyset cursors on list endpoints)
+    PAGE_SIZE_DEFAULT: int = 50
+    PAGE_SIZE_MAX: int = 500
+
+    # 📥 Bulk create (POST /{entity}/bulk)
+    BULK_MAX_ROWS: int = 50000
+    BULK_LOOKUP_CHUNK: int = 500           # values per IN (...) list; stays under SQLite's bind limit
+
+    # 📝 Grade import (POST /enrollments/grades/import)
+    GRADE_IMPORT_CHUNK: int = 500          # rows per lookup / upsert statement
+    GRADE_IMPORT_MAX_ERRORS: int = 1000    # rejected rows listed in the response (all are counted)
+
+    # 📤 Exports (rows fetched per round trip when streaming tables)
+    EXPORT_CHUNK_SIZE: int = 1000
+
+    # 🧊 Columnar snapshots (GET /export/snapshot; app/services/snapshot_service.py)
+    SNAPSHOT_DIR: str = "data/snapshots"
+    SNAPSHOT_FORMATS: str = "parquet,arrow"    # comma-separated: parquet, arrow (IPC file)
+    SNAPSHOT_BATCH_MB: int = 32            # Arrow data per SQL chunk; bounds memory while building
+    SNAPSHOT_PARQUET_COMPRESSION: str = "zstd"
+    SNAPSHOT_KEEP: int = 3                 # published versions kept on disk
+    SNAPSHOT_INTERVAL_SECONDS: int = 0     # 0 = build on demand only (POST /export/snapshot or the CLI)
+
+    # 🍃 Mongo bulk sync (buffered unordered bulk_write)
+    MONGO_BULK_BATCH_SIZE: int = 1000
+
+    # 📬 SQL → Mongo sync outbox
+    OUTBOX_BATCH_SIZE: int = 200
+    OUTBOX_POLL_INTERVAL: float = 1.0      # seconds between polls when idle
+    OUTBOX_MAX_BACKOFF: float = 60.0       # cap for retry backoff while Mongo is down
+    OUTBOX_MAX_ATTEMPTS: int = 10          # per-event, for documents Mongo rejects
+    OUTBOX_SHUTDOWN_TIMEOUT: float = 10.0  # max seconds spent flushing on shutdown
+
+    # 🔄 SQL → Mongo ETL (app/services/etl_sync.py)
+    ETL_CHUNK_SIZE: int = 5000
+    ETL_CHECKPOINT_LAG: int = 60           # seconds re-read before the last high-water mark
+    ETL_INTERVAL_SECONDS: int = 0          # 0 = no in-process schedule
 
     class Config:
         env_file = ".env"      # Load from local .env when running locally
@@ -0,0 +1,161 @@
+# app/core/cache.py
+"""
+Small in-process caches.
+
+`LRUCache` is a thread-safe least-recently-used map with an optional TTL.
+Entries can carry tags so a write can drop every entry derived from a row
+without knowing the keys they were cached under, e.g.
+
+    cache.set("alice", record, tags=[("student", 7)])
+    cache.invalidate_tag(("student", 7))
+
+A value computed from the database can be stored conditionally, so an
+invalidation that ran while it was being loaded is not undone:
+
+    version = cache.tag_version(("student",))
+    row = load()
+    cache.set("alice", row, guard=(("student",), version))   # skipped if invalidated since
+
+`CacheBackend` is the interface callers rely on; LRUCache is the in-process
+implementation and SharedMemoryCache (app/core/shm_cache.py) the one shared
+by all workers on a host. `make_cache` picks one per CACHE_BACKEND.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Hashable, Iterable, Optional, Tuple
+
+_MISSING = object()
+
+
+class CacheBackend:
+    """Key/value store with per-entry TTL and tag invalidation."""
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        raise NotImplementedError
+
+    def set(self, key: Hashable, value: Any, tags: Iterable[Hashable] = (), ttl: Optional[float] = None,
+            guard: Optional[Tuple[Hashable, int]] = None):
+        """With `guard=(tag, version)`, store only if `tag` was not invalidated since tag_version() returned it."""
+        raise NotImplementedError
+
+    def tag_version(self, tag: Hashable) -> int:
+        """Counter bumped by every invalidate_tag(tag)."""
+        raise NotImplementedError
+
+    def pop(self, key: Hashable):
+        raise NotImplementedError
+
+    def invalidate_tag(self, tag: Hashable):
+        raise NotImplementedError
+
+    def clear(self):
+        raise NotImplementedError
+
+    def stats(self) -> dict:
+        raise NotImplementedError
+
+
+class LRUCache(CacheBackend):
+    def __init__(self, maxsize: int, ttl: Optional[float] = None):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data = OrderedDict()   # key → (expires_at, value, tags)
+        self._tags = {}              # tag → {keys}
+        self._versions = {}          # tag → invalidation count, for tags someone asked the version of
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0           # dropped to make room (not expiry / invalidation)
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        with self._lock:
+            entry = self._data.get(key, _MISSING)
+            if entry is _MISSING or (entry[0] is not None and entry[0] <= time.monotonic()):
+                if entry is not _MISSING:
+                    self._drop(key)
+                self.misses += 1
+                return default
+            self._data.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def set(self, key: Hashable, value: Any, tags: Iterable[Hashable] = (), ttl: Optional[float] = None,
+            guard: Optional[Tuple[Hashable, int]] = None):
+        """`ttl` overrides the cache-wide TTL for this entry."""
+        if self.maxsize <= 0:
+            return
+        ttl = ttl if ttl is not None else self.ttl
+        expires_at = time.monotonic() + ttl if ttl else None
+        tags = tuple(tags)
+        with self._lock:
+            if guard is not None and self._versions.get(guard[0], 0) != guard[1]:
+                return
+            if key in self._data:
+                self._drop(key)
+            self._data[key] = (expires_at, value, tags)
+            for tag in tags:
+                self._tags.setdefault(tag, set()).add(key)
+            while len(self._data) > self.maxsize:
+                self._drop(next(iter(self._data)))
+                self.evictions += 1
+
+    def pop(self, key: Hashable):
+        with self._lock:
+            if key in self._data:
+                self._drop(key)
+
+    def tag_version(self, tag: Hashable) -> int:
+        with self._lock:
+            return self._versions.setdefault(tag, 0)
+
+    def invalidate_tag(self, tag: Hashable):
+        with self._lock:
+            if tag in self._versions:
+                self._versions[tag] += 1
+            for key in list(self._tags.get(tag, ())):
+                self._drop(key)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self._tags.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"size": len(self._data), "maxsize": self.maxsize, "hits": self.hits, "misses": self.misses,
+                    "evictions": self.evictions}
+
+    def _drop(self, key: Hashable):
+        _, _, tags = self._data.pop(key)
+        for tag in tags:
+            keys = self._tags.get(tag)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._tags[tag]
+
+
+def make_cache(name: str, maxsize: int, ttl: Optional[float] = None, slot_bytes: int = 512) -> CacheBackend:
+    """
+    An LRUCache, or with CACHE_BACKEND=shared a SharedMemoryCache of `maxsize`
+    slots of `slot_bytes` that every worker of this deployment maps.
+    """
+    from app.config import settings
+
+    if settings.CACHE_BACKEND != "shared":
+        return LRUCache(maxsize, ttl=ttl)
+
+    import hashlib
+    import os
+
+    from app.core.shm_cache import SharedMemoryCache, default_dir
+
+    # Layout and database are part of the name: workers of another
+    # deployment (or config) never map the same file.
+    deployment = hashlib.blake2b(settings.SQLALCHEMY_DATABASE_URL.encode(), digest_size=6).hexdigest()
+    path = os.path.join(settings.SHARED_CACHE_DIR or default_dir(),
+                        f"school-api-{name}-{maxsize}x{slot_bytes}-{deployment}")
+    return SharedMemoryCache(path, slots=maxsize, slot_bytes=slot_bytes, ttl=ttl)
+
@@ -0,0 +1,123 @@
+# app/core/content_negotiation.py
+"""
+Binary response formats for list and analytics routes, picked by Accept:
+
+    application/json                      default (the response_model path)
+    application/msgpack                   same shape as the JSON body
+    application/vnd.apache.arrow.stream   one Arrow IPC stream of the rows;
+                                          a page's cursor is in X-Next-Cursor
+
+Binary bodies are encoded straight from query results (row tuples or the
+cached report dicts), never through the per-row Pydantic *Out models.
+"""
+
+from typing import Iterable, Optional, Sequence
+
+import msgpack
+import pyarrow as pa
+from fastapi import Header, Response
+from sqlalchemy import DateTime, Float, Integer
+
+from app.core.pagination import RowPage
+
+JSON = "application/json"
+MSGPACK = "application/msgpack"
+ARROW_STREAM = "application/vnd.apache.arrow.stream"
+
+_ACCEPTED = {
+    JSON: JSON,
+    MSGPACK: MSGPACK,
+    "application/x-msgpack": MSGPACK,
+    ARROW_STREAM: ARROW_STREAM,
+}
+
+# For route decorators: documents the alternative bodies in OpenAPI.
+BINARY_RESPONSES = {200: {"content": {MSGPACK: {}, ARROW_STREAM: {}}}}
+
+
+def preferred_format(accept: Optional[str]) -> str:
+    """Highest-q supported media type in an Accept header (JSON when none is supported)."""
+    best, best_q = JSON, 0.0
+    for part in (accept or "").split(","):
+        media_type, *params = [p.strip() for p in part.split(";")]
+        supported = _ACCEPTED.get(media_type.lower())
+        if supported is None:
+            continue
+        q = 1.0
+        for param in params:
+            name, _, value = param.partition("=")
+            if name.strip() == "q":
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        if q > best_q:
+            best, best_q = supported, q
+    return best
+
+
+def negotiate(response: Response, accept: Optional[str] = Header(None)) -> str:
+    """Route dependency: the response format for this request (JSON responses get Vary too)."""
+    response.headers["Vary"] = "Accept"
+    return preferred_format(accept)
+
+
+# --------------------------------------------------------
+# Arrow schemas from SQL columns
+# --------------------------------------------------------
+def arrow_type(column) -> pa.DataType:
+    if isinstance(column.type, Integer):
+        return pa.int64()
+    if isinstance(column.type, Float):
+        return pa.float64()
+    if isinstance(column.type, DateTime):
+        return pa.timestamp("us")
+    return pa.string()
+
+
+def arrow_schema(columns: Iterable) -> pa.Schema:
+    """Arrow schema for SQL columns (every field nullable)."""
+    return pa.schema([pa.field(c.name, arrow_type(c)) for c in columns])
+
+
+def record_batch(schema: pa.Schema, rows: Sequence[tuple]) -> pa.RecordBatch:
+    """Row tuples → one column-typed batch."""
+    columns = list(zip(*rows)) if rows else [()] * len(schema)
+    return pa.RecordBatch.from_arrays(
+        [pa.array(values, type=field.type) for values, field in zip(columns, schema)], schema=schema,
+    )
+
+
+# --------------------------------------------------------
+# Responses
+# --------------------------------------------------------
+def page_response(media_type: str, page: RowPage, table) -> Response:
+    """A RowPage of `table` (its column types drive the Arrow schema) as msgpack or Arrow."""
+    if media_type == ARROW_STREAM:
+        schema = arrow_schema(table.c[name] for name in page.fields)
+        headers = {"X-Next-Cursor": page.next_cursor} if page.next_cursor else {}
+        return _arrow_response(pa.Table.from_batches([record_batch(schema, page.rows)]), headers)
+    items = [dict(zip(page.fields, row)) for row in page.rows]
+    return _msgpack_response({"items": items, "next_cursor": page.next_cursor})
+
+
+def rows_response(media_type: str, result) -> Response:
+    """
+    An analytics result (list of row dicts) as msgpack or Arrow. A message
+    instead of rows (e.g. "No GPA records found") is an empty Arrow stream.
+    """
+    if media_type == ARROW_STREAM:
+        return _arrow_response(pa.Table.from_pylist(result if isinstance(result, list) else []), {})
+    return _msgpack_response(result)
+
+
+def _msgpack_response(body) -> Response:
+    return Response(msgpack.packb(body, use_bin_type=True, default=str), media_type=MSGPACK,
+                    headers={"Vary": "Accept"})
+
+
+def _arrow_response(table: pa.Table, headers: dict) -> Response:
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    return Response(sink.getvalue().to_pybytes(), media_type=ARROW_STREAM, headers={"Vary": "Accept", **headers})
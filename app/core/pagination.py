@@ -0,0 +1,73 @@
+# app/core/pagination.py
+"""
+Keyset (cursor) pagination helpers shared by the list endpoints.
+
+Cursors are opaque to clients: they wrap the primary key of the last row of
+the previous page, so every page is an indexed `WHERE id > :after ORDER BY id
+LIMIT :n` range scan regardless of how deep the client has paged.
+
+`keyset_rows` is the same query over plain columns, for responses encoded
+without building a model per row (app/core/content_negotiation.py).
+"""
+
+import base64
+import json
+from typing import List, NamedTuple, Optional, Sequence, Tuple, TypeVar
+
+from fastapi import HTTPException
+from sqlalchemy import select
+
+from app.config import settings
+
+T = TypeVar("T")
+
+
+class RowPage(NamedTuple):
+    """One page as plain values (picklable, so the shared result cache can hold it)."""
+    fields: Sequence[str]
+    rows: List[tuple]
+    next_cursor: Optional[str]
+
+
+def clamp_limit(limit: Optional[int]) -> int:
+    """Apply the server-side default and hard maximum page size."""
+    if not limit or limit < 1:
+        return settings.PAGE_SIZE_DEFAULT
+    return min(limit, settings.PAGE_SIZE_MAX)
+
+
+def encode_cursor(last_id: int) -> str:
+    raw = json.dumps({"id": last_id}, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: Optional[str]) -> Optional[int]:
+    """Return the primary key encoded in `cursor` (None for the first page)."""
+    if not cursor:
+        return None
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        data = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        return int(data["id"])
+    except (ValueError, TypeError, KeyError):
+        raise HTTPException(status_code=400, detail="Invalid pagination cursor")
+
+
+def split_page(rows: Sequence[T], limit: int) -> Tuple[Sequence[T], Optional[str]]:
+    """
+    Repositories fetch `limit + 1` rows; the extra row only tells us whether
+    another page exists and is never returned.
+    """
+    if len(rows) <= limit:
+        return rows, None
+    items = rows[:limit]
+    return items, encode_cursor(items[-1].id)
+
+
+def keyset_rows(db, table, fields: Sequence[str], limit: int, after_id: Optional[int] = None) -> RowPage:
+    """One page of `fields` from `table` as row tuples (`fields` must include id)."""
+    stmt = select(*(table.c[name] for name in fields)).order_by(table.c.id).limit(limit + 1)
+    if after_id is not None:
+        stmt = stmt.where(table.c.id > after_id)
+    rows, next_cursor = split_page(db.execute(stmt).all(), limit)
+    return RowPage(tuple(fields), [tuple(row) for row in rows], next_cursor)
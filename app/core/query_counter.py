@@ -0,0 +1,51 @@
+# app/core/query_counter.py
+"""
+Count the SQL statements a block of code (or one request) sends.
+
+    install(engine)
+    with QueryCounter() as counter:
+        service.update_student(7, payload)
+    counter.count, counter.statements
+
+The counter lives in a context variable, so concurrent requests each count
+their own statements. Transaction control is not counted: BEGIN / COMMIT are
+usually issued by the driver, and the explicit BEGIN IMMEDIATE of the SQLite
+profile is skipped. With QUERY_COUNT_HEADER enabled every response
+carries an X-Query-Count header (see app/main.py).
+"""
+
+from contextvars import ContextVar
+from typing import List, Optional
+
+from sqlalchemy import event
+
+_current: ContextVar[Optional["QueryCounter"]] = ContextVar("query_counter", default=None)
+
+
+class QueryCounter:
+    def __init__(self):
+        self.statements: List[str] = []
+        self._token = None
+
+    @property
+    def count(self) -> int:
+        return len(self.statements)
+
+    def __enter__(self):
+        self._token = _current.set(self)
+        return self
+
+    def __exit__(self, *exc):
+        _current.reset(self._token)
+        return False
+
+
+def _record(conn, cursor, statement, parameters, context, executemany):
+    counter = _current.get()
+    if counter is not None and not statement.startswith("BEGIN"):
+        counter.statements.append(statement)
+
+
+def install(engine):
+    if not event.contains(engine, "before_cursor_execute", _record):
+        event.listen(engine, "before_cursor_execute", _record)
@@ -62,7 +62,7 @@ def create_access_token(data: dict):
 # -----------------------------
 # CURRENT USER (Decode JWT)
 # -----------------------------
-def get_current_user(token: str = Depends(oauth2_scheme)):
+async def get_current_user(token: str = Depends(oauth2_scheme)):
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate token",
@@ -93,7 +93,7 @@ def role_required(roles: list[str]):
         Depends(role_required(["admin"]))
     """
 
-    def wrapper(current_user=Depends(get_current_user)):
+    async def wrapper(current_user=Depends(get_current_user)):
         if current_user["role"] not in roles:
             raise HTTPException(
                 status_code=status.HTTP_403_FORBIDDEN,
@@ -0,0 +1,251 @@
+# app/core/shm_cache.py
+"""
+CacheBackend shared by every worker process on one host.
+
+The store is an mmap-ed file (under /dev/shm when available) laid out as a
+fixed-size open-addressing hash table:
+
+    header      magic, layout, clear generation
+    tag table   TAG_SLOTS generation counters, one per hashed tag
+    slots       `slots` × `slot_bytes`: entry header + key + value
+
+Readers never lock: each slot carries a sequence number that is odd while
+it is being written, and a read that saw it change (or odd) is a miss.
+Writers serialize on a threading lock plus flock() on the file. An entry
+records the generation of each of its tags when stored; invalidate_tag()
+bumps the tag's counter, which every process sees on its next read, so the
+counters double as the cross-process invalidation signal. clear() bumps the
+header generation the same way.
+
+Keys and values are pickled. Values larger than a slot are not cached.
+Hashed tags can collide; a collision only invalidates more than needed.
+"""
+
+import fcntl
+import hashlib
+import mmap
+import os
+import pickle
+import struct
+import tempfile
+import threading
+import time
+from typing import Any, Hashable, Iterable, Optional, Tuple
+
+from app.core.cache import CacheBackend
+
+MAGIC = b"SCHSHM01"
+_HEADER = struct.Struct("<8sIIQ")            # magic, slots, slot_bytes, clear generation
+_HEADER_SIZE = 64
+TAG_SLOTS = 8192
+_TAGS_OFFSET = _HEADER_SIZE
+_SLOTS_OFFSET = _TAGS_OFFSET + TAG_SLOTS * 8
+
+MAX_TAGS = 4
+PROBES = 8
+# seq, key hash, expires_at (wall clock, 0 = never), clear generation,
+# key length, value length, tag count, tag indexes, tag generations
+_ENTRY = struct.Struct("<QQdQHIB" + "I" * MAX_TAGS + "Q" * MAX_TAGS)
+_ENTRY_SIZE = 96
+_SEQ = struct.Struct("<Q")
+_MISSING = object()
+
+
+def default_dir() -> str:
+    return "/dev/shm" if os.path.isdir("/dev/shm") else tempfile.gettempdir()
+
+
+def _digest(obj) -> int:
+    """Process-independent hash (Python's hash() is salted per process); never 0."""
+    data = obj if isinstance(obj, bytes) else pickle.dumps(obj, protocol=4)
+    return int.from_bytes(hashlib.blake2b(data, digest_size=8).digest(), "little") or 1
+
+
+class SharedMemoryCache(CacheBackend):
+    def __init__(self, path: str, slots: int, slot_bytes: int, ttl: Optional[float] = None):
+        if slot_bytes <= _ENTRY_SIZE:
+            raise ValueError(f"slot_bytes must be larger than {_ENTRY_SIZE}")
+        self.path = path
+        self.slots = slots
+        self.slot_bytes = slot_bytes
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.oversize = 0
+        self._fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o600)
+        size = _SLOTS_OFFSET + slots * slot_bytes
+        with self._file_lock():
+            header = os.pread(self._fd, _HEADER.size, 0)
+            if os.fstat(self._fd).st_size != size or header[:8] != MAGIC or \
+                    _HEADER.unpack(header)[1:3] != (slots, slot_bytes):
+                # New file or another layout: start empty (the file stays sparse).
+                os.ftruncate(self._fd, 0)
+                os.ftruncate(self._fd, size)
+                os.pwrite(self._fd, _HEADER.pack(MAGIC, slots, slot_bytes, 0), 0)
+        self._map = mmap.mmap(self._fd, size)
+
+    # --------------------------------------------------------
+    # CacheBackend
+    # --------------------------------------------------------
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        key_bytes = pickle.dumps(key, protocol=4)
+        key_hash = _digest(key_bytes)
+        for slot in self._probe(key_hash):
+            value = self._read(slot, key_hash, key_bytes)
+            if value is not _MISSING:
+                self.hits += 1
+                return value
+        self.misses += 1
+        return default
+
+    def set(self, key: Hashable, value: Any, tags: Iterable[Hashable] = (), ttl: Optional[float] = None,
+            guard: Optional[Tuple[Hashable, int]] = None):
+        key_bytes = pickle.dumps(key, protocol=4)
+        value_bytes = pickle.dumps(value, protocol=5)
+        if _ENTRY_SIZE + len(key_bytes) + len(value_bytes) > self.slot_bytes:
+            self.oversize += 1
+            return
+        tag_slots = [_digest(tag) % TAG_SLOTS for tag in tags][:MAX_TAGS]
+        ttl = ttl if ttl is not None else self.ttl
+        expires_at = time.time() + ttl if ttl else 0.0
+        key_hash = _digest(key_bytes)
+
+        with self._lock, self._file_lock():
+            if guard is not None and self.tag_version(guard[0]) != guard[1]:
+                return   # invalidated (by any worker) since the caller read the version
+            slot = self._slot_for_write(key_hash, key_bytes)
+            offset = self._slot_offset(slot)
+            seq = _SEQ.unpack_from(self._map, offset)[0] + 1       # odd: being written
+            _SEQ.pack_into(self._map, offset, seq)
+            tag_gens = [self._tag_generation(t) for t in tag_slots]
+            padding = MAX_TAGS - len(tag_slots)
+            _ENTRY.pack_into(
+                self._map, offset, seq, key_hash, expires_at, self._clear_generation(),
+                len(key_bytes), len(value_bytes), len(tag_slots),
+                *tag_slots, *([0] * padding), *tag_gens, *([0] * padding),
+            )
+            data = offset + _ENTRY_SIZE
+            self._map[data:data + len(key_bytes)] = key_bytes
+            self._map[data + len(key_bytes):data + len(key_bytes) + len(value_bytes)] = value_bytes
+            _SEQ.pack_into(self._map, offset, seq + 1)             # even: readable
+
+    def pop(self, key: Hashable):
+        key_bytes = pickle.dumps(key, protocol=4)
+        key_hash = _digest(key_bytes)
+        with self._lock, self._file_lock():
+            for slot in self._probe(key_hash):
+                if self._read(slot, key_hash, key_bytes, check_live=False) is not _MISSING:
+                    self._empty(slot)
+
+    def tag_version(self, tag: Hashable) -> int:
+        return self._tag_generation(_digest(tag) % TAG_SLOTS)
+
+    def invalidate_tag(self, tag: Hashable):
+        offset = _TAGS_OFFSET + (_digest(tag) % TAG_SLOTS) * 8
+        with self._lock, self._file_lock():
+            _SEQ.pack_into(self._map, offset, _SEQ.unpack_from(self._map, offset)[0] + 1)
+
+    def clear(self):
+        with self._lock, self._file_lock():
+            magic, slots, slot_bytes, generation = _HEADER.unpack_from(self._map, 0)
+            _HEADER.pack_into(self._map, 0, magic, slots, slot_bytes, generation + 1)
+
+    def stats(self) -> dict:
+        now, generation = time.time(), self._clear_generation()
+        size = 0
+        for slot in range(self.slots):
+            entry = _ENTRY.unpack_from(self._map, self._slot_offset(slot))
+            if entry[1] and entry[0] % 2 == 0 and entry[3] == generation and not (entry[2] and entry[2] <= now):
+                size += 1
+        return {"size": size, "maxsize": self.slots, "hits": self.hits, "misses": self.misses,
+                "evictions": self.evictions, "oversize": self.oversize, "path": self.path}
+
+    def close(self):
+        self._map.close()
+        os.close(self._fd)
+
+    # --------------------------------------------------------
+    # Slots
+    # --------------------------------------------------------
+    def _probe(self, key_hash: int):
+        start = key_hash % self.slots
+        return [(start + i) % self.slots for i in range(min(PROBES, self.slots))]
+
+    def _slot_offset(self, slot: int) -> int:
+        return _SLOTS_OFFSET + slot * self.slot_bytes
+
+    def _read(self, slot: int, key_hash: int, key_bytes: bytes, check_live: bool = True):
+        """The slot's value if it holds `key` (and, with check_live, is still valid), else _MISSING."""
+        offset = self._slot_offset(slot)
+        entry = _ENTRY.unpack_from(self._map, offset)
+        seq, stored_hash, expires_at, generation, key_len, value_len, ntags = entry[:7]
+        if stored_hash != key_hash or seq % 2 or key_len != len(key_bytes):
+            return _MISSING
+        data = offset + _ENTRY_SIZE
+        stored_key = self._map[data:data + key_len]
+        payload = self._map[data + key_len:data + key_len + value_len]
+        if _SEQ.unpack_from(self._map, offset)[0] != seq or stored_key != key_bytes:
+            return _MISSING   # rewritten while we copied it, or a different key
+        if check_live:
+            if expires_at and expires_at <= time.time():
+                return _MISSING
+            if generation != self._clear_generation():
+                return _MISSING
+            tag_slots = entry[7:7 + ntags]
+            tag_gens = entry[7 + MAX_TAGS:7 + MAX_TAGS + ntags]
+            if any(self._tag_generation(t) != g for t, g in zip(tag_slots, tag_gens)):
+                return _MISSING
+        return pickle.loads(payload)
+
+    def _slot_for_write(self, key_hash: int, key_bytes: bytes) -> int:
+        """Same key, else a free / dead slot, else evict the one expiring first."""
+        now, generation = time.time(), self._clear_generation()
+        free, victim, victim_expiry = None, None, None
+        for slot in self._probe(key_hash):
+            entry = _ENTRY.unpack_from(self._map, self._slot_offset(slot))
+            if entry[1] == key_hash and self._read(slot, key_hash, key_bytes, check_live=False) is not _MISSING:
+                return slot
+            dead = (not entry[1] or entry[3] != generation or (entry[2] and entry[2] <= now)
+                    or any(self._tag_generation(t) != g
+                           for t, g in zip(entry[7:7 + entry[6]], entry[7 + MAX_TAGS:7 + MAX_TAGS + entry[6]])))
+            if dead and free is None:
+                free = slot
+            expiry = entry[2] or float("inf")
+            if victim is None or expiry < victim_expiry:
+                victim, victim_expiry = slot, expiry
+        if free is not None:
+            return free
+        self.evictions += 1
+        return victim
+
+    def _empty(self, slot: int):
+        offset = self._slot_offset(slot)
+        seq = _SEQ.unpack_from(self._map, offset)[0]
+        _SEQ.pack_into(self._map, offset, seq + 1)
+        struct.pack_into("<Q", self._map, offset + 8, 0)       # no key hash: free
+        _SEQ.pack_into(self._map, offset, seq + 2)
+
+    def _tag_generation(self, tag_slot: int) -> int:
+        return _SEQ.unpack_from(self._map, _TAGS_OFFSET + tag_slot * 8)[0]
+
+    def _clear_generation(self) -> int:
+        return _HEADER.unpack_from(self._map, 0)[3]
+
+    def _file_lock(self):
+        return _FileLock(self._fd)
+
+
+class _FileLock:
+    """flock() for the duration of a `with` block (threads are serialized separately)."""
+
+    def __init__(self, fd: int):
+        self.fd = fd
+
+    def __enter__(self):
+        fcntl.flock(self.fd, fcntl.LOCK_EX)
+
+    def __exit__(self, *exc):
+        fcntl.flock(self.fd, fcntl.LOCK_UN)
+        return False
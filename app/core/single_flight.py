@@ -0,0 +1,76 @@
+# app/core/single_flight.py
+"""
+Request coalescing: concurrent calls with the same key share one execution.
+
+    flights = SingleFlight()
+    report = flights.do(("gpa",), compute)              # waits for the leader's result
+    flights.do_in_background(("gpa",), compute, pool)   # no-op if one is already running
+
+Only the first caller (the leader) runs `fn`; callers arriving while it
+runs block until it finishes and get the same result or exception. The key
+is released as soon as the call ends, so the next caller starts fresh.
+"""
+
+import threading
+from concurrent.futures import Executor
+from typing import Any, Callable, Hashable
+
+
+class _Call:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls = {}    # key → _Call in flight
+        self.executions = 0
+        self.coalesced = 0  # callers that waited on someone else's execution
+
+    def do(self, key: Hashable, fn: Callable[[], Any]) -> Any:
+        with self._lock:
+            call = self._calls.get(key)
+            if call is None:
+                call = self._calls[key] = _Call()
+                leader = True
+            else:
+                self.coalesced += 1
+                leader = False
+        if leader:
+            self._run(key, call, fn)
+        else:
+            call.done.wait()
+        if call.error is not None:
+            raise call.error
+        return call.result
+
+    def do_in_background(self, key: Hashable, fn: Callable[[], Any], executor: Executor) -> bool:
+        """Start `fn` on `executor` unless the key is already in flight. Returns whether it started."""
+        with self._lock:
+            if key in self._calls:
+                return False
+            call = self._calls[key] = _Call()
+        executor.submit(self._run, key, call, fn)
+        return True
+
+    def in_flight(self) -> int:
+        with self._lock:
+            return len(self._calls)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"executions": self.executions, "coalesced": self.coalesced, "in_flight": len(self._calls)}
+
+    def _run(self, key: Hashable, call: _Call, fn: Callable[[], Any]):
+        try:
+            call.result = fn()
+        except Exception as exc:
+            call.error = exc
+        finally:
+            with self._lock:
+                self.executions += 1
+                del self._calls[key]
+            call.done.set()
@@ -0,0 +1,77 @@
+# app/db/async_db.py
+"""
+Async SQL engine for the event-loop request path.
+
+Same database as app/db/sql_db.py, reached through an async driver
+(aiosqlite / asyncpg), so a slow query parks a coroutine instead of holding
+one of the threadpool slots sync handlers run in. Reads are routed like the
+sync path (see app/db/read_routing.py).
+"""
+
+import itertools
+
+from fastapi import Request
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from app.config import settings
+from app.db.read_routing import replica, use_primary
+from app.db.sql_db import READ_DATABASE_URLS
+from app.db.sqlite_profile import READER, WRITER, apply_profile, pool_options, read_only
+
+# Sync driver → async driver for the same backend.
+ASYNC_DRIVERS = {
+    "sqlite": "aiosqlite",
+    "postgresql": "asyncpg",
+}
+
+
+def async_database_url(url: str) -> str:
+    """sqlite:///x.db → sqlite+aiosqlite:///x.db, postgresql://… → postgresql+asyncpg://…"""
+    parsed = make_url(url)
+    backend = parsed.get_backend_name()
+    if backend not in ASYNC_DRIVERS:
+        raise ValueError(f"No async driver configured for '{backend}'; set ASYNC_SQLALCHEMY_DATABASE_URL")
+    return parsed.set(drivername=f"{backend}+{ASYNC_DRIVERS[backend]}").render_as_string(hide_password=False)
+
+
+ASYNC_SQLALCHEMY_DATABASE_URL = (
+    settings.ASYNC_SQLALCHEMY_DATABASE_URL or async_database_url(settings.SQLALCHEMY_DATABASE_URL)
+)
+
+async_engine = create_async_engine(ASYNC_SQLALCHEMY_DATABASE_URL,
+                                   **pool_options(ASYNC_SQLALCHEMY_DATABASE_URL, WRITER))
+apply_profile(async_engine.sync_engine, WRITER)
+
+# Same session settings as SessionLocal (no reload after commit).
+AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+AsyncPrimaryReadSessionLocal = async_sessionmaker(read_only(async_engine), autoflush=False, expire_on_commit=False)
+
+# 📖 Async twins of the sync read engines; the primary when none are configured
+async_read_engines = [
+    create_async_engine(async_database_url(url), **pool_options(url, READER)) for url in READ_DATABASE_URLS
+] or [async_engine]
+for async_read_engine in READ_DATABASE_URLS and async_read_engines:
+    apply_profile(async_read_engine.sync_engine, READER)
+
+_async_read_factories = itertools.cycle([
+    async_sessionmaker(read_only(e) if e is async_engine else replica(e), autoflush=False, expire_on_commit=False)
+    for e in async_read_engines
+])
+
+
+def AsyncReadSessionLocal():
+    """AsyncSession on the next read engine (round robin). Never write through it."""
+    return next(_async_read_factories)()
+
+
+async def get_async_db():
+    """Dependency that provides an AsyncSession for `async def` routes."""
+    async with AsyncSessionLocal() as db:
+        yield db
+
+
+async def get_async_read_db(request: Request):
+    """Read-only `async def` routes: like get_read_db, on the async engines."""
+    async with (AsyncPrimaryReadSessionLocal() if use_primary(request) else AsyncReadSessionLocal()) as db:
+        yield db
@@ -0,0 +1,48 @@
+# app/db/fact_partitions.py
+"""
+Semester partitions of the Mongo fact table.
+
+Facts are written to one collection per semester; the outbox and
+MongoSyncBuffer address them with partition keys:
+
+    fact_key("2024A")  → "enrollments:2024A" → factEnrollments_2024A
+    fact_key(None)     → "enrollments"       → factEnrollments (no semester: legacy facts)
+
+Semesters are percent-encoded into the collection name, so the mapping is
+reversible and `MongoDB.fact_partition_keys()` can list partitions from the
+collection names alone.
+"""
+
+from typing import Optional
+from urllib.parse import quote, unquote
+
+from app.config import settings
+
+FACTS = "enrollments"
+_SEP = ":"
+
+
+def fact_key(semester: Optional[str]) -> str:
+    return f"{FACTS}{_SEP}{semester}" if semester else FACTS
+
+
+def is_fact_key(key: str) -> bool:
+    return key == FACTS or key.startswith(FACTS + _SEP)
+
+
+def semester_of(key: str) -> Optional[str]:
+    return key[len(FACTS) + len(_SEP):] if key.startswith(FACTS + _SEP) else None
+
+
+def collection_name(key: str) -> str:
+    semester = semester_of(key)
+    base = settings.MONGO_COLLECTION_FACTS
+    return f"{base}_{quote(semester, safe='')}" if semester else base
+
+
+def key_for_collection(name: str) -> Optional[str]:
+    """Inverse of collection_name for partition collections (None for anything else)."""
+    prefix = settings.MONGO_COLLECTION_FACTS + "_"
+    if not name.startswith(prefix):
+        return None
+    return fact_key(unquote(name[len(prefix):]))
@@ -0,0 +1,91 @@
+# app/db/leader_lock.py
+"""
+"Only one of us" lock for background jobs that every worker process starts.
+
+    lock = LeaderLock(engine, "outbox")
+    if lock.acquire():        # non-blocking; True while this process holds it
+        ...
+    lock.release()
+
+On PostgreSQL it is a session-level pg_try_advisory_lock on a dedicated
+connection, so it spans hosts and is released by the server if the process
+dies. Elsewhere (SQLite) it is flock() on a file next to the database (or
+in the temp dir), which covers the workers of one host — the only ones that
+can share a SQLite file.
+"""
+
+import fcntl
+import hashlib
+import os
+import tempfile
+
+from sqlalchemy import text
+
+from app.core.logger import logger
+
+
+class LeaderLock:
+    def __init__(self, engine, name: str):
+        self.engine = engine
+        self.name = name
+        digest = hashlib.blake2b(f"{engine.url}:{name}".encode(), digest_size=8).digest()
+        self._pg_key = int.from_bytes(digest, "big", signed=True)
+        self._conn = None   # PostgreSQL: connection holding the advisory lock
+        self._fd = None     # elsewhere: the flock()ed file
+
+    @property
+    def held(self) -> bool:
+        return self._conn is not None or self._fd is not None
+
+    def acquire(self) -> bool:
+        """Take the lock if it is free (or check we still hold it). Never blocks."""
+        try:
+            if self.engine.dialect.name == "postgresql":
+                return self._acquire_pg()
+            return self._acquire_file()
+        except Exception as exc:
+            logger.warning(f"⚠ Could not take the {self.name} lock: {exc}")
+            self.release()
+            return False
+
+    def release(self):
+        if self._conn is not None:
+            conn, self._conn = self._conn, None
+            try:
+                conn.execute(text("SELECT pg_advisory_unlock(:k)"), {"k": self._pg_key})
+            except Exception:
+                pass   # a dead connection has released it already
+            conn.close()
+        if self._fd is not None:
+            fd, self._fd = self._fd, None
+            os.close(fd)   # drops the flock
+
+    def _acquire_pg(self) -> bool:
+        if self._conn is not None:
+            self._conn.execute(text("SELECT 1"))   # raises if the connection (and so the lock) is gone
+            return True
+        conn = self.engine.connect().execution_options(isolation_level="AUTOCOMMIT")
+        if conn.execute(text("SELECT pg_try_advisory_lock(:k)"), {"k": self._pg_key}).scalar():
+            self._conn = conn
+            return True
+        conn.close()
+        return False
+
+    def _acquire_file(self) -> bool:
+        if self._fd is not None:
+            return True
+        fd = os.open(self._path(), os.O_RDWR | os.O_CREAT, 0o600)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            os.close(fd)
+            return False
+        self._fd = fd
+        return True
+
+    def _path(self) -> str:
+        database = self.engine.url.database
+        if self.engine.dialect.name == "sqlite" and database not in (None, "", ":memory:"):
+            return f"{database}.{self.name}.lock"
+        digest = hashlib.blake2b(str(self.engine.url).encode(), digest_size=6).hexdigest()
+        return os.path.join(tempfile.gettempdir(), f"school-api-{self.name}-{digest}.lock")
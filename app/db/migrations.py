@@ -0,0 +1,217 @@
+# app/db/migrations.py
+"""
+Versioned SQL schema migrations.
+
+Run once per deploy, before the new app version starts (start.sh / Dockerfile):
+    python -m app.db.migrations            # apply pending migrations
+    python -m app.db.migrations --status   # list applied / pending versions
+
+Applied versions are recorded in `schema_migrations`; each migration runs
+once, in order. Index builds skip indexes that already exist and, on
+PostgreSQL, use CREATE INDEX CONCURRENTLY so the table stays writable while
+the index is built — new indexes reach a live database without downtime.
+
+Adding a migration: append a function decorated with @migration("NNNN", "…")
+and declare the same index/column on the model so fresh databases match.
+"""
+
+import argparse
+from datetime import datetime
+from typing import Callable, List, NamedTuple
+
+from sqlalchemy import Column, DateTime, MetaData, String, Table, inspect, select, text
+
+from app.core.logger import logger
+
+_meta = MetaData()
+schema_migrations = Table(
+    "schema_migrations", _meta,
+    Column("version", String, primary_key=True),
+    Column("description", String, nullable=False),
+    Column("applied_at", DateTime, nullable=False),
+)
+
+# Arbitrary key for pg_advisory_lock: serializes concurrent `migrate` runs.
+_PG_LOCK_KEY = 7_340_221
+
+
+class MigrationError(RuntimeError):
+    pass
+
+
+class Migration(NamedTuple):
+    version: str
+    description: str
+    apply: Callable
+
+
+MIGRATIONS: List[Migration] = []
+
+
+def migration(version: str, description: str):
+    def register(fn):
+        MIGRATIONS.append(Migration(version, description, fn))
+        return fn
+    return register
+
+
+# --------------------------------------------------------
+# DDL helpers (idempotent, so a half-applied migration can be rerun)
+# --------------------------------------------------------
+def create_index(engine, name: str, table: str, columns: List[str], unique: bool = False):
+    postgres = engine.dialect.name == "postgresql"
+    if postgres:
+        # A failed CONCURRENTLY build leaves an INVALID index behind; rebuild it.
+        with engine.connect() as conn:
+            invalid = conn.execute(text(
+                "SELECT 1 FROM pg_class c JOIN pg_index i ON i.indexrelid = c.oid "
+                "WHERE c.relname = :name AND NOT i.indisvalid"
+            ), {"name": name}).first()
+        if invalid:
+            _autocommit(engine, f"DROP INDEX CONCURRENTLY IF EXISTS {name}")
+
+    if name in {ix["name"] for ix in inspect(engine).get_indexes(table)}:
+        return
+    logger.info(f"🆕 Creating index {name} on {table}({', '.join(columns)}) …")
+    ddl = "CREATE {unique}INDEX {concurrently}{name} ON {table} ({columns})".format(
+        unique="UNIQUE " if unique else "",
+        concurrently="CONCURRENTLY " if postgres else "",
+        name=name, table=table, columns=", ".join(columns),
+    )
+    if postgres:
+        _autocommit(engine, ddl)   # CONCURRENTLY cannot run inside a transaction
+    else:
+        with engine.begin() as conn:
+            conn.execute(text(ddl))
+
+
+def add_column(engine, table: str, column):
+    """Add a nullable column if the table lacks it."""
+    if column.name in {c["name"] for c in inspect(engine).get_columns(table)}:
+        return
+    logger.info(f"🆕 Adding column {table}.{column.name} …")
+    col_type = column.type.compile(dialect=engine.dialect)
+    with engine.begin() as conn:
+        conn.execute(text(f"ALTER TABLE {table} ADD COLUMN {column.name} {col_type}"))
+
+
+def _autocommit(engine, ddl: str):
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+        conn.execute(text(ddl))
+
+
+# --------------------------------------------------------
+# Migrations
+# --------------------------------------------------------
+@migration("0001", "baseline: create missing tables, updated_at columns and analytics indexes")
+def _baseline(engine):
+    from app.db.sql_db import Base
+    from app.models import sqlalchemy_models as models
+
+    Base.metadata.create_all(bind=engine)   # only creates tables that do not exist
+    for model in (models.Student, models.Lecturer, models.Course, models.Enrollment):
+        table = model.__tablename__
+        add_column(engine, table, model.__table__.c.updated_at)
+        create_index(engine, f"ix_{table}_updated_at", table, ["updated_at"])
+    create_index(engine, "ix_enrollments_course_grade", "enrollments", ["course_id", "grade"])
+    create_index(engine, "ix_enrollments_student_grade", "enrollments", ["student_id", "grade"])
+
+
+@migration("0002", "index enrollment, course and user foreign keys; one enrollment per student+course")
+def _foreign_key_indexes(engine):
+    with engine.connect() as conn:
+        duplicates = conn.execute(text(
+            "SELECT COUNT(*) FROM (SELECT student_id, course_id FROM enrollments "
+            "GROUP BY student_id, course_id HAVING COUNT(*) > 1) d"
+        )).scalar()
+    if duplicates:
+        raise MigrationError(
+            f"{duplicates} (student_id, course_id) pair(s) are enrolled more than once; "
+            "remove the duplicates before applying 0002."
+        )
+    # Also serves student_id-only lookups; course_id-only lookups use the
+    # ix_enrollments_course_grade prefix from 0001.
+    create_index(engine, "ux_enrollments_student_course", "enrollments", ["student_id", "course_id"], unique=True)
+    create_index(engine, "ix_courses_lecturer_id", "courses", ["lecturer_id"])
+    create_index(engine, "ix_users_student_id", "users", ["student_id"])
+
+
+@migration("0003", "enrollments.semester (backfilled from the course) and per-semester analytics indexes")
+def _enrollment_semester(engine):
+    from app.models.sqlalchemy_models import Enrollment
+
+    add_column(engine, "enrollments", Enrollment.__table__.c.semester)
+    with engine.begin() as conn:
+        conn.execute(text(
+            "UPDATE enrollments SET semester = "
+            "(SELECT courses.semester FROM courses WHERE courses.id = enrollments.course_id) "
+            "WHERE semester IS NULL"
+        ))
+    create_index(engine, "ix_enrollments_semester_course_grade", "enrollments", ["semester", "course_id", "grade"])
+    create_index(engine, "ix_enrollments_semester_student_grade", "enrollments", ["semester", "student_id", "grade"])
+
+
+# --------------------------------------------------------
+# Runner
+# --------------------------------------------------------
+def applied_versions(engine) -> set:
+    _meta.create_all(bind=engine)
+    with engine.connect() as conn:
+        return set(conn.execute(select(schema_migrations.c.version)).scalars())
+
+
+def pending_migrations(engine) -> List[Migration]:
+    if not inspect(engine).has_table("schema_migrations"):
+        return list(MIGRATIONS)
+    done = applied_versions(engine)
+    return [m for m in MIGRATIONS if m.version not in done]
+
+
+def migrate(engine) -> List[str]:
+    """Apply every pending migration in order; returns the versions applied."""
+    lock = None
+    if engine.dialect.name == "postgresql":
+        # Autocommit: an open transaction here would block CREATE INDEX CONCURRENTLY.
+        lock = engine.connect().execution_options(isolation_level="AUTOCOMMIT")
+        lock.execute(text("SELECT pg_advisory_lock(:k)"), {"k": _PG_LOCK_KEY})
+    try:
+        applied = []
+        done = applied_versions(engine)
+        for m in MIGRATIONS:
+            if m.version in done:
+                continue
+            logger.info(f"🔧 Applying migration {m.version}: {m.description}")
+            m.apply(engine)
+            with engine.begin() as conn:
+                conn.execute(schema_migrations.insert().values(
+                    version=m.version, description=m.description, applied_at=datetime.utcnow(),
+                ))
+            applied.append(m.version)
+        logger.info(f"✅ Schema up to date ({len(applied)} migration(s) applied).")
+        return applied
+    finally:
+        if lock is not None:
+            lock.execute(text("SELECT pg_advisory_unlock(:k)"), {"k": _PG_LOCK_KEY})
+            lock.close()
+
+
+def main(argv=None):
+    from app.db.sql_db import engine
+
+    parser = argparse.ArgumentParser(description="SQL schema migrations")
+    parser.add_argument("--status", action="store_true", help="list applied and pending migrations")
+    args = parser.parse_args(argv)
+
+    if args.status:
+        pending = {m.version for m in pending_migrations(engine)}
+        for m in MIGRATIONS:
+            print(f"{m.version}  {'pending' if m.version in pending else 'applied'}  {m.description}")
+        return
+    try:
+        migrate(engine)
+    except MigrationError as exc:
+        raise SystemExit(f"❌ {exc}")
+
+
+if __name__ == "__main__":
+    main()
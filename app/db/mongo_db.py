@@ -1,14 +1,157 @@
 """
 MongoDB connection + collections + sync helpers.
+
+The connection is lazy: nothing touches the network at import time.
+`start()` verifies the server in a background thread, and until that
+succeeds `connected` is False and the app serves from SQL only.
 """
 
-from pymongo import MongoClient, errors
+import threading
+import time
+
+from pymongo import MongoClient, errors, UpdateOne, UpdateMany, ReplaceOne, DeleteOne
+from pymongo.collection import Collection
 from app.config import settings
 from app.core.logger import logger
+from app.db.mongo_indexes import ensure_indexes, ensure_partition_indexes, report_indexes
+from app.db import fact_partitions
 import certifi
 
 
+class BulkSyncResult:
+    """Outcome of one unordered bulk_write batch against one collection."""
+
+    def __init__(self, key: str, tags: list):
+        self.key = key
+        self.tags = tags          # caller-supplied tag per operation, in order
+        self.upserted = 0
+        self.modified = 0
+        self.deleted = 0
+        self.errors = {}          # tag -> error message
+
+    @property
+    def succeeded(self) -> list:
+        return [t for t in self.tags if t not in self.errors]
+
+    def __repr__(self):
+        return (
+            f"BulkSyncResult({self.key}: ops={len(self.tags)}, upserted={self.upserted}, "
+            f"modified={self.modified}, deleted={self.deleted}, errors={len(self.errors)})"
+        )
+
+
+class MongoSyncBuffer:
+    """
+    Accumulates upserts/deletes per collection and writes them as unordered
+    `bulk_write` batches, one round trip per MONGO_BULK_BATCH_SIZE operations
+    instead of one per document.
+
+    A collection's batch is written as soon as it reaches the size threshold;
+    callers `flush()` the rest when their unit of work is done (a dispatcher
+    batch, an ETL chunk). Each flush returns one BulkSyncResult per batch, so a
+    rejected document is reported against its tag without failing the rest.
+    If Mongo is unreachable the operations stay buffered and ConnectionFailure
+    propagates from `flush()`.
+    """
+
+    def __init__(self, mongo: "MongoDB", batch_size: int = None):
+        self.mongo = mongo
+        self.batch_size = batch_size or settings.MONGO_BULK_BATCH_SIZE
+        self._ops = {}        # key -> [(operation, tag)]
+        self._lock = threading.Lock()
+
+    # --------------------------------------------------------
+    # Buffering
+    # --------------------------------------------------------
+    def upsert(self, key: str, doc: dict, tag=None):
+        """`$set` the given fields on the document with doc["id"], creating it if needed."""
+        return self._add(key, UpdateOne({"id": doc["id"]}, {"$set": doc}, upsert=True), tag)
+
+    def replace(self, key: str, doc: dict, tag=None):
+        return self._add(key, ReplaceOne({"id": doc["id"]}, doc, upsert=True), tag)
+
+    def delete(self, key: str, doc_id, tag=None):
+        return self._add(key, DeleteOne({"id": doc_id}), tag)
+
+    def update(self, key: str, doc_id, update, tag=None):
+        """Apply an arbitrary update document or pipeline to doc `id`, upserting."""
+        return self._add(key, UpdateOne({"id": doc_id}, update, upsert=True), tag)
+
+    def update_many(self, key: str, filter: dict, update, tag=None):
+        """Apply `update` to every document matching `filter` (no upsert)."""
+        return self._add(key, UpdateMany(filter, update), tag)
+
+    def pending(self) -> int:
+        with self._lock:
+            return sum(len(ops) for ops in self._ops.values())
+
+    def _add(self, key: str, operation, tag):
+        with self._lock:
+            ops = self._ops.setdefault(key, [])
+            ops.append((operation, tag))
+            due = len(ops) >= self.batch_size
+        if not due:
+            return []
+        try:
+            return self.flush(key)
+        except errors.ConnectionFailure as exc:
+            logger.warning(f"⚠ Mongo bulk flush deferred, {self.pending()} op(s) buffered: {exc}")
+            return []
+
+    # --------------------------------------------------------
+    # Flushing
+    # --------------------------------------------------------
+    def flush(self, key: str = None) -> list:
+        with self._lock:
+            keys = [key] if key is not None else list(self._ops)
+            taken = {k: self._ops.pop(k, []) for k in keys}
+
+        results = []
+        for k, ops in taken.items():
+            for start in range(0, len(ops), self.batch_size):
+                batch = ops[start:start + self.batch_size]
+                try:
+                    results.append(self._write_batch(k, batch))
+                except errors.ConnectionFailure:
+                    self._requeue(k, ops[start:])
+                    raise
+        return results
+
+    def _write_batch(self, key: str, batch: list) -> BulkSyncResult:
+        result = BulkSyncResult(key, [tag for _, tag in batch])
+        collection = self.mongo.collection_for(key)
+        try:
+            res = collection.bulk_write([op for op, _ in batch], ordered=False)
+            details = res.bulk_api_result
+        except errors.BulkWriteError as exc:
+            details = exc.details
+            for err in details.get("writeErrors", []):
+                result.errors[batch[err["index"]][1]] = err.get("errmsg", "write error")
+            logger.error(f"❌ Mongo bulk write to '{key}': {len(result.errors)} of {len(batch)} op(s) rejected")
+        result.upserted = details.get("nUpserted", 0)
+        result.modified = details.get("nModified", 0)
+        result.deleted = details.get("nRemoved", 0)
+        return result
+
+    def _requeue(self, key: str, ops: list):
+        with self._lock:
+            self._ops[key] = ops + self._ops.get(key, [])
+
+
 class MongoDB:
+    # Logical collection keys used across the app → configured collection names
+    COLLECTION_NAMES = {
+        "students": settings.MONGO_COLLECTION_STUDENTS,
+        "courses": settings.MONGO_COLLECTION_COURSES,
+        "lecturers": settings.MONGO_COLLECTION_LECTURERS,
+        "enrollments": settings.MONGO_COLLECTION_FACTS,
+        "course_gpa": settings.MONGO_COLLECTION_COURSE_GPA,
+        "student_gpa": settings.MONGO_COLLECTION_STUDENT_GPA,
+    }
+
+    # id of the marker document a completed summary rebuild writes into each summary collection
+    SUMMARY_BUILT = "_built"
+
     def __init__(self):
         self.client = None
         self.db = None
@@ -19,24 +162,59 @@ class MongoDB:
         self.lecturers = None
         self.enrollments = None  # factEnrollments
 
-        self.connect()
+        self._lock = threading.Lock()
+        self._starter = None
+        self.connected_in = None   # seconds the last successful connect took
+        self._known_partitions = set()   # fact partition collections indexed by this process
+
+    # --------------------------------------------------------
+    # 🚦 NON-BLOCKING START
+    # --------------------------------------------------------
+    def start(self):
+        """Connect in a background thread; returns immediately. Safe to call repeatedly."""
+        if not settings.MONGO_URI or self.connected:
+            return
+        if self._starter is not None and self._starter.is_alive():
+            return
+        self._starter = threading.Thread(target=self.connect, name="mongo-connect", daemon=True)
+        self._starter.start()
+
+    @property
+    def status(self) -> str:
+        if not settings.MONGO_URI:
+            return "disabled"
+        if self.connected:
+            return "connected"
+        return "connecting" if self._starter is not None and self._starter.is_alive() else "unavailable"
 
     # --------------------------------------------------------
     # 🔌 CONNECT TO MONGODB
     # --------------------------------------------------------
     def connect(self):
+        """Blocking connect + ping (+ index provisioning). Serialized across threads."""
         uri = settings.MONGO_URI
 
         if not uri:
             logger.warning("⚠ MongoDB URI not set. Running in SQL-only mode.")
             return
 
+        with self._lock:
+            if self.connected:
+                return
+            self._connect(uri)
+
+    def _connect(self, uri: str):
+        if self.client is not None:
+            # Reconnect attempt: drop the previous client's pools first.
+            self.client.close()
+
+        t0 = time.perf_counter()
         try:
             self.client = MongoClient(
                 uri,
                 tls=True,
                 tlsCAFile=certifi.where(),
-                serverSelectionTimeoutMS=7000,
+                serverSelectionTimeoutMS=settings.MONGO_SERVER_SELECTION_TIMEOUT_MS,
                 retryWrites=True,
             )
 
@@ -45,13 +223,15 @@ class MongoDB:
             logger.info("🍃 MongoDB connection successful.")
 
             # Select DB
-            self.db = self.client[settings.MONGO_DB_NAME]
+            db = self.client[settings.MONGO_DB_NAME]
 
-            # Initialize collections safely
-            self.students = self.db.get_collection(settings.MONGO_COLLECTION_STUDENTS)
-            self.courses = self.db.get_collection(settings.MONGO_COLLECTION_COURSES)
-            self.lecturers = self.db.get_collection(settings.MONGO_COLLECTION_LECTURERS)
-            self.enrollments = self.db.get_collection(settings.MONGO_COLLECTION_FACTS)
+            # Initialize collections safely (before `db`, which flips `connected`)
+            self.students = db.get_collection(settings.MONGO_COLLECTION_STUDENTS)
+            self.courses = db.get_collection(settings.MONGO_COLLECTION_COURSES)
+            self.lecturers = db.get_collection(settings.MONGO_COLLECTION_LECTURERS)
+            self.enrollments = db.get_collection(settings.MONGO_COLLECTION_FACTS)
+            self.db = db
+            self.connected_in = time.perf_counter() - t0
 
             logger.info(
                 f"🍃 MongoDB collections initialized: "
@@ -65,55 +245,66 @@ class MongoDB:
             logger.error(f"❌ MongoDB connection error: {e}")
             self.client = None
             self.db = None
+            return
 
-    # --------------------------------------------------------
-    # 🔁 UTILITY: SAFE UPSERT
-    # --------------------------------------------------------
-    def insert_safe(self, collection, data: dict):
+        if settings.MONGO_ENSURE_INDEXES:
+            try:
+                ensure_indexes(self)
+                report_indexes(self)
+            except Exception as e:
+                # Index problems are reported, never fatal for the connection.
+                logger.error(f"❌ MongoDB index provisioning failed: {e}")
+
+        logger.info(f"🍃 MongoDB ready in {(time.perf_counter() - t0) * 1000:.0f}ms (background).")
+
+    @property
+    def connected(self) -> bool:
+        return self.db is not None
+
+    def collection_for(self, key: str) -> Collection:
         """
-        Insert or update document based on `id`.
-        This prevents duplicates and keeps data up-to-date.
+        Resolve a logical key ("students", "enrollments", …) to its collection.
+        Raises ConnectionFailure while Mongo is unavailable so callers that must
+        not lose writes (the outbox dispatcher) can retry later.
         """
-        if not collection or not data:
-            return
+        if fact_partitions.semester_of(key) is not None:
+            return self._partition(key)
+        if key not in self.COLLECTION_NAMES:
+            raise ValueError(f"Unknown Mongo collection key '{key}'")
+        if self.db is None:
+            raise errors.ConnectionFailure("MongoDB is not connected")
+        return self.db.get_collection(self.COLLECTION_NAMES[key])
 
-        if "id" not in data:
-            logger.warning("⚠ insert_safe called without 'id'. Skipping.")
-            return
+    def _partition(self, key: str) -> Collection:
+        """A semester's fact collection ("enrollments:<semester>"), indexed on first use."""
+        if self.db is None:
+            raise errors.ConnectionFailure("MongoDB is not connected")
+        collection = self.db.get_collection(fact_partitions.collection_name(key))
+        if collection.name not in self._known_partitions:
+            if settings.MONGO_ENSURE_INDEXES:
+                ensure_partition_indexes(collection)
+            self._known_partitions.add(collection.name)
+        return collection
 
-        try:
-            collection.update_one(
-                {"id": data["id"]},
-                {"$set": data},
-                upsert=True
-            )
-        except Exception as e:
-            logger.error(f"❌ Mongo upsert failed: {e}")
+    def fact_partition_keys(self) -> list:
+        """Keys of every fact collection: the unpartitioned one, then one per semester seen."""
+        if self.db is None:
+            raise errors.ConnectionFailure("MongoDB is not connected")
+        keys = (fact_partitions.key_for_collection(name) for name in self.db.list_collection_names())
+        return [fact_partitions.FACTS] + sorted(k for k in keys if k is not None)
 
     # --------------------------------------------------------
-    # 🔁 SYNC HELPERS (SQL → Mongo)
+    # 🔁 UTILITY: BULK UPSERT
     # --------------------------------------------------------
-    def sync_course(self, course_dict):
-        """Sync a course from SQL to Mongo."""
-        self.insert_safe(self.courses, course_dict)
-
-    def sync_student(self, student_dict):
-        """Sync a student from SQL to Mongo."""
-        self.insert_safe(self.students, student_dict)
-
-    def sync_lecturer(self, lecturer_dict):
-        """Sync a lecturer from SQL to Mongo."""
-        self.insert_safe(self.lecturers, lecturer_dict)
-
-    def sync_enrollment(self, enr_dict):
-        """
-        Sync an enrollment record (Fact table).
-        This is what analytics uses.
-        """
-        self.insert_safe(self.enrollments, enr_dict)
+    def bulk_upsert(self, key: str, docs: list) -> list:
+        """Upsert many documents in unordered batches; returns per-batch results."""
+        buffer = MongoSyncBuffer(self)
+        for doc in docs:
+            buffer.upsert(key, doc, tag=doc["id"])
+        return buffer.flush()
 
 
 # --------------------------------------------------------
-# 🔥 EXPORT GLOBAL MONGO INSTANCE
+# 🔥 EXPORT GLOBAL MONGO INSTANCE (not connected until start()/connect())
 # --------------------------------------------------------
 mongo_db = MongoDB()
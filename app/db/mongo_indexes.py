@@ -0,0 +1,136 @@
+"""
+Declared MongoDB indexes for the analytics star schema.
+
+`ensure_indexes` creates them idempotently (MongoDB.connect calls it when
+MONGO_ENSURE_INDEXES is on); `report_indexes` logs declared indexes that are
+missing and existing ones that have not been used since the server started.
+
+Bootstrap / inspect by hand:
+    python -m app.db.mongo_indexes
+"""
+
+from pymongo import ASCENDING, DESCENDING, IndexModel, errors
+
+from app.core.logger import logger
+
+# Logical collection key (see MongoDB.COLLECTION_NAMES) → declared indexes.
+INDEX_SPECS = {
+    "students": [
+        IndexModel([("id", ASCENDING)], name="ux_id", unique=True),
+        IndexModel([("email", ASCENDING)], name="ix_email"),
+        IndexModel([("username", ASCENDING)], name="ix_username"),
+    ],
+    "courses": [
+        IndexModel([("id", ASCENDING)], name="ux_id", unique=True),
+        IndexModel([("code", ASCENDING)], name="ix_code"),
+    ],
+    "lecturers": [
+        IndexModel([("id", ASCENDING)], name="ux_id", unique=True),
+        IndexModel([("email", ASCENDING)], name="ix_email"),
+    ],
+    "enrollments": [
+        IndexModel([("id", ASCENDING)], name="ux_id", unique=True),
+        # Prefixes serve student_id-only and course_id-only lookups as well.
+        IndexModel([("student_id", ASCENDING), ("course_id", ASCENDING)], name="ix_student_course"),
+        # Cover the per-course / per-student $group pipelines (no document fetch):
+        # group key, the embedded attributes they report, then the grade.
+        IndexModel([("course_id", ASCENDING), ("course_title", ASCENDING), ("course_code", ASCENDING),
+                    ("grade", DESCENDING)], name="ix_course_facts"),
+        IndexModel([("student_id", ASCENDING), ("student_name", ASCENDING), ("student_email", ASCENDING),
+                    ("grade", DESCENDING)], name="ix_student_facts"),
+        # Lecturer renames fan out with update_many({"lecturer_id": …}).
+        IndexModel([("lecturer_id", ASCENDING)], name="ix_lecturer"),
+    ],
+    "course_gpa": [
+        IndexModel([("id", ASCENDING)], name="ux_id", unique=True),
+    ],
+    "student_gpa": [
+        IndexModel([("id", ASCENDING)], name="ux_id", unique=True),
+        # /students/me/gpa point read; students without an account have no username.
+        IndexModel([("username", ASCENDING)], name="ux_username", unique=True,
+                   partialFilterExpression={"username": {"$type": "string"}}),
+        # Top-k students is an index walk: sort by gpa desc, stop after k.
+        IndexModel([("gpa", DESCENDING)], name="ix_gpa"),
+    ],
+}
+
+
+def ensure_indexes(mongo) -> dict:
+    """
+    Create every declared index that does not exist yet.
+    Each index is created on its own so one conflict (e.g. duplicate ids
+    blocking a unique index) does not stop the others. Returns
+    {collection key: [index names that could not be created]}.
+    """
+    failed = {}
+    for key, models in _declared(mongo):
+        collection = mongo.collection_for(key)
+        for model in models:
+            try:
+                collection.create_indexes([model])
+            except errors.OperationFailure as exc:
+                name = model.document["name"]
+                failed.setdefault(key, []).append(name)
+                logger.error(f"❌ Could not create index {collection.name}.{name}: {exc}")
+    return failed
+
+
+def ensure_partition_indexes(collection) -> list:
+    """Create the fact-table indexes on one semester partition; returns the names that failed."""
+    failed = []
+    for model in INDEX_SPECS["enrollments"]:
+        try:
+            collection.create_indexes([model])
+        except errors.OperationFailure as exc:
+            failed.append(model.document["name"])
+            logger.error(f"❌ Could not create index {collection.name}.{model.document['name']}: {exc}")
+    return failed
+
+
+def report_indexes(mongo) -> dict:
+    """
+    Log declared-but-missing and existing-but-unused indexes per collection.
+    Usage counters come from $indexStats and reset when mongod restarts.
+    """
+    report = {}
+    for key, models in _declared(mongo):
+        collection = mongo.collection_for(key)
+        declared = {m.document["name"] for m in models}
+        existing = set(collection.index_information())
+        try:
+            stats = {s["name"]: s["accesses"]["ops"] for s in collection.aggregate([{"$indexStats": {}}])}
+        except errors.OperationFailure:
+            stats = {}
+
+        entry = {
+            "missing": sorted(declared - existing),
+            "unused": sorted(n for n, ops in stats.items() if ops == 0 and n != "_id_"),
+            "unmanaged": sorted(existing - declared - {"_id_"}),
+        }
+        report[collection.name] = entry
+
+        if entry["missing"]:
+            logger.warning(f"⚠ {collection.name}: missing indexes {entry['missing']}")
+        if entry["unused"]:
+            logger.info(f"📉 {collection.name}: unused indexes since server start {entry['unused']}")
+        if entry["unmanaged"]:
+            logger.info(f"ℹ {collection.name}: indexes not declared in INDEX_SPECS {entry['unmanaged']}")
+    return report
+
+
+def _declared(mongo):
+    """(collection key, indexes) for every declared collection and each semester fact partition."""
+    yield from INDEX_SPECS.items()
+    for key in mongo.fact_partition_keys()[1:]:
+        yield key, INDEX_SPECS["enrollments"]
+
+
+if __name__ == "__main__":
+    from app.db.mongo_db import mongo_db
+
+    mongo_db.connect()
+    if not mongo_db.connected:
+        raise SystemExit("MongoDB is not available.")
+    ensure_indexes(mongo_db)
+    for name, entry in report_indexes(mongo_db).items():
+        print(f"{name}: {entry}")
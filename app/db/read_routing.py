@@ -0,0 +1,94 @@
+# app/db/read_routing.py
+"""
+Where read-only requests get their SQL session from.
+
+Reads go to SQLALCHEMY_READ_REPLICA_URLS (round robin), or, with no replicas
+and a file SQLite database, to the read-only reader pool of the SQLite
+profile (app/db/sqlite_profile.py). A client that just wrote is pinned to
+the primary for READ_YOUR_WRITES_SECONDS so it never reads its own write
+from a lagging replica. The pin is per worker process.
+
+Sessions on a separate read engine are marked (`replica(engine)`), so
+caches can tell a possibly lagging read from a primary one (`from_replica`).
+"""
+
+import threading
+import time
+from typing import List, Optional
+
+from fastapi import Request
+from jose import jwt
+from sqlalchemy.engine import make_url
+
+from app.config import settings
+
+REPLICA = "replica_read"   # execution option on the read engines (see replica)
+
+
+def read_database_urls(primary_url: str) -> List[str]:
+    """Replica URLs, the local read-only SQLite URL, or [] (reads use the primary)."""
+    replicas = [u.strip() for u in settings.SQLALCHEMY_READ_REPLICA_URLS.split(",") if u.strip()]
+    if replicas:
+        return replicas
+    if settings.SQLITE_PROFILE and settings.SQLITE_READ_ONLY_READER and sqlite_file(primary_url):
+        parsed = make_url(primary_url)
+        return [parsed.set(database=f"file:{parsed.database}", query={"mode": "ro", "uri": "true"})
+                .render_as_string(hide_password=False)]
+    return []
+
+
+def sqlite_file(url: str) -> bool:
+    parsed = make_url(url)
+    return parsed.get_backend_name() == "sqlite" and parsed.database not in (None, "", ":memory:")
+
+
+def replica(engine):
+    """`engine` (sync or async) marked as a read engine that may lag the primary."""
+    return engine.execution_options(**{REPLICA: True})
+
+
+def from_replica(session) -> bool:
+    """Whether a sync Session (also the one inside an AsyncSession's run_sync) reads from a read engine."""
+    return bool(session.get_bind().get_execution_options().get(REPLICA))
+
+
+def client_key(request: Request) -> Optional[str]:
+    """
+    Who is asking: the token subject, else the client address. The token is
+    not verified here (routing only; the route's auth dependency still is).
+    """
+    auth = request.headers.get("authorization", "")
+    if auth.lower().startswith("bearer "):
+        try:
+            return "user:" + str(jwt.get_unverified_claims(auth[7:])["sub"])
+        except Exception:
+            pass
+    return "addr:" + request.client.host if request.client else None
+
+
+class RecentWrites:
+    """Clients that wrote in the last `window` seconds (pruned lazily)."""
+
+    def __init__(self, window: float):
+        self.window = window
+        self._until = {}   # client key → monotonic deadline
+        self._lock = threading.Lock()
+
+    def mark(self, key: Optional[str]):
+        if key is None or self.window <= 0:
+            return
+        now = time.monotonic()
+        with self._lock:
+            self._until[key] = now + self.window
+            if len(self._until) > 10000:
+                self._until = {k: t for k, t in self._until.items() if t > now}
+
+    def pinned(self, key: Optional[str]) -> bool:
+        return key is not None and self._until.get(key, 0) > time.monotonic()
+
+
+recent_writes = RecentWrites(settings.READ_YOUR_WRITES_SECONDS)
+
+
+def use_primary(request: Request) -> bool:
+    return recent_writes.pinned(client_key(request))
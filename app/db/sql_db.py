@@ -1,6 +1,11 @@
+import itertools
+
+from fastapi import Request
 from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker, declarative_base
 from app.config import settings
+from app.db.read_routing import read_database_urls, replica, use_primary
+from app.db.sqlite_profile import READER, WRITER, apply_profile, pool_options, read_only
 
 # Load from environment variables
 SQLALCHEMY_DATABASE_URL = settings.SQLALCHEMY_DATABASE_URL
@@ -8,11 +13,39 @@ SQLALCHEMY_DATABASE_URL = settings.SQLALCHEMY_DATABASE_URL
 # Create SQLAlchemy engine
 engine = create_engine(
     SQLALCHEMY_DATABASE_URL,
-    connect_args={"check_same_thread": False} if SQLALCHEMY_DATABASE_URL.startswith("sqlite") else {}
+    connect_args={"check_same_thread": False} if SQLALCHEMY_DATABASE_URL.startswith("sqlite") else {},
+    **pool_options(SQLALCHEMY_DATABASE_URL, WRITER),
 )
+apply_profile(engine, WRITER)   # SQLite file: single writer, WAL, pragmas (app/db/sqlite_profile.py)
+
+# Session factory. Objects stay loaded after commit: services return what
+# they just wrote without a refresh SELECT per entity.
+SessionLocal = sessionmaker(autocommit=False, autoflush=False, expire_on_commit=False, bind=engine)
+# Reads on the primary (SQLite: no write lock taken for them)
+PrimaryReadSessionLocal = sessionmaker(autocommit=False, autoflush=False, expire_on_commit=False,
+                                       bind=read_only(engine))
+
+# 📖 Read engines (replicas, or a read-only connection to the SQLite file); the primary when none
+READ_DATABASE_URLS = read_database_urls(SQLALCHEMY_DATABASE_URL)
+read_engines = [
+    create_engine(url, connect_args={"check_same_thread": False} if url.startswith("sqlite") else {},
+                  **pool_options(url, READER))
+    for url in READ_DATABASE_URLS
+] or [engine]
+for read_engine in READ_DATABASE_URLS and read_engines:
+    apply_profile(read_engine, READER)
+
+_read_factories = itertools.cycle([
+    sessionmaker(autocommit=False, autoflush=False, expire_on_commit=False,
+                 bind=read_only(e) if e is engine else replica(e))
+    for e in read_engines
+])
+
+
+def ReadSessionLocal():
+    """Session on the next read engine (round robin). Never write through it."""
+    return next(_read_factories)()
 
-# Session factory
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
 # Base class
 Base = declarative_base()
@@ -24,3 +57,15 @@ def get_db():
         yield db
     finally:
         db.close()
+
+
+def get_read_db(request: Request):
+    """
+    Dependency for read-only routes: a replica session, or the primary for a
+    client that wrote within READ_YOUR_WRITES_SECONDS.
+    """
+    db = PrimaryReadSessionLocal() if use_primary(request) else ReadSessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
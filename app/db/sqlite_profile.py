@@ -0,0 +1,163 @@
+# app/db/sqlite_profile.py
+"""
+Storage profile for a file-backed SQLite database.
+
+Applied through engine events, so every connection gets it:
+
+    writer  one connection per engine (queued checkout instead of "database
+            is locked"), WAL, SQLITE_SYNCHRONOUS, BEGIN IMMEDIATE so the write
+            lock is taken up front and waited for via busy_timeout
+    reader  a pool of read-only connections (SQLITE_READER_POOL_SIZE) that
+            read the last committed snapshot while the writer works
+
+The sync and async engines each have their own writer connection (and so
+does every worker process): the pool only queues writers within one
+engine, and across them SQLite's write lock does, BEGIN IMMEDIATE waiting
+up to SQLITE_BUSY_TIMEOUT_MS for it. Keep write transactions short; a
+writer that waits longer than that fails with "database is locked".
+
+Reads that go to the primary anyway (a client pinned by read-your-writes)
+use `read_only(engine)`: the same writer pool, but a plain deferred BEGIN
+that takes no write lock.
+
+Both get cache_size / mmap_size / busy_timeout / temp_store. With
+SQLITE_CHECKPOINT_INTERVAL > 0, WAL checkpoints move off the commit path into
+`wal_checkpointer`, a background thread that also truncates a WAL grown past
+SQLITE_WAL_TRUNCATE_MB.
+"""
+
+import os
+import sqlite3
+import threading
+
+from sqlalchemy import event
+from sqlalchemy.engine import make_url
+
+from app.config import settings
+from app.core.logger import logger
+from app.db.read_routing import sqlite_file
+
+WRITER = "writer"
+READER = "reader"
+
+READ_ONLY = "sqlite_read_only"   # execution option: deferred BEGIN on the writer (see read_only)
+
+
+def profiled(url: str) -> bool:
+    return settings.SQLITE_PROFILE and sqlite_file(url)
+
+
+def pool_options(url: str, role: str) -> dict:
+    """Pool kwargs for create_engine / create_async_engine."""
+    if not profiled(url):
+        return {}
+    if role == WRITER:
+        return {"pool_size": 1, "max_overflow": 0, "pool_timeout": settings.SQLITE_WRITER_POOL_TIMEOUT}
+    return {"pool_size": settings.SQLITE_READER_POOL_SIZE, "max_overflow": 0}
+
+
+def read_only(engine):
+    """`engine` (sync or async) for read-only sessions: same pool, no write lock taken up front."""
+    return engine.execution_options(**{READ_ONLY: True})
+
+
+def apply_profile(engine, role: str):
+    """Register the connect / begin hooks on a sync Engine (or AsyncEngine.sync_engine)."""
+    if not profiled(engine.url.render_as_string(hide_password=False)):
+        return
+    event.listen(engine, "connect", _writer_connect if role == WRITER else _reader_connect)
+    if role == WRITER:
+        event.listen(engine, "begin", _begin)
+
+
+def _pragmas(dbapi_conn, statements):
+    cursor = dbapi_conn.cursor()
+    for statement in statements:
+        cursor.execute(statement)
+    cursor.close()
+
+
+def _shared_pragmas():
+    return [
+        f"PRAGMA cache_size = -{settings.SQLITE_CACHE_SIZE_KB}",   # negative = KiB
+        f"PRAGMA mmap_size = {settings.SQLITE_MMAP_SIZE}",
+        f"PRAGMA busy_timeout = {settings.SQLITE_BUSY_TIMEOUT_MS}",
+        "PRAGMA temp_store = MEMORY",
+    ]
+
+
+def _writer_connect(dbapi_conn, _record):
+    statements = [
+        "PRAGMA journal_mode = WAL",
+        f"PRAGMA synchronous = {settings.SQLITE_SYNCHRONOUS}",
+        *_shared_pragmas(),
+    ]
+    if settings.SQLITE_CHECKPOINT_INTERVAL > 0:
+        statements.append("PRAGMA wal_autocheckpoint = 0")   # wal_checkpointer does it
+    _pragmas(dbapi_conn, statements)
+    # The driver's implicit BEGIN is deferred; _begin_immediate issues our own.
+    dbapi_conn.isolation_level = None
+
+
+def _reader_connect(dbapi_conn, _record):
+    _pragmas(dbapi_conn, _shared_pragmas())
+
+
+def _begin(conn):
+    conn.exec_driver_sql("BEGIN" if conn.get_execution_options().get(READ_ONLY) else "BEGIN IMMEDIATE")
+
+
+class WalCheckpointer:
+    """Checkpoints the WAL every SQLITE_CHECKPOINT_INTERVAL seconds in a daemon thread."""
+
+    def __init__(self, url: str = None):
+        self.url = url or settings.SQLALCHEMY_DATABASE_URL
+        self._thread = None
+        self._stop = threading.Event()
+        self.checkpoints = 0
+        self.truncations = 0
+
+    def start(self):
+        if settings.SQLITE_CHECKPOINT_INTERVAL <= 0 or not profiled(self.url):
+            return
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="wal-checkpointer", daemon=True)
+        self._thread.start()
+        logger.info(f"🪶 WAL checkpoint every {settings.SQLITE_CHECKPOINT_INTERVAL}s.")
+
+    def stop(self):
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout=5)
+            self._thread = None
+            self.checkpoint()   # leave a short WAL behind
+
+    def checkpoint(self):
+        """One pass: PASSIVE (never blocks writers), TRUNCATE when the WAL got large."""
+        path = make_url(self.url).database
+        if not os.path.exists(path):
+            return
+        conn = sqlite3.connect(path, timeout=settings.SQLITE_BUSY_TIMEOUT_MS / 1000)
+        try:
+            mode = "PASSIVE"
+            wal = path + "-wal"
+            if os.path.exists(wal) and os.path.getsize(wal) > settings.SQLITE_WAL_TRUNCATE_MB * 1024 * 1024:
+                mode = "TRUNCATE"   # waits for readers, then resets the file to 0 bytes
+            busy, _, _ = conn.execute(f"PRAGMA wal_checkpoint({mode})").fetchone()
+            self.checkpoints += 1
+            if mode == "TRUNCATE" and not busy:
+                self.truncations += 1
+        finally:
+            conn.close()
+
+    def _run(self):
+        while not self._stop.wait(settings.SQLITE_CHECKPOINT_INTERVAL):
+            try:
+                self.checkpoint()
+            except Exception:
+                logger.exception("WAL checkpoint failed")
+
+
+wal_checkpointer = WalCheckpointer()
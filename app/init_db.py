@@ -1,6 +1,6 @@
-from app.db.sql_db import Base, engine
-from app.models.sqlalchemy_models import UserModel
+from app.db.migrations import migrate
+from app.db.sql_db import engine
 
-print("Creating tables…")
-Base.metadata.create_all(bind=engine)
+print("Applying schema migrations…")
+migrate(engine)
 print("✅ Done")
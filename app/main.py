@@ -1,20 +1,39 @@
 # app/main.py
 
-from fastapi import FastAPI
-from sqlalchemy import inspect
-from app.db.sql_db import Base, engine
-
-# ⚠️ Import all SQLAlchemy models so metadata recognizes them
-from app.models.sqlalchemy_models import (
-    UserModel,
-    Course,
-    Student,
-    Lecturer,
-    Enrollment,
-)
+# ⏱ Imported first so the breakdown covers the whole boot
+from app.core.startup import startup_timer
+
+with startup_timer.phase("settings"):
+    from app.config import settings  # validates env on import
+
+with startup_timer.phase("imports"):
+    from fastapi import FastAPI, Request
+    from app.core.logger import logger
+    from app.core import query_counter
+    from app.db.sql_db import engine, read_engines
+    from app.db.async_db import async_engine, async_read_engines
+    from app.db.read_routing import client_key, recent_writes
+    from app.db.sqlite_profile import wal_checkpointer
+    from app.db.migrations import migrate, pending_migrations
 
-# from app.db.mongo_db import mongo_client  # (optional, for analytics)
-from app.api.v1 import auth, students, courses, lecturers, analytics
+    # ⚠️ Import all SQLAlchemy models so metadata recognizes them
+    from app.models.sqlalchemy_models import (
+        UserModel,
+        Course,
+        Student,
+        Lecturer,
+        Enrollment,
+        OutboxEvent,
+        EtlCheckpoint,
+    )
+    from app.db.mongo_db import mongo_db
+    from app.services.outbox_dispatcher import outbox_dispatcher
+    from app.services.etl_sync import etl_scheduler
+    from app.services.result_cache import shutdown_refresher
+    from app.services.snapshot_service import snapshot_job, snapshot_store
+    from app.repositories.columnar_analytics_repo import columnar_analytics
+
+    from app.api.v1 import auth, students, courses, lecturers, enrollments, analytics, export, metrics
 
 app = FastAPI(
     title="School Management API",
@@ -26,21 +45,129 @@ app = FastAPI(
 )
 
 
+if settings.QUERY_COUNT_HEADER:
+    for counted in {engine, async_engine.sync_engine, *read_engines, *(e.sync_engine for e in async_read_engines)}:
+        query_counter.install(counted)
+
+    @app.middleware("http")
+    async def count_queries(request: Request, call_next):
+        """Report how many SQL statements the request issued (round-trip budget checks)."""
+        with query_counter.QueryCounter() as counter:
+            response = await call_next(request)
+        response.headers["X-Query-Count"] = str(counter.count)
+        return response
+
+
+if read_engines != [engine]:
+    @app.middleware("http")
+    async def pin_recent_writers(request: Request, call_next):
+        """Read-your-writes: after a successful write the client reads from the primary for a while."""
+        response = await call_next(request)
+        if request.method not in ("GET", "HEAD", "OPTIONS") and response.status_code < 400:
+            recent_writes.mark(client_key(request))
+        return response
+
+
+@app.on_event("startup")
+def connect_mongo():
+    """Verify MongoDB in the background; requests are served from SQL until it is up."""
+    with startup_timer.phase("mongo connect"):
+        mongo_db.start()
+
+
 @app.on_event("startup")
 def create_tables():
-    """Ensure database tables exist when the app starts."""
-    print("🔧 Checking existing tables …")
-    inspector = inspect(engine)
+    """Check that the schema is migrated (migrations themselves run at deploy time)."""
+    with startup_timer.phase("sql schema"):
+        check_schema()
+
+
+def check_schema():
+    print("🔧 Checking schema version …")
     try:
-        existing_tables = inspector.get_table_names()
-        if existing_tables:
-            print(f"✅ Existing tables found: {existing_tables}")
+        pending = pending_migrations(engine)
+        if not pending:
+            print("✅ Schema is up to date.")
+        elif settings.MIGRATE_ON_STARTUP:
+            migrate(engine)
         else:
-            print("🆕 No tables found — creating schema …")
-            Base.metadata.create_all(bind=engine)
-            print("✅ Tables created successfully!")
+            logger.warning(
+                f"⚠ {len(pending)} pending schema migration(s) "
+                f"({', '.join(m.version for m in pending)}); run `python -m app.db.migrations`."
+            )
     except Exception as e:
-        print(f"⚠️ Skipping table creation due to: {e}")
+        print(f"⚠️ Skipping schema check due to: {e}")
+
+
+@app.on_event("startup")
+def start_outbox_dispatcher():
+    """Start draining the SQL → Mongo sync outbox in the background."""
+    outbox_dispatcher.start()
+
+
+@app.on_event("shutdown")
+def stop_outbox_dispatcher():
+    """Flush pending Mongo sync events before the worker exits."""
+    outbox_dispatcher.stop(flush=True)
+
+
+@app.on_event("startup")
+def start_etl_scheduler():
+    """Run incremental SQL → Mongo ETL periodically if ETL_INTERVAL_SECONDS is set."""
+    etl_scheduler.start()
+
+
+@app.on_event("shutdown")
+def stop_etl_scheduler():
+    etl_scheduler.stop()
+
+
+@app.on_event("startup")
+def start_snapshot_job():
+    """Rebuild the Parquet / Arrow snapshot periodically if SNAPSHOT_INTERVAL_SECONDS is set."""
+    snapshot_job.start()
+
+
+@app.on_event("shutdown")
+def stop_snapshot_job():
+    snapshot_job.stop()
+    snapshot_store.close()
+
+
+@app.on_event("shutdown")
+def stop_result_refresher():
+    """Let in-flight stale-while-revalidate refreshes finish before engines are disposed."""
+    shutdown_refresher()
+
+
+@app.on_event("startup")
+def start_wal_checkpointer():
+    """SQLite file databases: checkpoint the WAL in the background (SQLITE_CHECKPOINT_INTERVAL)."""
+    wal_checkpointer.start()
+
+
+@app.on_event("shutdown")
+def stop_wal_checkpointer():
+    wal_checkpointer.stop()
+
+
+@app.on_event("startup")
+def warm_columnar_analytics():
+    """Load the in-process analytics arrays in the background when that engine is selected."""
+    if settings.ANALYTICS_BACKEND == "columnar":
+        columnar_analytics.reload_in_background()
+
+
+@app.on_event("shutdown")
+async def close_async_engine():
+    for async_db_engine in {async_engine, *async_read_engines}:
+        await async_db_engine.dispose()
+
+
+@app.on_event("startup")
+def log_startup_time():
+    """Registered last: logs the per-phase cold-start breakdown."""
+    startup_timer.log_summary()
 
 
 # 🔗 Include routers
@@ -49,16 +176,20 @@ app.include_router(auth.router)
 app.include_router(students.router)
 app.include_router(courses.router)
 app.include_router(lecturers.router)
+app.include_router(enrollments.router)
 app.include_router(analytics.router)
+app.include_router(export.router)
+app.include_router(metrics.router)
 
 
 # 🌍 Basic public routes
+# async: answered on the event loop even when every threadpool slot is busy
 @app.get("/", tags=["Root"])
-def root():
+async def root():
     return {"message": "Welcome to School Management API 🚀"}
 
 
 @app.get("/healthz", tags=["Health"])
-def health_check():
-    """Simple health check for Railway / UptimeRobot."""
-    return {"status": "ok", "service": "school-management-api"}
+async def health_check():
+    """Simple health check for Railway / UptimeRobot. Never waits on MongoDB."""
+    return {"status": "ok", "service": "school-management-api", "mongo": mongo_db.status}
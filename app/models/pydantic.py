@@ -1,7 +1,9 @@
 # app/models/pydantic.py
 
 from pydantic import BaseModel, EmailStr
-from typing import Optional
+from typing import Generic, List, Optional, TypeVar
+
+T = TypeVar("T")
 
 
 # ============================
@@ -131,6 +133,7 @@ class EnrollmentBase(BaseModel):
     student_id: int
     course_id: int
     grade: Optional[float] = None
+    semester: Optional[str] = None   # defaults to the course's semester
 
     model_config = {"from_attributes": True}
 
@@ -141,6 +144,7 @@ class EnrollmentCreate(EnrollmentBase):
 
 class EnrollmentUpdate(BaseModel):
     grade: Optional[float] = None
+    semester: Optional[str] = None
 
 
 class EnrollmentOut(EnrollmentBase):
@@ -149,6 +153,40 @@ class EnrollmentOut(EnrollmentBase):
     model_config = {"from_attributes": True}
 
 
+# ============================
+# PAGINATION
+# ============================
+
+class Page(BaseModel, Generic[T]):
+    """One page of a keyset-paginated list; pass `next_cursor` as `after`."""
+    items: List[T]
+    next_cursor: Optional[str] = None
+
+
+# ============================
+# BULK CREATE
+# ============================
+
+class BulkRowResult(BaseModel):
+    row: int                       # position in the submitted array
+    status: str                    # "created" | "error"
+    id: Optional[int] = None
+    error: Optional[str] = None
+
+
+class BulkResult(BaseModel):
+    created: int
+    failed: int
+    results: List[BulkRowResult]
+
+
+class GradeImportResult(BaseModel):
+    created: int                   # enrollments added (create_missing=true only)
+    updated: int
+    failed: int
+    errors: List[BulkRowResult]    # first GRADE_IMPORT_MAX_ERRORS rejected rows
+
+
 # ============================
 # ANALYTICS SCHEMAS
 # ============================
@@ -1,5 +1,8 @@
 # app/models/sqlalchemy_models.py
-from sqlalchemy import Column, Integer, String, ForeignKey, Float
+import json
+from datetime import datetime
+
+from sqlalchemy import Column, Integer, String, ForeignKey, Float, Text, DateTime, Index
 from sqlalchemy.orm import relationship
 from app.db.sql_db import Base
 
@@ -16,7 +19,7 @@ class UserModel(Base):
     role = Column(String, default="student")
 
     # One-to-one relationship with Student (optional)
-    student_id = Column(Integer, ForeignKey("students.id"), nullable=True)
+    student_id = Column(Integer, ForeignKey("students.id"), nullable=True, index=True)
     student = relationship("Student", back_populates="user", uselist=False)
 
 
@@ -32,6 +35,7 @@ class Student(Base):
     gender = Column(String)
     email = Column(String, unique=True)
     username = Column(String, unique=True, nullable=True)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, index=True)
 
     # Relationship back to User
     user = relationship("UserModel", back_populates="student", uselist=False)
@@ -60,10 +64,19 @@ class Lecturer(Base):
     name = Column(String, nullable=False)
     department = Column(String, nullable=True)
     email = Column(String, unique=True, nullable=False)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, index=True)
 
     # One-to-many: a lecturer can teach multiple courses
     courses = relationship("Course", back_populates="lecturer", cascade="all, delete-orphan")
 
+    def as_dict(self):
+        return {
+            "id": self.id,
+            "name": self.name,
+            "department": self.department,
+            "email": self.email,
+        }
+
 
 # ===========================
 #   COURSES TABLE
@@ -75,7 +88,8 @@ class Course(Base):
     title = Column(String, nullable=False)
     code = Column(String, unique=True, nullable=False)
     semester = Column(String, nullable=False)
-    lecturer_id = Column(Integer, ForeignKey("lecturers.id"), nullable=True)
+    lecturer_id = Column(Integer, ForeignKey("lecturers.id"), nullable=True, index=True)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, index=True)
 
     # Relationship back to Lecturer
     lecturer = relationship("Lecturer", back_populates="courses")
@@ -83,18 +97,78 @@ class Course(Base):
     # Relationship to Enrollments
     enrollments = relationship("Enrollment", back_populates="course", cascade="all, delete-orphan")
 
+    def as_dict(self):
+        return {
+            "id": self.id,
+            "title": self.title,
+            "code": self.code,
+            "semester": self.semester,
+            "lecturer_id": self.lecturer_id,
+        }
+
 
 # ===========================
 #   ENROLLMENTS TABLE
 # ===========================
 class Enrollment(Base):
     __tablename__ = "enrollments"
+    # Index changes also need a migration in app/db/migrations.py.
+    __table_args__ = (
+        Index("ux_enrollments_student_course", "student_id", "course_id", unique=True),
+        # Covering indexes for the SQL analytics GROUP BYs (app/repositories/sql_analytics_repo.py);
+        # their prefixes also serve course_id-only / student_id-only lookups.
+        Index("ix_enrollments_course_grade", "course_id", "grade"),
+        Index("ix_enrollments_student_grade", "student_id", "grade"),
+        # The same reports for one semester: an index range per semester (partition pruning).
+        Index("ix_enrollments_semester_course_grade", "semester", "course_id", "grade"),
+        Index("ix_enrollments_semester_student_grade", "semester", "student_id", "grade"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     student_id = Column(Integer, ForeignKey("students.id"), nullable=False)
     course_id = Column(Integer, ForeignKey("courses.id"), nullable=False)
     grade = Column(Float, nullable=True)
+    # Term the enrollment counts towards; defaults to the course's semester on insert.
+    semester = Column(String, nullable=True)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, index=True)
 
     # Relationships
     student = relationship("Student", back_populates="enrollments")
     course = relationship("Course", back_populates="enrollments")
+
+
+# ===========================
+#   SYNC OUTBOX (SQL → Mongo)
+# ===========================
+class OutboxEvent(Base):
+    """
+    A pending Mongo write, inserted in the same transaction as the SQL change
+    it mirrors and drained asynchronously by the outbox dispatcher.
+    """
+    __tablename__ = "sync_outbox"
+
+    id = Column(Integer, primary_key=True, index=True)
+    collection = Column(String, nullable=False)   # key in MongoDB.COLLECTION_NAMES
+    op = Column(String, nullable=False)           # upsert | delete | inc | rebuild
+    doc_id = Column(Integer, nullable=False)
+    payload = Column(Text, nullable=True)         # JSON document for upserts
+    status = Column(String, nullable=False, default="pending", index=True)  # pending | dead
+    attempts = Column(Integer, nullable=False, default=0)
+    last_error = Column(Text, nullable=True)
+    created_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+
+    def document(self):
+        return json.loads(self.payload) if self.payload else None
+
+
+# ===========================
+#   ETL CHECKPOINTS
+# ===========================
+class EtlCheckpoint(Base):
+    """High-water mark of the last successful SQL → Mongo ETL run per entity."""
+    __tablename__ = "etl_checkpoints"
+
+    entity = Column(String, primary_key=True)
+    high_water_mark = Column(DateTime, nullable=True)
+    rows_synced = Column(Integer, nullable=False, default=0)
+    last_run_at = Column(DateTime, nullable=True)
@@ -1,102 +1,105 @@
 # app/repositories/analytics_repo.py
 
-from app.db.mongo_db import (
-    students_col,
-    courses_col,
-    lecturers_col,
-    facts_col
-)
+from typing import Sequence
+
+from pymongo.collection import Collection
 
 
 class AnalyticsRepository:
+    """
+    Analytics over the factEnrollments collection alone.
+
+    Facts embed their course / student attributes (app/services/fact_documents.py),
+    so every report is one $group scan with no $lookup. Sorting on the group
+    key first lets MongoDB walk ix_course_facts / ix_student_facts, which hold
+    every field the pipelines read (covered: no document fetch).
+
+    `facts` is one semester partition, or the unpartitioned collection with
+    the partitions in `union` appended by $unionWith (all semesters).
+    """
+
+    def __init__(self, facts: Collection, union: Sequence[str] = ()):
+        self.facts = facts
+        self.union = list(union)
+
+    def _aggregate(self, pipeline: list) -> list:
+        return list(self.facts.aggregate([{"$unionWith": name} for name in self.union] + pipeline))
 
     # 📌 1. Average GPA per course
     def get_average_gpa(self):
         pipeline = [
+            {"$sort": {"course_id": 1}},
             {
                 "$group": {
                     "_id": "$course_id",
+                    "course_name": {"$first": "$course_title"},
+                    "course_code": {"$first": "$course_code"},
                     "avg_gpa": {"$avg": "$grade"},
                     "count": {"$sum": 1}
                 }
             },
-            {
-                "$lookup": {
-                    "from": courses_col.name,
-                    "localField": "_id",
-                    "foreignField": "sql_id",
-                    "as": "course"
-                }
-            },
-            {"$unwind": "$course"},
             {
                 "$project": {
-                    "course_name": "$course.title",
-                    "course_code": "$course.code",
+                    "_id": 0,
+                    "course_id": "$_id",
+                    "course_name": 1,
+                    "course_code": 1,
                     "avg_gpa": 1,
                     "count": 1
                 }
             }
         ]
 
-        return list(facts_col.aggregate(pipeline))
+        return self._aggregate(pipeline)
 
     # 📌 2. Top Students by GPA
     def get_top_students(self, limit: int = 5):
         pipeline = [
+            {"$sort": {"student_id": 1}},
             {
                 "$group": {
                     "_id": "$student_id",
+                    "name": {"$first": "$student_name"},
+                    "email": {"$first": "$student_email"},
                     "gpa": {"$avg": "$grade"}
                 }
             },
-            {
-                "$lookup": {
-                    "from": students_col.name,
-                    "localField": "_id",
-                    "foreignField": "sql_id",
-                    "as": "student"
-                }
-            },
-            {"$unwind": "$student"},
             {"$sort": {"gpa": -1}},
             {"$limit": limit},
             {
                 "$project": {
-                    "name": "$student.name",
-                    "email": "$student.email",
+                    "_id": 0,
+                    "student_id": "$_id",
+                    "name": 1,
+                    "email": 1,
                     "gpa": 1
                 }
             }
         ]
 
-        return list(facts_col.aggregate(pipeline))
+        return self._aggregate(pipeline)
 
     # 📌 3. Course Enrollment Count
     def get_course_enrollments(self):
         pipeline = [
+            {"$sort": {"course_id": 1}},
             {
                 "$group": {
                     "_id": "$course_id",
+                    "course_name": {"$first": "$course_title"},
+                    "course_code": {"$first": "$course_code"},
                     "enrollment_count": {"$sum": 1}
                 }
             },
-            {
-                "$lookup": {
-                    "from": courses_col.name,
-                    "localField": "_id",
-                    "foreignField": "sql_id",
-                    "as": "course"
-                }
-            },
-            {"$unwind": "$course"},
             {
                 "$project": {
-                    "course_name": "$course.title",
-                    "course_code": "$course.code",
+                    "_id": 0,
+                    "course_id": "$_id",
+                    "course_name": 1,
+                    "course_code": 1,
                     "enrollment_count": 1
                 }
             }
         ]
 
-        return list(facts_col.aggregate(pipeline))
+        return self._aggregate(pipeline)
@@ -0,0 +1,430 @@
+# app/repositories/columnar_analytics_repo.py
+
+import heapq
+import math
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+from sqlalchemy import select
+
+from app.config import settings
+from app.core.logger import logger
+from app.db.sql_db import ReadSessionLocal
+from app.models.sqlalchemy_models import Course, Enrollment, Student
+
+
+class ColumnarAnalyticsRepository:
+    """
+    In-process analytics engine over enrollments held as NumPy columns:
+
+        ids (int32, sorted) | student_id (int32) | course_id (int32) | grade (float32, NaN = ungraded)
+        | semester (int16 code, 0 = none)
+
+    Per-course and per-student aggregates (grade sum, graded count,
+    enrollment count) are built once with np.bincount and then kept current
+    row by row, so every report is a handful of vector ops over
+    O(courses) / O(students) — no aggregation round trip. A report for one
+    semester bincounts that semester's rows only (one mask over the column).
+
+    Grades are float32, so averages are rounded to 6 decimals on the way out.
+    Row operations (upsert / delete by enrollment id) are idempotent: applying
+    a write the last load already saw changes nothing, which makes it safe to
+    apply them after commit without coordinating with a concurrent reload.
+    Writes made by other processes are only picked up by a reload
+    (COLUMNAR_REFRESH_SECONDS).
+    """
+
+    def __init__(self, session_factory=ReadSessionLocal):
+        self.session_factory = session_factory
+        self._lock = threading.RLock()
+        self._reloading = None      # thread running a background reload
+        self._journal = None        # row ops seen while that reload runs
+        self.loaded_at = None
+        self._semester_codes = {None: 0}
+        self._install(*self._empty())
+
+    # --------------------------------------------------------
+    # Loading
+    # --------------------------------------------------------
+    @staticmethod
+    def _empty():
+        return (np.empty(0, np.int32), np.empty(0, np.int32), np.empty(0, np.int32),
+                np.empty(0, np.float32), {}, np.empty(0, np.int16))
+
+    @property
+    def loaded(self) -> bool:
+        return self.loaded_at is not None
+
+    def ensure_loaded(self):
+        """Load on first use; afterwards refresh in the background when stale."""
+        if not self.loaded:
+            warming = self._reloading
+            if warming is not None:
+                warming.join()  # startup warm-up already on its way
+            with self._lock:
+                if not self.loaded:
+                    self.load()
+            return
+        refresh = settings.COLUMNAR_REFRESH_SECONDS
+        if refresh > 0 and time.monotonic() - self.loaded_at > refresh:
+            self.reload_in_background()
+
+    def load(self):
+        """(Re)build the columns from COLUMNAR_SOURCE ("sql" or "mongo")."""
+        started = time.perf_counter()
+        with self._lock:
+            self._journal = []
+        try:
+            columns = self._read_mongo() if settings.COLUMNAR_SOURCE == "mongo" else self._read_sql()
+        except Exception:
+            with self._lock:
+                self._journal = None
+            raise
+        with self._lock:
+            journal, self._journal = self._journal, None
+            self.load_arrays(*columns)
+            for op, args in journal:  # writes committed while we were reading
+                getattr(self, op)(*args)
+        stats = self.stats()
+        logger.info(
+            f"🧮 Columnar analytics loaded {stats['enrollments']} enrollments "
+            f"({stats['bytes'] / 1e6:.1f} MB) in {time.perf_counter() - started:.2f}s"
+        )
+
+    def reload_in_background(self):
+        with self._lock:
+            if self._reloading is not None and self._reloading.is_alive():
+                return
+            self._reloading = threading.Thread(target=self._safe_reload, name="columnar-reload", daemon=True)
+            self._reloading.start()
+
+    def _safe_reload(self):
+        try:
+            self.load()
+        except Exception:
+            if not self.loaded:
+                # nothing to serve yet: stay unloaded so the next report retries (and raises) in ensure_loaded
+                logger.exception("Columnar analytics initial load failed; retrying on the next report")
+                return
+            logger.exception("Columnar analytics reload failed; serving the previous snapshot")
+            self.loaded_at = time.monotonic()  # don't retry on every request
+
+    def _read_sql(self):
+        db = self.session_factory()
+        try:
+            chunks = []
+            stmt = (
+                select(Enrollment.id, Enrollment.student_id, Enrollment.course_id, Enrollment.grade,
+                       Enrollment.semester)
+                .order_by(Enrollment.id)
+                .execution_options(yield_per=settings.ETL_CHUNK_SIZE)
+            )
+            for rows in db.execute(stmt).partitions():
+                chunks.append(list(zip(*rows)))
+            labels = {cid: (title, code) for cid, title, code in db.execute(select(Course.id, Course.title, Course.code))}
+        finally:
+            db.close()
+        return self._columns(chunks) + (labels, [s for c in chunks for s in c[4]])
+
+    def _read_mongo(self):
+        from app.db.mongo_db import mongo_db
+
+        courses = mongo_db.collection_for("courses")
+        chunks, batch = [], []
+        projection = {"_id": 0, "id": 1, "student_id": 1, "course_id": 1, "grade": 1, "semester": 1}
+        # Every semester partition in id order (each sorted by id, merged as they stream).
+        cursors = [
+            mongo_db.collection_for(key).find({}, projection).sort("id", 1).batch_size(settings.ETL_CHUNK_SIZE)
+            for key in mongo_db.fact_partition_keys()
+        ]
+        for doc in heapq.merge(*cursors, key=lambda d: d["id"]):
+            batch.append((doc["id"], doc["student_id"], doc["course_id"], doc.get("grade"), doc.get("semester")))
+            if len(batch) >= settings.ETL_CHUNK_SIZE:
+                chunks.append(list(zip(*batch)))
+                batch = []
+        if batch:
+            chunks.append(list(zip(*batch)))
+        labels = {
+            d["id"]: (d.get("title"), d.get("code"))
+            for d in courses.find({"deleted": {"$ne": True}}, {"_id": 0, "id": 1, "title": 1, "code": 1})
+        }
+        return self._columns(chunks) + (labels, [s for c in chunks for s in c[4]])
+
+    @staticmethod
+    def _columns(chunks):
+        if not chunks:
+            return ColumnarAnalyticsRepository._empty()[:4]
+        return (
+            np.concatenate([np.asarray(c[0], np.int32) for c in chunks]),
+            np.concatenate([np.asarray(c[1], np.int32) for c in chunks]),
+            np.concatenate([np.asarray(c[2], np.int32) for c in chunks]),
+            np.concatenate([np.asarray(c[3], np.float32) for c in chunks]),  # None → NaN
+        )
+
+    def load_arrays(self, ids, student_ids, course_ids, grades, course_labels: Dict[int, tuple],
+                    semesters: Optional[List[Optional[str]]] = None):
+        """Install a full snapshot (ids must be sorted ascending; `semesters` per row, default none)."""
+        with self._lock:
+            codes = (np.zeros(len(ids), np.int16) if semesters is None
+                     else np.fromiter((self._semester_code(s) for s in semesters), np.int16, len(ids)))
+            self._install(
+                np.asarray(ids, np.int32), np.asarray(student_ids, np.int32),
+                np.asarray(course_ids, np.int32), np.asarray(grades, np.float32), dict(course_labels), codes,
+            )
+            self.loaded_at = time.monotonic()
+
+    def _install(self, ids, student_ids, course_ids, grades, labels, semesters):
+        self._n = len(ids)
+        capacity = max(self._n + self._n // 8, 1024)  # headroom for inserts
+        self._ids = self._grown(ids, capacity)
+        self._sid = self._grown(student_ids, capacity)
+        self._cid = self._grown(course_ids, capacity)
+        self._grade = self._grown(grades, capacity)
+        self._sem = self._grown(semesters, capacity)
+        self._labels = labels
+
+        graded = ~np.isnan(grades)
+        n_courses = int(course_ids.max()) + 1 if self._n else 0
+        n_students = int(student_ids.max()) + 1 if self._n else 0
+        self._course = self._aggregate(course_ids, graded, grades, n_courses)
+        self._student = self._aggregate(student_ids, graded, grades, n_students)
+
+    @staticmethod
+    def _aggregate(keys, graded, grades, size) -> dict:
+        return {
+            "sum": np.bincount(keys[graded], weights=grades[graded], minlength=size).astype(np.float64),
+            "graded": np.bincount(keys[graded], minlength=size).astype(np.int32),
+            "enrolled": np.bincount(keys, minlength=size).astype(np.int32),
+        }
+
+    @staticmethod
+    def _grown(array, capacity):
+        out = np.empty(capacity, array.dtype)
+        out[:len(array)] = array
+        return out
+
+    def stats(self) -> dict:
+        with self._lock:
+            arrays = [self._ids, self._sid, self._cid, self._grade, self._sem,
+                      *self._course.values(), *self._student.values()]
+            return {"enrollments": self._n, "bytes": sum(a.nbytes for a in arrays)}
+
+    # --------------------------------------------------------
+    # Incremental row operations (called after commit)
+    # --------------------------------------------------------
+    def upsert_enrollment(self, enr_id: int, student_id: int, course_id: int, grade: Optional[float],
+                          semester: Optional[str] = None):
+        with self._lock:
+            if self._journal is not None:
+                self._journal.append(("upsert_enrollment", (enr_id, student_id, course_id, grade, semester)))
+            if not self.loaded:
+                return
+            i = self._find(enr_id)
+            if i < self._n and self._ids[i] == enr_id:
+                self._account(i, -1)
+            else:
+                self._insert_slot(i)
+                self._ids[i] = enr_id
+            self._sid[i] = student_id
+            self._cid[i] = course_id
+            self._grade[i] = np.nan if grade is None else grade
+            self._sem[i] = self._semester_code(semester)
+            self._account(i, +1)
+
+    def delete_enrollment(self, enr_id: int):
+        with self._lock:
+            if self._journal is not None:
+                self._journal.append(("delete_enrollment", (enr_id,)))
+            if not self.loaded:
+                return
+            i = self._find(enr_id)
+            if i < self._n and self._ids[i] == enr_id:
+                self._account(i, -1)
+                for a in self._row_columns():
+                    a[i:self._n - 1] = a[i + 1:self._n].copy()
+                self._n -= 1
+
+    def drop_student(self, student_id: int):
+        """Remove a deleted student's enrollments (ORM cascade)."""
+        self._drop(self._sid, student_id, "drop_student")
+
+    def drop_course(self, course_id: int):
+        """Remove a deleted course's enrollments (ORM cascade) and its label."""
+        self._drop(self._cid, course_id, "drop_course")
+        with self._lock:
+            self._labels.pop(course_id, None)
+
+    def set_course_label(self, course_id: int, title: str, code: str):
+        with self._lock:
+            if self._journal is not None:
+                self._journal.append(("set_course_label", (course_id, title, code)))
+            self._labels[course_id] = (title, code)
+
+    def _drop(self, column, key: int, op: str):
+        with self._lock:
+            if self._journal is not None:
+                self._journal.append((op, (key,)))
+            if not self.loaded:
+                return
+            rows = np.flatnonzero(column[:self._n] == key)
+            for i in rows:
+                self._account(i, -1)
+            if len(rows):
+                self._remove(rows)
+
+    def _semester_code(self, semester: Optional[str]) -> int:
+        code = self._semester_codes.get(semester)
+        if code is None:
+            code = self._semester_codes[semester] = len(self._semester_codes)
+        return code
+
+    def _row_columns(self):
+        return (self._ids, self._sid, self._cid, self._grade, self._sem)
+
+    def _find(self, enr_id: int) -> int:
+        # Search with an int32 key: a Python int would upcast (copy) the whole column.
+        return int(np.searchsorted(self._ids[:self._n], np.int32(enr_id)))
+
+    def _account(self, i: int, sign: int):
+        """Add (+1) or subtract (-1) row i's contribution to the aggregates."""
+        grade = self._grade[i]
+        for aggregate, key in ((self._course, "_cid"), (self._student, "_sid")):
+            k = int(getattr(self, key)[i])
+            if k >= len(aggregate["enrolled"]):
+                self._grow_aggregate(aggregate, k + 1)
+            aggregate["enrolled"][k] += sign
+            if not np.isnan(grade):
+                aggregate["graded"][k] += sign
+                aggregate["sum"][k] += sign * float(grade)
+
+    @staticmethod
+    def _grow_aggregate(aggregate: dict, size: int):
+        size = max(size, 2 * len(aggregate["enrolled"]))
+        for name, values in aggregate.items():
+            grown = np.zeros(size, values.dtype)
+            grown[:len(values)] = values
+            aggregate[name] = grown
+
+    def _insert_slot(self, i: int):
+        if self._n == len(self._ids):
+            capacity = len(self._ids) + len(self._ids) // 4
+            self._ids, self._sid, self._cid, self._grade, self._sem = (
+                self._grown(a[:self._n], capacity) for a in self._row_columns()
+            )
+        if i < self._n:  # out-of-order id: shift the tail right by one
+            for a in self._row_columns():
+                a[i + 1:self._n + 1] = a[i:self._n].copy()
+        self._n += 1
+
+    def _remove(self, rows: np.ndarray):
+        """Compact out several rows at once (cascaded drops)."""
+        keep = np.ones(self._n, bool)
+        keep[rows] = False
+        n = int(keep.sum())
+        for a in self._row_columns():
+            a[:n] = a[:self._n][keep]
+        self._n = n
+
+    def _aggregates(self, semester: Optional[str]):
+        """(per-course, per-student) aggregates: the maintained ones, or one semester's (under the lock)."""
+        if semester is None:
+            return self._course, self._student
+        rows = self._sem[:self._n] == self._semester_codes.get(semester, -1)
+        student_ids, course_ids, grades = (a[:self._n][rows] for a in (self._sid, self._cid, self._grade))
+        graded = ~np.isnan(grades)
+        return (
+            self._aggregate(course_ids, graded, grades, int(course_ids.max()) + 1 if len(course_ids) else 0),
+            self._aggregate(student_ids, graded, grades, int(student_ids.max()) + 1 if len(student_ids) else 0),
+        )
+
+    # --------------------------------------------------------
+    # ANALYTICS FUNCTIONS (same shapes as MongoRepository)
+    # --------------------------------------------------------
+    def top_students(self, limit: int = 5, semester: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Return top N students by GPA."""
+        self.ensure_loaded()
+        with self._lock:
+            student = self._aggregates(semester)[1]
+            total, graded = student["sum"], student["graded"]
+            gpa = np.full(len(graded), -np.inf)
+            np.divide(total, graded, out=gpa, where=graded > 0)
+            k = min(limit, int(np.count_nonzero(graded > 0)))
+            if k == 0:
+                return []
+            top = np.argpartition(-gpa, k - 1)[:k]
+            top = top[np.lexsort((top, -gpa[top]))]  # gpa desc, id asc on ties
+            ranked = [(int(sid), float(gpa[sid])) for sid in top]
+
+        labels = self._student_labels([sid for sid, _ in ranked])
+        return [
+            {"student_id": sid, "name": labels.get(sid, (None, None))[0],
+             "email": labels.get(sid, (None, None))[1], "gpa": round(value, 6)}
+            for sid, value in ranked
+        ]
+
+    def course_enrollment_count(self, semester: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Return enrollment count per course."""
+        self.ensure_loaded()
+        with self._lock:
+            enrolled = self._aggregates(semester)[0]["enrolled"]
+            present = np.flatnonzero(enrolled > 0)
+            counts = enrolled[present]
+            return [
+                {"course_id": cid, "course_name": self._labels.get(cid, (None, None))[0],
+                 "course_code": self._labels.get(cid, (None, None))[1], "enrollment_count": count}
+                for cid, count in zip(present.tolist(), counts.tolist())
+            ]
+
+    def gpa_by_course(self, semester: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Return GPA analytics for each course."""
+        self.ensure_loaded()
+        with self._lock:
+            course = self._aggregates(semester)[0]
+            enrolled, graded, total = course["enrolled"], course["graded"], course["sum"]
+            present = np.flatnonzero(enrolled > 0)
+            avg = np.full(len(present), np.nan)
+            np.divide(total[present], graded[present], out=avg, where=graded[present] > 0)
+            return [
+                {"course_id": cid, "course_name": self._labels.get(cid, (None, None))[0],
+                 "course_code": self._labels.get(cid, (None, None))[1],
+                 "avg_gpa": None if math.isnan(value) else round(value, 6), "count": count}
+                for cid, value, count in zip(present.tolist(), avg.tolist(), enrolled[present].tolist())
+            ]
+
+    def gpa_for_student(self, username: str):
+        """Resolve the username (unique index), then read the student's aggregates."""
+        db = self.session_factory()
+        try:
+            student_id = db.execute(select(Student.id).where(Student.username == username)).scalar()
+        finally:
+            db.close()
+        if student_id is None:
+            return None
+        self.ensure_loaded()
+        with self._lock:
+            graded = self._student["graded"]
+            if student_id >= len(graded) or graded[student_id] == 0:
+                return None
+            count = int(graded[student_id])
+            return {"student_id": student_id,
+                    "gpa": round(float(self._student["sum"][student_id]) / count, 6),
+                    "graded_count": count}
+
+    def _student_labels(self, student_ids: List[int]) -> Dict[int, tuple]:
+        """Names for the (few) top-k students: one primary-key lookup."""
+        db = self.session_factory()
+        try:
+            rows = db.execute(
+                select(Student.id, Student.name, Student.email).where(Student.id.in_(student_ids))
+            )
+            return {sid: (name, email) for sid, name, email in rows}
+        finally:
+            db.close()
+
+
+# --------------------------------------------------------
+# 🔥 EXPORT GLOBAL ENGINE (one per process)
+# --------------------------------------------------------
+columnar_analytics = ColumnarAnalyticsRepository()
@@ -1,5 +1,9 @@
+from typing import Optional, Sequence
+
+from sqlalchemy import delete, update
 from sqlalchemy.orm import Session
 from app.models.sqlalchemy_models import Course
+from app.core.pagination import RowPage, keyset_rows
 
 class CourseRepository:
     def __init__(self, db: Session):
@@ -10,19 +14,28 @@ class CourseRepository:
         course = Course(
             title=payload.title,
             code=payload.code,
-            unit=payload.unit,
             semester=payload.semester,
             lecturer_id=payload.lecturer_id,
         )
         self.db.add(course)
-        self.db.commit()
-        self.db.refresh(course)
+        self.db.flush()
         return course
 
     # Get all
     def get_all(self):
         return self.db.query(Course).all()
 
+    # Get page (keyset on primary key)
+    def get_page(self, limit: int, after_id: Optional[int] = None):
+        query = self.db.query(Course).order_by(Course.id)
+        if after_id is not None:
+            query = query.filter(Course.id > after_id)
+        return query.limit(limit + 1).all()
+
+    # Get page as row tuples (no ORM objects)
+    def get_page_rows(self, fields: Sequence[str], limit: int, after_id: Optional[int] = None) -> RowPage:
+        return keyset_rows(self.db, Course.__table__, fields, limit, after_id)
+
     # Get one
     def get_by_id(self, course_id: int):
         return self.db.query(Course).filter(Course.id == course_id).first()
@@ -32,31 +45,26 @@ class CourseRepository:
 
     # Update
     def update(self, course_id: int, payload):
-        course = self.get_by_id(course_id)
-        if not course:
-            return None
-
-        if payload.title is not None:
-            course.title = payload.title
-        if payload.code is not None:
-            course.code = payload.code
-        if payload.unit is not None:
-            course.unit = payload.unit
-        if payload.semester is not None:
-            course.semester = payload.semester
-        if payload.lecturer_id is not None:
-            course.lecturer_id = payload.lecturer_id
-
-        self.db.commit()
-        self.db.refresh(course)
-        return course
+        values = {
+            field: getattr(payload, field)
+            for field in ("title", "code", "semester", "lecturer_id")
+            if getattr(payload, field) is not None
+        }
+        if not values:
+            return self.get_by_id(course_id)
+
+        stmt = update(Course).where(Course.id == course_id).values(**values).returning(Course)
+        return self.db.execute(stmt).scalar_one_or_none()
 
-    # Delete
+    # Delete (enrollments first: see EnrollmentRepository.delete_for_course)
     def delete(self, course_id: int):
-        course = self.get_by_id(course_id)
-        if not course:
-            return False
+        deleted = self.db.execute(
+            delete(Course).where(Course.id == course_id).returning(Course.id)
+        ).first()
+        return deleted is not None
 
-        self.db.delete(course)
-        self.db.commit()
-        return True
+    def delete_for_lecturer(self, lecturer_id: int):
+        """Delete a lecturer's courses; returns their ids."""
+        return self.db.execute(
+            delete(Course).where(Course.lecturer_id == lecturer_id).returning(Course.id)
+        ).scalars().all()
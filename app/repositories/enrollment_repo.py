@@ -1,54 +1,94 @@
 # app/repositories/enrollment_repo.py
+from typing import Optional, Sequence
+
+from sqlalchemy import delete, insert, select
 from sqlalchemy.orm import Session
-from app.models.sqlalchemy_models import Enrollment
+from app.models.sqlalchemy_models import Course, Enrollment
+from app.core.pagination import RowPage, keyset_rows
+
+# What the outbox needs to undo an enrollment in the GPA summaries (and find its fact partition).
+_REMOVED = (Enrollment.id, Enrollment.student_id, Enrollment.course_id, Enrollment.grade, Enrollment.semester)
+
+
+def course_semester(course_id):
+    """Scalar subquery for a course's semester (the default for its enrollments)."""
+    return select(Course.semester).where(Course.id == course_id).scalar_subquery()
 
 class EnrollmentRepository:
     def __init__(self, db: Session):
         self.db = db
 
     def create(self, payload):
-        enr = Enrollment(
+        stmt = insert(Enrollment).values(
             student_id=payload.student_id,
             course_id=payload.course_id,
             grade=payload.grade,
-        )
-        # optional semester in payload; if your model has it, include it
-        if hasattr(Enrollment, "semester") and getattr(payload, "semester", None):
-            enr.semester = payload.semester
-
-        self.db.add(enr)
-        self.db.commit()
-        self.db.refresh(enr)
-        return enr
+            # no semester given: the course's, resolved inside the INSERT
+            semester=payload.semester or course_semester(payload.course_id),
+        ).returning(Enrollment)
+        return self.db.execute(stmt).scalar_one()
 
     def get_all(self):
         return self.db.query(Enrollment).all()
 
+    def get_page(self, limit: int, after_id: Optional[int] = None):
+        query = self.db.query(Enrollment).order_by(Enrollment.id)
+        if after_id is not None:
+            query = query.filter(Enrollment.id > after_id)
+        return query.limit(limit + 1).all()
+
+    def get_page_rows(self, fields: Sequence[str], limit: int, after_id: Optional[int] = None) -> RowPage:
+        return keyset_rows(self.db, Enrollment.__table__, fields, limit, after_id)
+
     def get_by_id(self, enr_id: int):
         return self.db.query(Enrollment).filter(Enrollment.id == enr_id).first()
 
+    def course_semesters(self, course_ids) -> dict:
+        """{course_id: semester} for bulk inserts that leave the semester to the course."""
+        ids = list(set(course_ids))
+        if not ids:
+            return {}
+        return dict(self.db.execute(select(Course.id, Course.semester).where(Course.id.in_(ids))).all())
+
     def get_by_student_course(self, student_id: int, course_id: int):
         return self.db.query(Enrollment).filter(
             Enrollment.student_id == student_id,
             Enrollment.course_id == course_id
         ).first()
 
-    def update(self, enr_id: int, payload):
-        enr = self.get_by_id(enr_id)
-        if not enr:
-            return None
+    def get_for_update(self, enr_id: int):
+        """Load (and on PostgreSQL lock) the row a grade change starts from."""
+        return self.db.query(Enrollment).filter(Enrollment.id == enr_id).with_for_update().first()
+
+    def update(self, enr, payload):
+        """Apply `payload` to an already loaded enrollment (no re-query)."""
         if getattr(payload, "grade", None) is not None:
             enr.grade = payload.grade
-        if getattr(payload, "semester", None) is not None and hasattr(Enrollment, "semester"):
+        if getattr(payload, "semester", None) is not None:
             enr.semester = payload.semester
-        self.db.commit()
-        self.db.refresh(enr)
+        self.db.flush()
         return enr
 
     def delete(self, enr_id: int):
-        enr = self.get_by_id(enr_id)
-        if not enr:
-            return False
-        self.db.delete(enr)
-        self.db.commit()
-        return True
+        """Delete one enrollment; returns its (id, student_id, course_id, grade, semester) or None."""
+        return self.db.execute(
+            delete(Enrollment).where(Enrollment.id == enr_id).returning(*_REMOVED)
+        ).first()
+
+    # Cascades, run before deleting the parent row. Return the removed rows
+    # so their GPA summary deltas can be staged without a separate SELECT.
+    def delete_for_student(self, student_id: int):
+        return self.db.execute(
+            delete(Enrollment).where(Enrollment.student_id == student_id).returning(*_REMOVED)
+        ).all()
+
+    def delete_for_course(self, course_id: int):
+        return self.db.execute(
+            delete(Enrollment).where(Enrollment.course_id == course_id).returning(*_REMOVED)
+        ).all()
+
+    def delete_for_lecturer(self, lecturer_id: int):
+        courses = select(Course.id).where(Course.lecturer_id == lecturer_id)
+        return self.db.execute(
+            delete(Enrollment).where(Enrollment.course_id.in_(courses)).returning(*_REMOVED)
+        ).all()
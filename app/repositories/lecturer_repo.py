@@ -1,5 +1,9 @@
+from typing import Optional, Sequence
+
+from sqlalchemy import delete, update
 from sqlalchemy.orm import Session
 from app.models.sqlalchemy_models import Lecturer
+from app.core.pagination import RowPage, keyset_rows
 
 
 class LecturerRepository:
@@ -13,8 +17,7 @@ class LecturerRepository:
     def create(self, name: str, department: str, email: str):
         lecturer = Lecturer(name=name, department=department, email=email)
         self.db.add(lecturer)
-        self.db.commit()
-        self.db.refresh(lecturer)
+        self.db.flush()
         return lecturer
 
     # ---------------------------------------------
@@ -23,6 +26,21 @@ class LecturerRepository:
     def get_all(self):
         return self.db.query(Lecturer).all()
 
+    # ---------------------------------------------
+    # Fetch Page (keyset on primary key)
+    # ---------------------------------------------
+    def get_page(self, limit: int, after_id: Optional[int] = None):
+        query = self.db.query(Lecturer).order_by(Lecturer.id)
+        if after_id is not None:
+            query = query.filter(Lecturer.id > after_id)
+        return query.limit(limit + 1).all()
+
+    # ---------------------------------------------
+    # Fetch Page as row tuples
+    # ---------------------------------------------
+    def get_page_rows(self, fields: Sequence[str], limit: int, after_id: Optional[int] = None) -> RowPage:
+        return keyset_rows(self.db, Lecturer.__table__, fields, limit, after_id)
+
     # ---------------------------------------------
     # Fetch one
     # ---------------------------------------------
@@ -36,29 +54,22 @@ class LecturerRepository:
     # Update Lecturer
     # ---------------------------------------------
     def update(self, lecturer_id: int, name: str, department: str, email: str):
-        lecturer = self.get_by_id(lecturer_id)
-        if not lecturer:
-            return None
+        values = {
+            field: value
+            for field, value in (("name", name), ("department", department), ("email", email))
+            if value
+        }
+        if not values:
+            return self.get_by_id(lecturer_id)
 
-        if name:
-            lecturer.name = name
-        if department:
-            lecturer.department = department
-        if email:
-            lecturer.email = email
-
-        self.db.commit()
-        self.db.refresh(lecturer)
-        return lecturer
+        stmt = update(Lecturer).where(Lecturer.id == lecturer_id).values(**values).returning(Lecturer)
+        return self.db.execute(stmt).scalar_one_or_none()
 
     # ---------------------------------------------
     # Delete Lecturer
     # ---------------------------------------------
     def delete(self, lecturer_id: int):
-        lecturer = self.get_by_id(lecturer_id)
-        if not lecturer:
-            return None
-
-        self.db.delete(lecturer)
-        self.db.commit()
-        return True
+        deleted = self.db.execute(
+            delete(Lecturer).where(Lecturer.id == lecturer_id).returning(Lecturer.id)
+        ).first()
+        return True if deleted is not None else None
@@ -4,8 +4,10 @@ from typing import Optional, List, Dict, Any
 from pymongo.collection import Collection
 from pymongo.errors import PyMongoError
 
+from app.db.fact_partitions import collection_name, fact_key
 from app.db.mongo_db import mongo_db
 from app.core.logger import logger
+from app.repositories.analytics_repo import AnalyticsRepository
 
 
 class MongoRepository:
@@ -37,9 +39,13 @@ class MongoRepository:
         """
         try:
             if mongo_db.db is None:
-                logger.warning("MongoDB disabled or not connected.")
+                # Kick off (or keep waiting for) the background connect; serve without Mongo meanwhile.
+                mongo_db.start()
+                logger.warning(f"MongoDB {mongo_db.status}; '{name}' unavailable.")
                 return None
-            return mongo_db.db.get_collection(name)
+            # Logical keys ("students", "enrollments", …) map to the configured
+            # star-schema collections the sync writes to.
+            return mongo_db.db.get_collection(mongo_db.COLLECTION_NAMES.get(name, name))
         except Exception as exc:
             logger.exception(f"Failed to get Mongo collection '{name}': {exc}")
             return None
@@ -80,26 +86,6 @@ class MongoRepository:
             logger.exception(f"Failed to fetch student email={email}")
             return None
 
-    def upsert_student(self, doc: Dict[str, Any]):
-        coll = self._get_collection("students")
-        if coll is None:
-            return
-        try:
-            coll.update_one({"id": doc["id"]}, {"$set": doc}, upsert=True)
-        except PyMongoError:
-            logger.exception(f"Failed to upsert student id={doc.get('id')}")
-
-    def delete_student(self, student_id: int) -> bool:
-        coll = self._get_collection("students")
-        if coll is None:
-            return False
-        try:
-            res = coll.delete_one({"id": student_id})
-            return res.deleted_count > 0
-        except PyMongoError:
-            logger.exception(f"Failed to delete student id={student_id}")
-            return False
-
     # --------------------------------------------------------
     # Courses
     # --------------------------------------------------------
@@ -125,26 +111,6 @@ class MongoRepository:
             logger.exception(f"Failed to fetch course id={course_id}")
             return None
 
-    def upsert_course(self, doc: Dict[str, Any]):
-        coll = self._get_collection("courses")
-        if coll is None:
-            return
-        try:
-            coll.update_one({"id": doc["id"]}, {"$set": doc}, upsert=True)
-        except PyMongoError:
-            logger.exception(f"Failed to upsert course id={doc.get('id')}")
-
-    def delete_course(self, course_id: int) -> bool:
-        coll = self._get_collection("courses")
-        if coll is None:
-            return False
-        try:
-            res = coll.delete_one({"id": course_id})
-            return res.deleted_count > 0
-        except PyMongoError:
-            logger.exception(f"Failed to delete course id={course_id}")
-            return False
-
     # --------------------------------------------------------
     # Lecturers
     # --------------------------------------------------------
@@ -170,26 +136,6 @@ class MongoRepository:
             logger.exception(f"Failed to fetch lecturer id={lecturer_id}")
             return None
 
-    def upsert_lecturer(self, doc: Dict[str, Any]):
-        coll = self._get_collection("lecturers")
-        if coll is None:
-            return
-        try:
-            coll.update_one({"id": doc["id"]}, {"$set": doc}, upsert=True)
-        except PyMongoError:
-            logger.exception(f"Failed to upsert lecturer id={doc.get('id')}")
-
-    def delete_lecturer(self, lecturer_id: int) -> bool:
-        coll = self._get_collection("lecturers")
-        if coll is None:
-            return False
-        try:
-            res = coll.delete_one({"id": lecturer_id})
-            return res.deleted_count > 0
-        except PyMongoError:
-            logger.exception(f"Failed to delete lecturer id={lecturer_id}")
-            return False
-
     # --------------------------------------------------------
     # Enrollments (FACT table)
     # --------------------------------------------------------
@@ -204,126 +150,137 @@ class MongoRepository:
             logger.exception("Failed to fetch enrollments")
             return []
 
-    def upsert_enrollment(self, doc: Dict[str, Any]):
-        coll = self._get_collection("enrollments")
-        if coll is None:
-            return
-        try:
-            coll.update_one({"id": doc["id"]}, {"$set": doc}, upsert=True)
-        except PyMongoError:
-            logger.exception(f"Failed to upsert enrollment id={doc.get('id')}")
-
-    def delete_enrollment(self, enr_id: int) -> bool:
-        coll = self._get_collection("enrollments")
-        if coll is None:
-            return False
-        try:
-            res = coll.delete_one({"id": enr_id})
-            return res.deleted_count > 0
-        except PyMongoError:
-            logger.exception(f"Failed to delete enrollment id={enr_id}")
-            return False
-
     # --------------------------------------------------------
     # ANALYTICS FUNCTIONS (NEW + COMPLETE)
+    # Served from the pre-aggregated GPA summaries (app/services/gpa_summary.py);
+    # the fact-table pipelines below are the fallback until a summary rebuild
+    # has completed, and serve `semester` reports from that semester's partition alone.
     # --------------------------------------------------------
+    def _summary(self, key: str) -> Optional[Collection]:
+        """The summary collection, once a full rebuild has marked it complete (else None)."""
+        coll = self._get_collection(key)
+        try:
+            if coll is not None and coll.find_one({"id": mongo_db.SUMMARY_BUILT}, {"_id": 1}) is not None:
+                return coll
+        except PyMongoError:
+            logger.exception(f"Failed to probe summary collection '{key}'")
+        return None
 
-    def top_students(self, limit: int = 5):
+    def top_students(self, limit: int = 5, semester: Optional[str] = None):
         """Return top N students by GPA."""
-        enr = self._get_collection("enrollments")
-        students = self._get_collection("students")
-        if enr is None:
-            return []
-
+        summary = self._summary("student_gpa") if semester is None else None
+        if summary is None:
+            return self._top_students_from_facts(limit, semester)
         try:
             pipeline = [
-                {"$group": {"_id": "$student_id", "gpa": {"$avg": "$grade"}}},
+                {"$match": {"gpa": {"$ne": None}}},
                 {"$sort": {"gpa": -1}},
                 {"$limit": limit},
-                {"$lookup": {
-                    "from": students.name if students else "students",
-                    "localField": "_id",
-                    "foreignField": "id",
-                    "as": "student"
-                }},
-                {"$unwind": "$student"},
-                {"$project": {
-                    "_id": 0,
-                    "student_id": "$_id",
-                    "name": "$student.name",
-                    "email": "$student.email",
-                    "gpa": 1
-                }}
+                {"$project": {"_id": 0, "student_id": "$id", "name": 1, "email": 1, "gpa": 1}},
             ]
-            return list(enr.aggregate(pipeline))
-
-        except Exception as e:
-            logger.exception(f"Failed to compute top_students: {e}")
+            return list(summary.aggregate(pipeline))
+        except PyMongoError as e:
+            logger.exception(f"Failed to read top_students summary: {e}")
             return []
 
-    def course_enrollment_count(self):
+    def course_enrollment_count(self, semester: Optional[str] = None):
         """Return enrollment count per course."""
-        enr = self._get_collection("enrollments")
-        courses = self._get_collection("courses")
-        if enr is None:
-            return []
-
+        summary = self._summary("course_gpa") if semester is None else None
+        if summary is None:
+            return self._course_enrollment_count_from_facts(semester)
         try:
             pipeline = [
-                {"$group": {"_id": "$course_id", "enrollment_count": {"$sum": 1}}},
-                {"$lookup": {
-                    "from": courses.name if courses else "courses",
-                    "localField": "_id",
-                    "foreignField": "id",
-                    "as": "course"
-                }},
-                {"$unwind": "$course"},
+                {"$match": {"enrollment_count": {"$gt": 0}}},
                 {"$project": {
                     "_id": 0,
-                    "course_id": "$_id",
-                    "course_name": "$course.title",
-                    "course_code": "$course.code",
+                    "course_id": "$id",
+                    "course_name": "$title",
+                    "course_code": "$code",
                     "enrollment_count": 1
                 }}
             ]
-            return list(enr.aggregate(pipeline))
-
-        except Exception as e:
-            logger.exception(f"Failed to compute course_enrollment_count: {e}")
+            return list(summary.aggregate(pipeline))
+        except PyMongoError as e:
+            logger.exception(f"Failed to read course_enrollment_count summary: {e}")
             return []
 
-    def gpa_by_course(self):
+    def gpa_by_course(self, semester: Optional[str] = None):
         """Return GPA analytics for each course."""
-        enr = self._get_collection("enrollments")
-        courses = self._get_collection("courses")
-        if enr is None:
-            return []
-
+        summary = self._summary("course_gpa") if semester is None else None
+        if summary is None:
+            return self._gpa_by_course_from_facts(semester)
         try:
             pipeline = [
-                {"$group": {
-                    "_id": "$course_id",
-                    "avg_gpa": {"$avg": "$grade"},
-                    "count": {"$sum": 1}
-                }},
-                {"$lookup": {
-                    "from": courses.name if courses else "courses",
-                    "localField": "_id",
-                    "foreignField": "id",
-                    "as": "course"
-                }},
-                {"$unwind": {"path": "$course", "preserveNullAndEmptyArrays": True}},
+                {"$match": {"enrollment_count": {"$gt": 0}}},
                 {"$project": {
                     "_id": 0,
-                    "course_id": "$_id",
-                    "course_name": "$course.title",
-                    "course_code": "$course.code",
+                    "course_id": "$id",
+                    "course_name": "$title",
+                    "course_code": "$code",
                     "avg_gpa": 1,
-                    "count": 1
+                    "count": "$enrollment_count"
                 }}
             ]
+            return list(summary.aggregate(pipeline))
+        except PyMongoError as e:
+            logger.exception(f"Failed to read gpa_by_course summary: {e}")
+            return []
 
-            return list(enr.aggregate(pipeline))
+    def gpa_for_student(self, username: str):
+        """Point read on the per-student summary (ux_username)."""
+        summary = self._summary("student_gpa")   # None → SQL (auto backend)
+        if summary is None:
+            return None
+        try:
+            doc = summary.find_one({"username": username}, {"_id": 0, "id": 1, "gpa": 1, "graded_count": 1})
+        except PyMongoError:
+            logger.exception(f"Failed to read GPA for username={username}")
+            return None
+        if doc is None or doc.get("gpa") is None:
+            return None
+        return {"student_id": doc["id"], "gpa": doc["gpa"], "graded_count": doc.get("graded_count", 0)}
+
+    # Fact-table pipelines (fallback): single-collection scans, see AnalyticsRepository
+    def _facts(self, semester: Optional[str] = None) -> Optional[AnalyticsRepository]:
+        if semester is not None:
+            partition = self._get_collection(collection_name(fact_key(semester)))
+            return AnalyticsRepository(partition) if partition is not None else None
+        enr = self._get_collection("enrollments")
+        if enr is None:
+            return None
+        try:
+            partitions = [collection_name(key) for key in mongo_db.fact_partition_keys()[1:]]
+        except PyMongoError:
+            logger.exception("Failed to list fact partitions")
+            return None
+        return AnalyticsRepository(enr, union=partitions)
+
+    def _top_students_from_facts(self, limit: int = 5, semester: Optional[str] = None):
+        facts = self._facts(semester)
+        if facts is None:
+            return []
+        try:
+            return facts.get_top_students(limit)
+        except Exception as e:
+            logger.exception(f"Failed to compute top_students: {e}")
+            return []
+
+    def _course_enrollment_count_from_facts(self, semester: Optional[str] = None):
+        facts = self._facts(semester)
+        if facts is None:
+            return []
+        try:
+            return facts.get_course_enrollments()
+        except Exception as e:
+            logger.exception(f"Failed to compute course_enrollment_count: {e}")
+            return []
+
+    def _gpa_by_course_from_facts(self, semester: Optional[str] = None):
+        facts = self._facts(semester)
+        if facts is None:
+            return []
+        try:
+            return facts.get_average_gpa()
         except Exception as e:
             logger.exception(f"Failed to compute gpa_by_course: {e}")
             return []
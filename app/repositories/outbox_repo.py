@@ -0,0 +1,102 @@
+# app/repositories/outbox_repo.py
+
+import json
+from typing import Any, Dict, Iterable, List, Optional
+
+from sqlalchemy import delete, event, insert
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.models.sqlalchemy_models import OutboxEvent
+
+
+# Session.info key holding the rows staged by this transaction.
+_PENDING = "sync_outbox_pending"
+
+
+class OutboxRepository:
+    """
+    SQL side of the SQL → Mongo transactional outbox.
+    `enqueue` only stages rows on the caller's session; right before the
+    commit they are written with one executemany INSERT (in enqueue order),
+    so they commit together with the entity change they describe and a
+    write costs one outbox statement however many events it stages.
+    """
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    @property
+    def enabled(self) -> bool:
+        """False in SQL-only mode: nothing is staged, so callers can skip building documents."""
+        return bool(settings.MONGO_URI)
+
+    # ------------------------------
+    # ENQUEUE (no commit)
+    # ------------------------------
+    def enqueue(self, collection: str, op: str, doc_id: int, doc: Optional[Dict[str, Any]] = None):
+        self.enqueue_many([(collection, op, doc_id, doc)])
+
+    def enqueue_many(self, events: Iterable[tuple]):
+        """Stage many (collection, op, doc_id, doc) events."""
+        if not self.enabled:
+            # SQL-only mode: nothing will ever drain the queue.
+            return
+        self.db.info.setdefault(_PENDING, []).extend(
+            {
+                "collection": collection,
+                "op": op,
+                "doc_id": doc_id,
+                "payload": json.dumps(doc, default=str) if doc is not None else None,
+            }
+            for collection, op, doc_id, doc in events
+        )
+
+    def enqueue_upsert(self, collection: str, doc: Dict[str, Any]):
+        self.enqueue(collection, "upsert", doc["id"], doc)
+
+    def enqueue_delete(self, collection: str, doc_id: int):
+        self.enqueue(collection, "delete", doc_id)
+
+    def enqueue_inc(self, collection: str, doc_id: int, delta: Dict[str, Any]):
+        """Counter increments (see app/services/gpa_summary.py); the dispatcher sums pending ones."""
+        self.enqueue(collection, "inc", doc_id, delta)
+
+    # ------------------------------
+    # DISPATCHER SIDE
+    # ------------------------------
+    def fetch_pending(self, limit: int) -> List[OutboxEvent]:
+        return (
+            self.db.query(OutboxEvent)
+            .filter(OutboxEvent.status == "pending")
+            .order_by(OutboxEvent.id)
+            .limit(limit)
+            .all()
+        )
+
+    def count_pending(self) -> int:
+        return self.db.query(OutboxEvent).filter(OutboxEvent.status == "pending").count()
+
+    def remove(self, event_ids: Iterable[int]):
+        ids = list(event_ids)
+        if ids:
+            self.db.execute(delete(OutboxEvent).where(OutboxEvent.id.in_(ids)))
+
+    def record_failure(self, event: OutboxEvent, error: Exception, max_attempts: int):
+        event.attempts += 1
+        event.last_error = str(error)[:1000]
+        if event.attempts >= max_attempts:
+            # Kept for inspection / replay, but no longer blocks the queue.
+            event.status = "dead"
+
+
+@event.listens_for(Session, "before_commit")
+def _write_pending(session: Session):
+    rows = session.info.pop(_PENDING, None)
+    if rows:
+        session.execute(insert(OutboxEvent.__table__), rows)
+
+
+@event.listens_for(Session, "after_soft_rollback")
+def _drop_pending(session: Session, previous_transaction):
+    session.info.pop(_PENDING, None)
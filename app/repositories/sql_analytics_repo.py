@@ -0,0 +1,123 @@
+# app/repositories/sql_analytics_repo.py
+
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import func, select
+from sqlalchemy.exc import SQLAlchemyError
+
+from app.core.logger import logger
+from app.db.sql_db import ReadSessionLocal
+from app.models.sqlalchemy_models import Course, Enrollment, Student
+
+
+class SqlAnalyticsRepository:
+    """
+    The /analytics reports computed straight from SQL.
+    Same method names and row shapes as MongoRepository's analytics functions.
+
+    Each report aggregates `enrollments` on its own first (an index-only scan
+    of ix_enrollments_course_grade / ix_enrollments_student_grade) and joins
+    the small grouped result to courses / students afterwards. A `semester`
+    report reads only that semester's range of the semester-leading indexes
+    (ix_enrollments_semester_course_grade / ..._student_grade).
+    """
+
+    def __init__(self, session_factory=ReadSessionLocal):
+        self.session_factory = session_factory
+
+    def _fetch(self, stmt, label: str) -> List[Dict[str, Any]]:
+        db = self.session_factory()
+        try:
+            return [dict(row._mapping) for row in db.execute(stmt)]
+        except SQLAlchemyError:
+            logger.exception(f"Failed to compute {label} from SQL")
+            return []
+        finally:
+            db.close()
+
+    @staticmethod
+    def _in_semester(stmt, semester: Optional[str]):
+        return stmt.where(Enrollment.semester == semester) if semester is not None else stmt
+
+    # --------------------------------------------------------
+    # ANALYTICS FUNCTIONS
+    # --------------------------------------------------------
+    def top_students(self, limit: int = 5, semester: Optional[str] = None):
+        """Return top N students by GPA."""
+        per_student = (
+            select(
+                Enrollment.student_id.label("student_id"),
+                func.avg(Enrollment.grade).label("gpa"),
+            )
+            .where(Enrollment.grade.isnot(None))
+            .group_by(Enrollment.student_id)
+        )
+        per_student = self._in_semester(per_student, semester).subquery()
+        stmt = (
+            select(per_student.c.student_id, Student.name, Student.email, per_student.c.gpa)
+            .join(Student, Student.id == per_student.c.student_id)
+            .order_by(per_student.c.gpa.desc(), per_student.c.student_id)
+            .limit(limit)
+        )
+        return self._fetch(stmt, "top_students")
+
+    def gpa_for_student(self, username: str):
+        """One student's GPA: unique username lookup + ix_enrollments_student_grade range."""
+        stmt = (
+            select(
+                Student.id.label("student_id"),
+                func.avg(Enrollment.grade).label("gpa"),
+                func.count(Enrollment.grade).label("graded_count"),
+            )
+            .join(Enrollment, Enrollment.student_id == Student.id)
+            .where(Student.username == username, Enrollment.grade.isnot(None))
+            .group_by(Student.id)
+        )
+        rows = self._fetch(stmt, "gpa_for_student")
+        return rows[0] if rows else None
+
+    def course_enrollment_count(self, semester: Optional[str] = None):
+        """Return enrollment count per course."""
+        per_course = (
+            select(
+                Enrollment.course_id.label("course_id"),
+                func.count().label("enrollment_count"),
+            )
+            .group_by(Enrollment.course_id)
+        )
+        per_course = self._in_semester(per_course, semester).subquery()
+        stmt = (
+            select(
+                per_course.c.course_id,
+                Course.title.label("course_name"),
+                Course.code.label("course_code"),
+                per_course.c.enrollment_count,
+            )
+            .join(Course, Course.id == per_course.c.course_id)
+            .order_by(per_course.c.course_id)
+        )
+        return self._fetch(stmt, "course_enrollment_count")
+
+    def gpa_by_course(self, semester: Optional[str] = None):
+        """Return GPA analytics for each course."""
+        per_course = (
+            select(
+                Enrollment.course_id.label("course_id"),
+                func.avg(Enrollment.grade).label("avg_gpa"),
+                func.count().label("count"),
+            )
+            .group_by(Enrollment.course_id)
+        )
+        per_course = self._in_semester(per_course, semester).subquery()
+        stmt = (
+            select(
+                per_course.c.course_id,
+                Course.title.label("course_name"),
+                Course.code.label("course_code"),
+                per_course.c.avg_gpa,
+                per_course.c.count,
+            )
+            .join(Course, Course.id == per_course.c.course_id)
+            .order_by(per_course.c.course_id)
+        )
+        return self._fetch(stmt, "gpa_by_course")
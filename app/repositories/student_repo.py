@@ -1,14 +1,20 @@
 # app/repositories/student_repo.py
 
+from typing import Optional, Sequence
+
+from sqlalchemy import delete, update
 from sqlalchemy.orm import Session
-from app.models.sqlalchemy_models import Student
+from app.models.sqlalchemy_models import Student, UserModel
+from app.core.pagination import RowPage, keyset_rows
 
 
 class StudentRepository:
     """
     SQL-only repository.
     Handles all CREATE/READ/UPDATE/DELETE ops using SQLAlchemy.
-    Mongo sync is handled in StudentService, not here.
+    Writes are flushed, not committed: StudentService commits them together
+    with their Mongo sync outbox events. Each write is a single statement
+    (UPDATE/DELETE ... RETURNING); uniqueness is left to the constraints.
     """
 
     def __init__(self, db: Session):
@@ -20,6 +26,21 @@ class StudentRepository:
     def get_all(self):
         return self.db.query(Student).all()
 
+    # ------------------------------
+    # GET PAGE (keyset on primary key)
+    # ------------------------------
+    def get_page(self, limit: int, after_id: Optional[int] = None):
+        query = self.db.query(Student).order_by(Student.id)
+        if after_id is not None:
+            query = query.filter(Student.id > after_id)
+        return query.limit(limit + 1).all()
+
+    # ------------------------------
+    # GET PAGE AS ROW TUPLES
+    # ------------------------------
+    def get_page_rows(self, fields: Sequence[str], limit: int, after_id: Optional[int] = None) -> RowPage:
+        return keyset_rows(self.db, Student.__table__, fields, limit, after_id)
+
     # ------------------------------
     # GET BY ID
     # ------------------------------
@@ -50,34 +71,32 @@ class StudentRepository:
             username=getattr(payload, "username", None)
         )
         self.db.add(student)
-        self.db.commit()
-        self.db.refresh(student)
+        self.db.flush()
         return student  # ORM instance
 
     # ------------------------------
     # UPDATE STUDENT
     # ------------------------------
     def update(self, student_id: int, payload_dict: dict):
-        student = self.get_by_id(student_id)
-        if not student:
-            return None
-
-        for field, value in payload_dict.items():
-            if value is not None and hasattr(student, field):
-                setattr(student, field, value)
+        values = {
+            field: value for field, value in payload_dict.items()
+            if value is not None and hasattr(Student, field)
+        }
+        if not values:
+            return self.get_by_id(student_id)
 
-        self.db.commit()
-        self.db.refresh(student)
-        return student
+        stmt = update(Student).where(Student.id == student_id).values(**values).returning(Student)
+        return self.db.execute(stmt).scalar_one_or_none()
 
     # ------------------------------
     # DELETE STUDENT
     # ------------------------------
     def delete(self, student_id: int) -> bool:
-        student = self.get_by_id(student_id)
-        if not student:
-            return False
-
-        self.db.delete(student)
-        self.db.commit()
-        return True
+        # Unlink the login first; the account itself stays.
+        self.db.execute(
+            update(UserModel).where(UserModel.student_id == student_id).values(student_id=None)
+        )
+        deleted = self.db.execute(
+            delete(Student).where(Student.id == student_id).returning(Student.id)
+        ).first()
+        return deleted is not None
@@ -1,33 +1,116 @@
 # app/services/analytics_service.py
 
+from functools import partial
+from typing import Optional
+
+from app.config import settings
+from app.core.logger import logger
+from app.db.mongo_db import mongo_db
+from app.repositories.columnar_analytics_repo import columnar_analytics
 from app.repositories.mongo_repo import MongoRepository
+from app.repositories.sql_analytics_repo import SqlAnalyticsRepository
+from app.services.gpa_summary import student_gpa_cache
+from app.services.result_cache import (
+    ANALYTICS,
+    HISTORY,
+    cached_result,
+    semester_tag,
+    stale_while_revalidate,
+)
 
 
 class AnalyticsService:
     """
     Business logic for school analytics.
+
+    Reports come from engines with the same interface: MongoRepository
+    (star schema + GPA summaries), SqlAnalyticsRepository (GROUP BY over
+    `enrollments`) or the in-process ColumnarAnalyticsRepository (NumPy).
+    ANALYTICS_BACKEND picks one; "auto" uses
+    Mongo while it is connected and falls back to SQL when it is not, or
+    when Mongo returns nothing (failed read / not synced yet).
+
+    Reports are shared through result_cache: fresh for ANALYTICS_CACHE_TTL
+    (or until a write invalidates them), then served stale for up to
+    ANALYTICS_STALE_TTL while a single background refresh recomputes them.
+    Concurrent first requests share one computation.
+
+    Every report takes an optional `semester`, answered from that
+    semester's data only (SQL index range, Mongo partition, columnar mask).
+    Semesters listed in CLOSED_SEMESTERS no longer take grades, so their
+    reports are cached with no TTL until a rename (HISTORY) or a write to
+    that semester invalidates them.
     """
 
-    def __init__(self):
-        self.repo = MongoRepository()
+    def __init__(self, backend: str = None):
+        self.backend = backend or settings.ANALYTICS_BACKEND
+        if self.backend not in ("auto", "mongo", "sql", "columnar"):
+            raise ValueError(f"Unknown analytics backend: {self.backend!r}")
+        self.mongo = MongoRepository()
+        self.sql = SqlAnalyticsRepository()
+        self.columnar = columnar_analytics
+
+    def _report(self, name: str, *args, **kwargs):
+        if self.backend == "sql":
+            return getattr(self.sql, name)(*args, **kwargs)
+        if self.backend == "columnar":
+            return getattr(self.columnar, name)(*args, **kwargs)
+        if self.backend == "mongo":
+            return getattr(self.mongo, name)(*args, **kwargs)
+
+        if mongo_db.connected:
+            results = getattr(self.mongo, name)(*args, **kwargs)
+            if results:
+                return results
+        else:
+            mongo_db.start()  # keep trying in the background
+            logger.debug(f"📊 MongoDB {mongo_db.status}; serving {name} from SQL")
+        return getattr(self.sql, name)(*args, **kwargs)
 
-    def get_average_gpa(self):
+    def _cached_report(self, name: str, *args, semester: Optional[str] = None):
+        key = ("analytics", self.backend, name, *args, semester)
+        compute = partial(self._report, name, *args, semester=semester)
+        if semester is not None and semester in closed_semesters():
+            return cached_result(key, compute, tags=[semester_tag(semester), HISTORY], ttl=0)
+        tags = [ANALYTICS] if semester is None else [ANALYTICS, semester_tag(semester)]
+        return stale_while_revalidate(
+            key, compute, tags=tags,
+            ttl=settings.ANALYTICS_CACHE_TTL, stale_ttl=settings.ANALYTICS_STALE_TTL,
+        )
+
+    def get_average_gpa(self, semester: Optional[str] = None):
         """
         Fetch average GPA per course.
         """
-        results = self.repo.gpa_by_course()   # FIXED
+        results = self._cached_report("gpa_by_course", semester=semester)
         if not results:
             return {"message": "No GPA records found"}
         return results
 
-    def get_top_students(self, limit: int = 5):
+    def get_top_students(self, limit: int = 5, semester: Optional[str] = None):
         """
         Returns the top N students by GPA.
         """
-        return self.repo.top_students(limit)
+        return self._cached_report("top_students", limit, semester=semester)
+
+    def get_student_gpa(self, username: str):
+        """
+        One student's GPA ({"student_id", "gpa", "graded_count"}), or None.
+        Served from student_gpa_cache; misses are a single indexed point read.
+        """
+        record = student_gpa_cache.get(username)
+        if record is None:
+            record = self._report("gpa_for_student", username)
+            if record is not None:
+                student_gpa_cache.set(username, record, tags=[("student", record["student_id"])])
+        return record
 
-    def get_course_enrollments(self):
+    def get_course_enrollments(self, semester: Optional[str] = None):
         """
         Returns course enrollment summary.
         """
-        return self.repo.course_enrollment_count()
+        return self._cached_report("course_enrollment_count", semester=semester)
+
+
+def closed_semesters() -> frozenset:
+    return frozenset(s.strip() for s in settings.CLOSED_SEMESTERS.split(",") if s.strip())
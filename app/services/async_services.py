@@ -0,0 +1,147 @@
+# app/services/async_services.py
+"""
+Async front for the CRUD services, used by the `async def` routers.
+
+Each call runs the regular service on the AsyncSession's connection through
+`AsyncSession.run_sync`: the repositories, outbox staging and unit of work
+are the same code as the sync path. What that buys: every SQL round trip is
+awaited (aiosqlite / asyncpg), so a slow query parks a coroutine instead of
+holding one of the ~40 threadpool slots. What it does not: the Python side
+of the service (ORM mapping, validation) runs on the event loop thread, so
+it must not wait on anything another thread can hold for long.
+
+Hence:
+  - after-commit callbacks (columnar engine updates under its lock, cache
+    invalidations taking the shared cache's flock) are collected
+    (DEFERRED_CALLBACKS) and run in the threadpool before the call returns;
+  - methods that can wait on another request (result_cache's single-flight,
+    e.g. CourseService.get_courses_page) are not wrapped here: their routes
+    stay sync, like bulk create, grade import and analytics.
+"""
+
+from typing import Optional
+
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.pydantic import (
+    CourseCreate,
+    CourseUpdate,
+    EnrollmentCreate,
+    EnrollmentUpdate,
+    LecturerCreate,
+    LecturerUpdate,
+    StudentCreate,
+    StudentUpdate,
+)
+from app.services.course_service import CourseService
+from app.services.enrollment_service import EnrollmentService
+from app.services.lecturer_service import LecturerService
+from app.services.student_service import StudentService
+from app.services.unit_of_work import DEFERRED_CALLBACKS, run_callbacks
+
+
+class _AsyncService:
+    service_class = None   # the sync service whose methods are awaited
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def _call(self, method: str, *args):
+        callbacks = []
+
+        def call(session):
+            session.info[DEFERRED_CALLBACKS] = callbacks
+            try:
+                return getattr(self.service_class(session), method)(*args)
+            finally:
+                session.info.pop(DEFERRED_CALLBACKS, None)
+
+        try:
+            return await self.db.run_sync(call)
+        finally:
+            if callbacks:
+                # committed writes: update the in-process read models before responding
+                await run_in_threadpool(run_callbacks, callbacks)
+
+
+class AsyncStudentService(_AsyncService):
+    service_class = StudentService
+
+    async def get_students_page(self, limit: int = None, after: Optional[str] = None):
+        return await self._call("get_students_page", limit, after)
+
+    async def get_students_rows(self, limit: int = None, after: Optional[str] = None):
+        return await self._call("get_students_rows", limit, after)
+
+    async def get_student_by_id(self, student_id: int):
+        return await self._call("get_student_by_id", student_id)
+
+    async def create_student(self, payload: StudentCreate):
+        return await self._call("create_student", payload)
+
+    async def update_student(self, student_id: int, payload: StudentUpdate):
+        return await self._call("update_student", student_id, payload)
+
+    async def delete_student(self, student_id: int):
+        return await self._call("delete_student", student_id)
+
+
+class AsyncCourseService(_AsyncService):
+    service_class = CourseService
+
+    async def get_course_by_id(self, course_id: int):
+        return await self._call("get_course_by_id", course_id)
+
+    async def create_course(self, payload: CourseCreate):
+        return await self._call("create_course", payload)
+
+    async def update_course(self, course_id: int, payload: CourseUpdate):
+        return await self._call("update_course", course_id, payload)
+
+    async def delete_course(self, course_id: int):
+        return await self._call("delete_course", course_id)
+
+
+class AsyncLecturerService(_AsyncService):
+    service_class = LecturerService
+
+    async def get_lecturers_page(self, limit: int = None, after: Optional[str] = None):
+        return await self._call("get_lecturers_page", limit, after)
+
+    async def get_lecturers_rows(self, limit: int = None, after: Optional[str] = None):
+        return await self._call("get_lecturers_rows", limit, after)
+
+    async def get_lecturer_by_id(self, lecturer_id: int):
+        return await self._call("get_lecturer_by_id", lecturer_id)
+
+    async def create_lecturer(self, payload: LecturerCreate):
+        return await self._call("create_lecturer", payload)
+
+    async def update_lecturer(self, lecturer_id: int, payload: LecturerUpdate):
+        return await self._call("update_lecturer", lecturer_id, payload)
+
+    async def delete_lecturer(self, lecturer_id: int):
+        return await self._call("delete_lecturer", lecturer_id)
+
+
+class AsyncEnrollmentService(_AsyncService):
+    service_class = EnrollmentService
+
+    async def list_enrollments(self, limit: int = None, after: Optional[str] = None):
+        return await self._call("list_enrollments", limit, after)
+
+    async def list_enrollment_rows(self, limit: int = None, after: Optional[str] = None):
+        return await self._call("list_enrollment_rows", limit, after)
+
+    async def get_enrollment(self, enr_id: int):
+        return await self._call("get_enrollment", enr_id)
+
+    async def create_enrollment(self, payload: EnrollmentCreate):
+        return await self._call("create_enrollment", payload)
+
+    async def update_enrollment(self, enr_id: int, payload: EnrollmentUpdate):
+        return await self._call("update_enrollment", enr_id, payload)
+
+    async def delete_enrollment(self, enr_id: int):
+        return await self._call("delete_enrollment", enr_id)
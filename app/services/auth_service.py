@@ -5,25 +5,20 @@ from sqlalchemy.orm import Session
 from app.core.security import hash_password, verify_password, create_access_token
 from app.models.sqlalchemy_models import UserModel, Student
 from app.models.pydantic import UserCreate, UserOut
+from app.repositories.outbox_repo import OutboxRepository
+from app.services.gpa_summary import student_summary_fields
+from app.services.unit_of_work import UnitOfWork
 
 
 class AuthService:
     def __init__(self, db: Session):
         self.db = db
+        self.outbox = OutboxRepository(db)
 
     # ----------------------------------------
     # Student Self-Registration
     # ----------------------------------------
     def register_user(self, user: UserCreate) -> UserOut:
-        # Check if username already exists
-        existing = (
-            self.db.query(UserModel)
-            .filter(UserModel.username == user.username)
-            .first()
-        )
-        if existing:
-            raise HTTPException(status_code=400, detail="Username already registered")
-
         # Ensure student record exists in 'students' table
         student = (
             self.db.query(Student)
@@ -36,25 +31,19 @@ class AuthService:
                 detail="Student record not found. Contact the administrator."
             )
 
-        # Create user
+        # Create user, linked to the student (a taken username fails the unique constraint)
         new_user = UserModel(
             username=user.username,
             password=hash_password(user.password),  # SAFE: hash_password handles 72-byte limit
-            role="student"
+            role="student",
+            student_id=student.id,
         )
 
-        try:
+        with UnitOfWork(self.db, conflicts={"username": "Username already registered"}):
             self.db.add(new_user)
-            self.db.commit()
-            self.db.refresh(new_user)
-
-            # Link student → user
-            student.user_id = new_user.id
-            self.db.commit()
-
-        except Exception as e:
-            self.db.rollback()
-            raise HTTPException(status_code=500, detail=f"Database error: {str(e)}")
+            self.db.flush()
+            # /students/me/gpa reads the summary by username
+            self.outbox.enqueue_upsert("student_gpa", student_summary_fields(student))
 
         return UserOut(
             id=new_user.id,
@@ -100,28 +89,14 @@ class AuthService:
     # ADMIN CREATES OTHER USERS (Lecturers/Admins)
     # ----------------------------------------
     def admin_register_user(self, user: UserCreate) -> UserOut:
-        existing = (
-            self.db.query(UserModel)
-            .filter(UserModel.username == user.username)
-            .first()
-        )
-        if existing:
-            raise HTTPException(status_code=400, detail="Username already exists")
-
         new_user = UserModel(
             username=user.username,
             role=user.role,
             password=hash_password(user.password)   # SAFE
         )
 
-        try:
+        with UnitOfWork(self.db, conflicts={"username": "Username already exists"}):
             self.db.add(new_user)
-            self.db.commit()
-            self.db.refresh(new_user)
-
-        except Exception as e:
-            self.db.rollback()
-            raise HTTPException(status_code=500, detail=f"Database error: {str(e)}")
 
         return UserOut(
             id=new_user.id,
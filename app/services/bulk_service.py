@@ -0,0 +1,234 @@
+# app/services/bulk_service.py
+
+from collections import defaultdict
+from typing import Any, Dict, List, NamedTuple, Tuple, Type
+
+from fastapi import HTTPException
+from pydantic import BaseModel, ValidationError
+from sqlalchemy import insert, select, tuple_
+from sqlalchemy.exc import IntegrityError
+
+from app.config import settings
+from app.models.pydantic import (
+    BulkResult,
+    BulkRowResult,
+    CourseCreate,
+    EnrollmentCreate,
+    LecturerCreate,
+    StudentCreate,
+)
+from app.db.fact_partitions import fact_key
+from app.models.sqlalchemy_models import Course, Enrollment, Lecturer, Student
+from app.repositories.columnar_analytics_repo import columnar_analytics
+from app.repositories.enrollment_repo import EnrollmentRepository
+from app.repositories.outbox_repo import OutboxRepository
+from app.services.entity_cache import course_cache, lecturer_cache, student_cache
+from app.services.fact_documents import dimensions_for, fact_document
+from app.services.gpa_summary import grade_delta, invalidate_student_gpa
+from app.services.result_cache import invalidate_analytics, invalidate_catalog
+from app.services.outbox_dispatcher import outbox_dispatcher
+
+
+class BulkEntity(NamedTuple):
+    model: Any
+    schema: Type[BaseModel]
+    unique: Tuple[Tuple[str, ...], ...]          # column groups that must not repeat
+    refs: Dict[str, Any] = {}                   # foreign-key column → referenced model
+    required: Tuple[str, ...] = ()              # optional in the schema, NOT NULL in SQL
+
+
+BULK_ENTITIES = {
+    "students": BulkEntity(Student, StudentCreate, unique=(("email",),)),
+    "lecturers": BulkEntity(Lecturer, LecturerCreate, unique=(("email",),), required=("email",)),
+    "courses": BulkEntity(Course, CourseCreate, unique=(("code",),), refs={"lecturer_id": Lecturer}),
+    "enrollments": BulkEntity(
+        Enrollment, EnrollmentCreate,
+        unique=(("student_id", "course_id"),),
+        refs={"student_id": Student, "course_id": Course},
+    ),
+}
+
+ENTITY_CACHES = {"students": student_cache, "lecturers": lecturer_cache, "courses": course_cache}
+
+
+class BulkService:
+    """
+    Batch creates for term-start loads.
+
+    Every row is validated on its own and reported on its own; the valid rows
+    are checked for duplicates / dangling references with a few IN (...)
+    queries, inserted with one executemany (RETURNING ids) and staged for
+    Mongo as one executemany into the outbox, all in a single transaction.
+    """
+
+    def __init__(self, db, entity: str):
+        if entity not in BULK_ENTITIES:
+            raise HTTPException(status_code=404, detail=f"Unknown bulk entity '{entity}'")
+        self.db = db
+        self.entity = entity
+        self.spec = BULK_ENTITIES[entity]
+        self.outbox = OutboxRepository(db)
+
+    def create_many(self, rows: List[Dict[str, Any]]) -> BulkResult:
+        if len(rows) > settings.BULK_MAX_ROWS:
+            raise HTTPException(
+                status_code=413,
+                detail=f"At most {settings.BULK_MAX_ROWS} rows per bulk request",
+            )
+
+        errors: Dict[int, str] = {}
+        valid = self._validate(rows, errors)
+        valid = self._reject_duplicates(valid, errors)
+        valid = self._reject_dangling_refs(valid, errors)
+
+        ids: List[int] = []
+        if valid:
+            values = [v for _, v in valid]
+            if self.entity == "enrollments":
+                self._default_semesters(values)
+            table = self.spec.model.__table__
+            try:
+                ids = self.db.execute(
+                    insert(table).returning(table.c.id, sort_by_parameter_order=True), values
+                ).scalars().all()
+                self._stage_sync(values, ids)
+                self.db.commit()
+            except IntegrityError as exc:
+                self.db.rollback()
+                raise HTTPException(
+                    status_code=409,
+                    detail=f"Batch conflicted with a concurrent write, nothing was created: {exc.orig}",
+                )
+            outbox_dispatcher.notify()
+            self._apply_in_process(values, ids)
+
+        results = [BulkRowResult(row=i, status="error", error=msg) for i, msg in errors.items()]
+        results += [BulkRowResult(row=i, status="created", id=new_id) for (i, _), new_id in zip(valid, ids)]
+        results.sort(key=lambda r: r.row)
+        return BulkResult(created=len(ids), failed=len(errors), results=results)
+
+    # --------------------------------------------------------
+    # Checks (each drops the rows it rejects)
+    # --------------------------------------------------------
+    def _validate(self, rows, errors) -> List[Tuple[int, dict]]:
+        valid = []
+        for i, raw in enumerate(rows):
+            try:
+                values = self.spec.schema(**raw).model_dump()
+            except ValidationError as exc:
+                errors[i] = "; ".join(
+                    f"{'.'.join(str(p) for p in e['loc'])}: {e['msg']}" for e in exc.errors()
+                )
+                continue
+            missing = [f for f in self.spec.required if values.get(f) is None]
+            if missing:
+                errors[i] = f"{', '.join(missing)}: Field required"
+                continue
+            valid.append((i, values))
+        return valid
+
+    def _reject_duplicates(self, valid, errors):
+        for columns in self.spec.unique:
+            seen: Dict[tuple, int] = {}
+            keyed = []
+            for i, values in valid:
+                key = tuple(values[c] for c in columns)
+                if None in key:
+                    keyed.append((i, values))
+                elif key in seen:
+                    errors[i] = f"Duplicate {'/'.join(columns)} of row {seen[key]} in this batch"
+                else:
+                    seen[key] = i
+                    keyed.append((i, values))
+
+            existing = self._existing(columns, list(seen))
+            for key in existing:
+                errors[seen[key]] = f"{'/'.join(columns)} {'/'.join(map(str, key))} already exists"
+            valid = [(i, v) for i, v in keyed if i not in errors]
+        return valid
+
+    def _reject_dangling_refs(self, valid, errors):
+        for column, target in self.spec.refs.items():
+            wanted = {v[column] for _, v in valid if v[column] is not None}
+            found = {key[0] for key in self._existing(("id",), [(w,) for w in wanted], model=target)}
+            for i, values in valid:
+                if values[column] is not None and values[column] not in found:
+                    errors[i] = f"{column} {values[column]} does not exist"
+            valid = [(i, v) for i, v in valid if i not in errors]
+        return valid
+
+    def _existing(self, columns, keys: List[tuple], model=None) -> set:
+        """Which of `keys` already exist, in IN (...) chunks of BULK_LOOKUP_CHUNK."""
+        table = (model or self.spec.model).__table__
+        cols = [table.c[c] for c in columns]
+        target = cols[0] if len(cols) == 1 else tuple_(*cols)
+        found = set()
+        chunk = settings.BULK_LOOKUP_CHUNK
+        for start in range(0, len(keys), chunk):
+            batch = keys[start:start + chunk]
+            params = [k[0] for k in batch] if len(cols) == 1 else batch
+            found.update(tuple(row) for row in self.db.execute(select(*cols).where(target.in_(params))))
+        return found
+
+    def _default_semesters(self, values: List[dict]):
+        """Enrollments without a semester take their course's (one IN query per chunk)."""
+        course_ids = [v["course_id"] for v in values if not v.get("semester")]
+        semesters = {}
+        chunk = settings.BULK_LOOKUP_CHUNK
+        for start in range(0, len(course_ids), chunk):
+            semesters.update(EnrollmentRepository(self.db).course_semesters(course_ids[start:start + chunk]))
+        for v in values:
+            v["semester"] = v.get("semester") or semesters.get(v["course_id"])
+
+    # --------------------------------------------------------
+    # Sync side effects
+    # --------------------------------------------------------
+    def _stage_sync(self, values: List[dict], ids: List[int]):
+        """Outbox rows for Mongo (+ GPA summary deltas), in the insert's transaction."""
+        if not self.outbox.enabled:
+            return
+        docs = [{**v, "id": new_id} for v, new_id in zip(values, ids)]
+        if self.entity == "enrollments":
+            students, courses = dimensions_for(
+                self.db, (d["student_id"] for d in docs), (d["course_id"] for d in docs),
+            )
+            docs = [fact_document(d, students, courses) for d in docs]
+            events = [(fact_key(d["semester"]), "upsert", d["id"], d) for d in docs]
+        else:
+            events = [(self.entity, "upsert", d["id"], d) for d in docs]
+
+        if self.entity == "students":
+            events += [("student_gpa", "upsert", d["id"],
+                        {"id": d["id"], "name": d["name"], "email": d["email"], "username": None}) for d in docs]
+        elif self.entity == "courses":
+            events += [("course_gpa", "upsert", d["id"],
+                        {"id": d["id"], "title": d["title"], "code": d["code"]}) for d in docs]
+        elif self.entity == "enrollments":
+            # One summed increment per course / student instead of one per row.
+            per_key = defaultdict(lambda: defaultdict(int))
+            for d in docs:
+                delta = grade_delta(None, d["grade"], 1)
+                for key, doc_id in (("course_gpa", d["course_id"]), ("student_gpa", d["student_id"])):
+                    for counter, amount in delta.items():
+                        per_key[(key, doc_id)][counter] += amount
+            events += [(key, "inc", doc_id, dict(delta)) for (key, doc_id), delta in per_key.items()]
+
+        self.outbox.enqueue_many(events)
+
+    def _apply_in_process(self, values: List[dict], ids: List[int]):
+        """After commit: in-process read models (columnar engine, GPA / entity caches)."""
+        cache = ENTITY_CACHES.get(self.entity)
+        if cache is not None:
+            # Only "not found" entries can exist for new rows.
+            for v, new_id in zip(values, ids):
+                cache.invalidate(new_id, **{field: v.get(field) for field in cache.fields[1:]})
+        if self.entity == "enrollments":
+            for v, new_id in zip(values, ids):
+                columnar_analytics.upsert_enrollment(new_id, v["student_id"], v["course_id"], v["grade"], v["semester"])
+            for student_id in {v["student_id"] for v in values}:
+                invalidate_student_gpa(student_id)
+            invalidate_analytics(*{v["semester"] for v in values})
+        elif self.entity == "courses":
+            for v, new_id in zip(values, ids):
+                columnar_analytics.set_course_label(new_id, v["title"], v["code"])
+            invalidate_catalog()
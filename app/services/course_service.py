@@ -1,56 +1,110 @@
 from fastapi import HTTPException
 from app.repositories.course_repo import CourseRepository
-from app.models.pydantic import CourseCreate, CourseOut, CourseUpdate
-from app.db.mongo_db import mongo_db
+from app.repositories.enrollment_repo import EnrollmentRepository
+from app.repositories.lecturer_repo import LecturerRepository
+from app.models.pydantic import CourseCreate, CourseOut, CourseUpdate, Page
+from app.core.pagination import clamp_limit, decode_cursor, split_page
+from app.repositories.outbox_repo import OutboxRepository
+from app.services.unit_of_work import UnitOfWork
+from app.services.gpa_summary import course_summary_fields, enqueue_enrollment_removals, invalidate_student_gpa
+from app.repositories.columnar_analytics_repo import columnar_analytics
+from app.services.entity_cache import course_cache, lecturer_cache
+from app.services.fact_documents import course_fact_fields, enqueue_fanout, lecturer_fact_fields
+from app.services.result_cache import CATALOG, cached_result, invalidate_catalog
 
 class CourseService:
     def __init__(self, db):
+        self.db = db
         self.repo = CourseRepository(db)
+        self.enrollments = EnrollmentRepository(db)
+        self.lecturers = LecturerRepository(db)
+        self.outbox = OutboxRepository(db)
+        self.uow = UnitOfWork(db, conflicts={"code": "Course code already exists"})
 
-    # Read all
-    def get_all_courses(self):
-        courses = self.repo.get_all()
-        return [CourseOut.from_orm(c) for c in courses]
+    # Read page (catalog pages are shared precomputed results, dropped on course writes)
+    def get_courses_page(self, limit: int = None, after: str = None):
+        limit = clamp_limit(limit)
+        return cached_result(("catalog", limit, after), lambda: self._courses_page(limit, after), tags=[CATALOG])
+
+    def _courses_page(self, limit: int, after: str = None) -> dict:
+        rows = self.repo.get_page(limit, decode_cursor(after))
+        courses, next_cursor = split_page(rows, limit)
+        return Page[CourseOut](
+            items=[CourseOut.from_orm(c) for c in courses],
+            next_cursor=next_cursor,
+        ).model_dump()
+
+    # Same page as row tuples, for the binary formats (cached alongside the JSON pages)
+    def get_courses_rows(self, limit: int = None, after: str = None):
+        limit = clamp_limit(limit)
+        return cached_result(
+            ("catalog-rows", limit, after),
+            lambda: self.repo.get_page_rows(tuple(CourseOut.model_fields), limit, decode_cursor(after)),
+            tags=[CATALOG],
+        )
+
+    # Read one (entity cache, then SQL)
+    def get_course_by_id(self, course_id: int):
+        course = course_cache.get(self.repo, "id", course_id)
+        if not course:
+            raise HTTPException(status_code=404, detail="Course not found")
+        return CourseOut.from_orm(course)
 
     # Create
     def create_course(self, payload: CourseCreate):
-        existing = self.repo.get_by_code(payload.code)
-        if existing:
-            raise HTTPException(status_code=400, detail="Course code already exists")
+        with self.uow:
+            course = self.repo.create(payload)
 
-        course = self.repo.create(payload)
-
-        # MongoDB sync
-        mongo_db.sync_course(course.__dict__)
+            # MongoDB sync (same transaction, applied by the outbox dispatcher)
+            self.outbox.enqueue_upsert("courses", course.as_dict())
+            self.outbox.enqueue_upsert("course_gpa", course_summary_fields(course))
+            self.uow.after_commit(columnar_analytics.set_course_label, course.id, course.title, course.code)
+            self.uow.after_commit(course_cache.forget, course)
+            self.uow.after_commit(invalidate_catalog)
 
         return CourseOut.from_orm(course)
 
     # Update
     def update_course(self, course_id: int, payload: CourseUpdate):
-        course = self.repo.get_by_id(course_id)
-        if not course:
-            raise HTTPException(status_code=404, detail="Course not found")
-
-        updated_course = self.repo.update(course_id, payload)
+        with self.uow:
+            updated_course = self.repo.update(course_id, payload)
+            if not updated_course:
+                raise HTTPException(status_code=404, detail="Course not found")
 
-        # MongoDB sync
-        mongo_db.sync_course(updated_course.__dict__)
+            # MongoDB sync
+            self.outbox.enqueue_upsert("courses", updated_course.as_dict())
+            self.outbox.enqueue_upsert("course_gpa", course_summary_fields(updated_course))
+            if self.outbox.enabled:
+                fields = course_fact_fields(updated_course)
+                if payload.lecturer_id is not None:
+                    lecturer = lecturer_cache.get(self.lecturers, "id", payload.lecturer_id)
+                    fields.update(lecturer_fact_fields(lecturer))
+                enqueue_fanout(self.outbox, "facts_by_course", course_id, fields)
+            self.uow.after_commit(
+                columnar_analytics.set_course_label,
+                updated_course.id, updated_course.title, updated_course.code,
+            )
+            self.uow.after_commit(course_cache.forget, updated_course)
+            self.uow.after_commit(invalidate_catalog)
 
         return CourseOut.from_orm(updated_course)
 
     # Delete
     def delete_course(self, course_id: int):
-        found = self.repo.get_by_id(course_id)
-        if not found:
-            raise HTTPException(status_code=404, detail="Course not found")
-
-        self.repo.delete(course_id)
+        with self.uow:
+            # enrollments go with the course
+            removed = self.enrollments.delete_for_course(course_id)
+            if not self.repo.delete(course_id):
+                raise HTTPException(status_code=404, detail="Course not found")
+            enqueue_enrollment_removals(self.outbox, removed)
 
-        # Remove from Mongo by marking it deleted
-        mongo_db.courses.update_one(
-            {"id": course_id},
-            {"$set": {"deleted": True}},
-            upsert=True
-        )
+            # Remove from Mongo by marking it deleted
+            self.outbox.enqueue_upsert("courses", {"id": course_id, "deleted": True})
+            self.outbox.enqueue_delete("course_gpa", course_id)
+            self.uow.after_commit(columnar_analytics.drop_course, course_id)
+            self.uow.after_commit(course_cache.invalidate, course_id)
+            self.uow.after_commit(invalidate_catalog)
+            for student_id in {enr.student_id for enr in removed}:
+                self.uow.after_commit(invalidate_student_gpa, student_id)
 
         return {"message": "Course deleted successfully"}
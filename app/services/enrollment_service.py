@@ -1,43 +1,67 @@
 # app/services/enrollment_service.py
 from fastapi import HTTPException
 from app.repositories.enrollment_repo import EnrollmentRepository
-from app.models.pydantic import EnrollmentCreate, EnrollmentOut, EnrollmentUpdate
-from app.db.mongo_db import mongo_db
+from app.models.pydantic import EnrollmentCreate, EnrollmentOut, EnrollmentUpdate, Page
+from app.core.pagination import clamp_limit, decode_cursor, split_page
+from app.repositories.outbox_repo import OutboxRepository
+from app.services.unit_of_work import UnitOfWork
+from app.services.gpa_summary import enqueue_enrollment_delta, grade_delta, invalidate_student_gpa
+from app.repositories.columnar_analytics_repo import columnar_analytics
+from app.services.result_cache import invalidate_analytics
+from app.services.fact_documents import fact_dimensions
+from app.db.fact_partitions import fact_key
 
-# small helper conversion (safe - doesn't require other modules)
-def _enrollment_to_doc(enr):
+# Fact document for the outbox (staged under fact_key(semester)); new facts
+# also embed their dimension attributes (see app/services/fact_documents.py),
+# grade updates $set only these.
+def _enrollment_to_doc(enr, dimensions: dict = None):
     return {
+        **(dimensions or {}),
         "id": enr.id,
         "student_id": enr.student_id,
         "course_id": enr.course_id,
         "grade": float(enr.grade) if enr.grade is not None else None,
-        # include semester if present on SQL model
-        **({"semester": enr.semester} if hasattr(enr, "semester") else {})
+        "semester": enr.semester,
     }
 
 class EnrollmentService:
     def __init__(self, db):
+        self.db = db
         self.repo = EnrollmentRepository(db)
+        self.outbox = OutboxRepository(db)
+        self.uow = UnitOfWork(db, conflicts={
+            ("student_id", "course_id"): "Student already enrolled in this course",
+        })
 
-    def list_enrollments(self):
-        items = self.repo.get_all()
-        return [EnrollmentOut.from_orm(e) for e in items]
+    def list_enrollments(self, limit: int = None, after: str = None):
+        limit = clamp_limit(limit)
+        rows = self.repo.get_page(limit, decode_cursor(after))
+        items, next_cursor = split_page(rows, limit)
+        return Page[EnrollmentOut](
+            items=[EnrollmentOut.from_orm(e) for e in items],
+            next_cursor=next_cursor,
+        )
 
-    def create_enrollment(self, payload: EnrollmentCreate):
-        # optional: prevent duplicate (simple check)
-        existing = self.repo.get_by_student_course(payload.student_id, payload.course_id)
-        if existing:
-            raise HTTPException(status_code=400, detail="Student already enrolled in this course")
+    # Same page as row tuples, for the binary formats (no EnrollmentOut per row)
+    def list_enrollment_rows(self, limit: int = None, after: str = None):
+        return self.repo.get_page_rows(tuple(EnrollmentOut.model_fields), clamp_limit(limit), decode_cursor(after))
 
-        enr = self.repo.create(payload)
+    def create_enrollment(self, payload: EnrollmentCreate):
+        with self.uow:
+            # a second enrollment in the same course fails ux_enrollments_student_course → 400
+            enr = self.repo.create(payload)
 
-        # sync to Mongo (wrapped to avoid raising if Mongo not available)
-        try:
-            if getattr(mongo_db, "enrollments", None):
-                mongo_db.sync_enrollment(_enrollment_to_doc(enr))
-        except Exception:
-            # don't fail the API if Mongo sync has issues
-            pass
+            # sync to Mongo through the outbox: committed with the enrollment,
+            # delivered (and retried) by the dispatcher
+            if self.outbox.enabled:
+                dimensions = fact_dimensions(self.db, enr.student_id, enr.course_id)
+                self.outbox.enqueue_upsert(fact_key(enr.semester), _enrollment_to_doc(enr, dimensions))
+            enqueue_enrollment_delta(self.outbox, enr.student_id, enr.course_id, grade_delta(None, enr.grade, 1))
+            self.uow.after_commit(
+                columnar_analytics.upsert_enrollment, enr.id, enr.student_id, enr.course_id, enr.grade, enr.semester,
+            )
+            self.uow.after_commit(invalidate_student_gpa, enr.student_id)
+            self.uow.after_commit(invalidate_analytics, enr.semester)
 
         return EnrollmentOut.from_orm(enr)
 
@@ -48,27 +72,46 @@ class EnrollmentService:
         return EnrollmentOut.from_orm(enr)
 
     def update_enrollment(self, enr_id: int, payload: EnrollmentUpdate):
-        enr = self.repo.get_by_id(enr_id)
-        if not enr:
-            raise HTTPException(status_code=404, detail="Enrollment not found")
+        with self.uow:
+            # The one read: the old grade is needed for the summary delta
+            # (RETURNING only sees the new row on SQLite).
+            enr = self.repo.get_for_update(enr_id)
+            if not enr:
+                raise HTTPException(status_code=404, detail="Enrollment not found")
 
-        updated = self.repo.update(enr_id, payload)
+            old_grade, old_semester = enr.grade, enr.semester
+            updated = self.repo.update(enr, payload)
 
-        try:
-            if getattr(mongo_db, "enrollments", None):
-                mongo_db.sync_enrollment(_enrollment_to_doc(updated))
-        except Exception:
-            pass
+            if updated.semester == old_semester:
+                self.outbox.enqueue_upsert(fact_key(updated.semester), _enrollment_to_doc(updated))
+            elif self.outbox.enabled:
+                # Moved to another term: the fact moves to that partition, whole.
+                dimensions = fact_dimensions(self.db, updated.student_id, updated.course_id)
+                self.outbox.enqueue_delete(fact_key(old_semester), updated.id)
+                self.outbox.enqueue_upsert(fact_key(updated.semester), _enrollment_to_doc(updated, dimensions))
+            enqueue_enrollment_delta(
+                self.outbox, updated.student_id, updated.course_id, grade_delta(old_grade, updated.grade)
+            )
+            self.uow.after_commit(
+                columnar_analytics.upsert_enrollment,
+                updated.id, updated.student_id, updated.course_id, updated.grade, updated.semester,
+            )
+            self.uow.after_commit(invalidate_student_gpa, updated.student_id)
+            self.uow.after_commit(invalidate_analytics, old_semester, updated.semester)
 
         return EnrollmentOut.from_orm(updated)
 
     def delete_enrollment(self, enr_id: int):
-        success = self.repo.delete(enr_id)
-        if not success:
-            raise HTTPException(status_code=404, detail="Enrollment not found")
-        try:
-            if getattr(mongo_db, "enrollments", None):
-                mongo_db.enrollments.delete_one({"id": enr_id})
-        except Exception:
-            pass
+        with self.uow:
+            removed = self.repo.delete(enr_id)
+            if not removed:
+                raise HTTPException(status_code=404, detail="Enrollment not found")
+
+            self.outbox.enqueue_delete(fact_key(removed.semester), enr_id)
+            enqueue_enrollment_delta(
+                self.outbox, removed.student_id, removed.course_id, grade_delta(removed.grade, None, -1)
+            )
+            self.uow.after_commit(columnar_analytics.delete_enrollment, enr_id)
+            self.uow.after_commit(invalidate_student_gpa, removed.student_id)
+            self.uow.after_commit(invalidate_analytics, removed.semester)
         return {"message": "Enrollment deleted successfully"}
@@ -0,0 +1,114 @@
+# app/services/entity_cache.py
+"""
+Read-through cache for students, courses and lecturers.
+
+    student_cache.get(repo, "id", 7)           # repo.get_by_id(7) on a miss
+    course_cache.get(repo, "code", "CS101")    # repo.get_by_code("CS101")
+
+A row is cached under its id and each unique field, all tagged with
+(entity, id), so one invalidation drops every key it was reachable by.
+Lookups that find nothing are cached too (ENTITY_CACHE_NEGATIVE_TTL) and
+are dropped when a write creates the id / email / code they missed on.
+
+A load is returned but not stored when it may predate a write:
+  - an invalidation of the entity type ran during the load, in any worker
+    (a per-entity counter in the backend, checked as the row is stored);
+  - it read a replica (app/db/read_routing.py) and the key it found was
+    written within READ_YOUR_WRITES_SECONDS, so the replica may lag.
+Either would otherwise put the old row back for a whole TTL.
+
+Values are stored as column dicts (what a shared backend could serialize)
+and come back as detached model instances: use them for reads only. Write
+paths load their rows through the repository inside the unit of work, and
+invalidate after commit (`uow.after_commit(student_cache.forget, row)`).
+"""
+
+import threading
+from typing import Any, Optional, Tuple
+
+from app.config import settings
+from app.core.cache import CacheBackend, make_cache
+from app.db.read_routing import from_replica
+from app.models.sqlalchemy_models import Course, Lecturer, Student
+
+_MISSING = object()
+
+# One store for all entity types (in-process, or shared with CACHE_BACKEND=shared).
+entity_backend: CacheBackend = make_cache(
+    "entities", settings.ENTITY_CACHE_SIZE, ttl=settings.ENTITY_CACHE_TTL,
+    slot_bytes=settings.ENTITY_CACHE_SLOT_BYTES,
+)
+
+
+class EntityCache:
+    def __init__(self, model, unique: Tuple[str, ...], backend: CacheBackend = None):
+        self.model = model
+        self.entity = model.__tablename__
+        self.fields = ("id", *unique)
+        self.backend = backend or entity_backend
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.negative_hits = 0
+        self.misses = 0
+        self._guard = (self.entity,)   # tag bumped by every invalidation of this entity type
+
+    def get(self, repo, field: str, value: Any) -> Optional[Any]:
+        """Cached `repo.get_by_<field>(value)`."""
+        cached = self.backend.get((self.entity, field, value), _MISSING)
+        if cached is not _MISSING:
+            self._count("negative_hits" if cached is None else "hits")
+            return None if cached is None else self.model(**cached)
+
+        self._count("misses")
+        guard = (self._guard, self.backend.tag_version(self._guard))
+        row = getattr(repo, f"get_by_{field}")(value)
+        if from_replica(repo.db) and self._recently_written((field, value), ("id", row and row.id)):
+            return row
+        if row is None:
+            self.backend.set((self.entity, field, value), None, ttl=settings.ENTITY_CACHE_NEGATIVE_TTL, guard=guard)
+        else:
+            self._store(row.as_dict(), guard)
+        return row
+
+    def forget(self, row):
+        """Drop a created / updated row: its old keys (by tag) and any negative entries for its new values."""
+        self.invalidate(row.id, **{field: getattr(row, field) for field in self.fields[1:]})
+
+    def invalidate(self, entity_id: Optional[int] = None, **unique_values):
+        self.backend.invalidate_tag(self._guard)
+        if entity_id is not None:
+            self.backend.invalidate_tag((self.entity, entity_id))
+        keys = [(field, value) for field, value in {"id": entity_id, **unique_values}.items() if value is not None]
+        for field, value in keys:
+            self.backend.pop((self.entity, field, value))   # a negative entry carries no tag
+            if settings.READ_YOUR_WRITES_SECONDS > 0:
+                self.backend.set(("written", self.entity, field, value), True, ttl=settings.READ_YOUR_WRITES_SECONDS)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"hits": self.hits, "negative_hits": self.negative_hits, "misses": self.misses}
+
+    def _store(self, values: dict, guard):
+        tags = [(self.entity, values["id"])]
+        for field in self.fields:
+            if values.get(field) is not None:
+                self.backend.set((self.entity, field, values[field]), values, tags=tags, guard=guard)
+
+    def _recently_written(self, *keys) -> bool:
+        return any(self.backend.get(("written", self.entity, *key)) for key in keys if key[1] is not None)
+
+    def _count(self, counter: str):
+        with self._lock:
+            setattr(self, counter, getattr(self, counter) + 1)
+
+
+student_cache = EntityCache(Student, unique=("email", "username"))
+course_cache = EntityCache(Course, unique=("code",))
+lecturer_cache = EntityCache(Lecturer, unique=("email",))
+
+
+def entity_cache_stats() -> dict:
+    return {
+        "backend": entity_backend.stats(),
+        **{cache.entity: cache.stats() for cache in (student_cache, course_cache, lecturer_cache)},
+    }
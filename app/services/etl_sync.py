@@ -1,22 +1,298 @@
-from sqlalchemy import create_engine, Column, Integer, String
-from sqlalchemy.orm import declarative_base, sessionmaker
+# app/services/etl_sync.py
+"""
+Incremental, checkpointed SQL → Mongo ETL for the analytics star schema.
 
-SQLALCHEMY_DATABASE_URL = "sqlite:///./school.db"
+Each entity table is scanned in keyset chunks and bulk-upserted into its
+Mongo collection (dimStudents, dimCourses, dimLecturers, factEnrollments).
+A per-entity high-water mark on `updated_at` is persisted in
+`etl_checkpoints`, so a rerun only moves rows changed since the last run.
 
-engine = create_engine(
-    SQLALCHEMY_DATABASE_URL, connect_args={"check_same_thread": False}
+Run it as a CLI:
+    python -m app.services.etl_sync              # incremental
+    python -m app.services.etl_sync --full       # rescan everything
+    python -m app.services.etl_sync --entity enrollments
+
+or in-process via `etl_scheduler` (ETL_INTERVAL_SECONDS > 0).
+
+Fact documents embed their dimension attributes (app/services/fact_documents.py)
+and go to their semester's partition (app/db/fact_partitions.py); incremental
+runs also fan changed dimension rows out to the facts of every partition.
+
+Hard deletes are not visible to an `updated_at` scan; they reach Mongo
+through the sync outbox.
+"""
+
+import argparse
+import threading
+import time
+from datetime import datetime, timedelta
+
+from pymongo.errors import PyMongoError
+from sqlalchemy import and_, or_, select
+
+from app.config import settings
+from app.core.logger import logger
+from app.db.fact_partitions import FACTS, fact_key, is_fact_key, semester_of
+from app.db.mongo_db import mongo_db, MongoSyncBuffer
+from app.db.sql_db import ReadSessionLocal, SessionLocal
+from app.services.fact_documents import (
+    FANOUT,
+    dimensions_for,
+    fact_document,
+    lecturer_fact_fields,
+    student_fact_fields,
+)
+from app.models.sqlalchemy_models import (
+    Course,
+    Enrollment,
+    EtlCheckpoint,
+    Lecturer,
+    Student,
 )
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
-Base = declarative_base()
+# Mongo collection key → SQL model, in dimension-first order.
+ENTITIES = {
+    "students": Student,
+    "courses": Course,
+    "lecturers": Lecturer,
+    "enrollments": Enrollment,
+}
+
+# Dimension entity → fan-out key (FANOUT) used to refresh the attributes embedded in facts.
+FANOUT_KEYS = {
+    "students": "facts_by_student",
+    "courses": "facts_by_course",
+    "lecturers": "facts_by_lecturer",
+}
+
+
+def _row_to_doc(row) -> dict:
+    doc = dict(row._mapping)
+    doc.pop("updated_at", None)
+    if doc.get("grade") is not None:
+        doc["grade"] = float(doc["grade"])
+    return doc
+
+
+class EtlSync:
+    def __init__(self, session_factory=SessionLocal, chunk_size: int = None,
+                 read_session_factory=ReadSessionLocal):
+        self.session_factory = session_factory            # checkpoints
+        self.read_session_factory = read_session_factory  # table scans (kept off the writer)
+        self.chunk_size = chunk_size or settings.ETL_CHUNK_SIZE
+
+    # --------------------------------------------------------
+    # Entry point
+    # --------------------------------------------------------
+    def run(self, full: bool = False, entities=None) -> dict:
+        """
+        Sync the given entities (default: all). Returns {entity: rows_synced}.
+        A checkpoint only advances when its entity synced without errors.
+        """
+        if not mongo_db.connected:
+            mongo_db.connect()
+        if not mongo_db.connected:
+            raise RuntimeError("MongoDB is not available; ETL aborted.")
+
+        summary = {}
+        for entity in entities or ENTITIES:
+            summary[entity] = self.sync_entity(entity, full=full)
+        return summary
+
+    def sync_entity(self, entity: str, full: bool = False) -> int:
+        model = ENTITIES[entity]
+        table = model.__table__
+        db = self.session_factory()
+        reader = self.read_session_factory()
+        try:
+            checkpoint = db.get(EtlCheckpoint, entity) or EtlCheckpoint(entity=entity, rows_synced=0)
+            db.commit()   # don't hold the primary during the scan
+            since = None if full else checkpoint.high_water_mark
+            started_at = datetime.utcnow()
+            mode = "full" if since is None else f"incremental since {since.isoformat()}"
+            logger.info(f"🔄 ETL {entity}: {mode}")
+
+            buffer = MongoSyncBuffer(mongo_db)
+            fanouts = MongoSyncBuffer(mongo_db)
+            synced, failed = 0, 0
+            for rows in self._scan(reader, table, since):
+                docs = [_row_to_doc(row) for row in rows]
+                results = []   # batches that auto-flush (MONGO_BULK_BATCH_SIZE) count too
+                if entity == "enrollments":
+                    students, courses = dimensions_for(
+                        reader, (d["student_id"] for d in docs), (d["course_id"] for d in docs),
+                    )
+                    docs = [fact_document(d, students, courses) for d in docs]
+                    for doc in docs:
+                        results += buffer.upsert(fact_key(doc["semester"]), doc, tag=doc["id"])
+                else:
+                    for doc in docs:
+                        results += buffer.upsert(entity, doc, tag=doc["id"])
+                if since is not None and entity in FANOUT_KEYS:
+                    # A full run rewrites every fact after its dimensions anyway.
+                    results += self._fan_out(reader, fanouts, entity, rows)
+                chunk_failed, moved = 0, []
+                for result in results + buffer.flush() + fanouts.flush():
+                    if result.key == entity or (entity == FACTS and is_fact_key(result.key)):
+                        synced += len(result.succeeded)
+                    if semester_of(result.key) is not None:
+                        moved += result.succeeded
+                    chunk_failed += len(result.errors)
+                failed += chunk_failed
+                if full and entity == FACTS and moved and not chunk_failed:
+                    # Facts synced before partitioning: drop the unpartitioned copy of what moved.
+                    try:
+                        mongo_db.collection_for(FACTS).delete_many({"id": {"$in": moved}})
+                    except PyMongoError as exc:
+                        logger.error(f"❌ ETL {entity}: unpartitioned copies not removed: {exc}")
+                        failed += len(moved)
+
+            if failed:
+                logger.error(f"❌ ETL {entity}: {failed} document(s) rejected; checkpoint not advanced")
+                return synced
+
+            # Rows committed by transactions that were still open when the scan
+            # started may carry an earlier updated_at; the lag re-reads them.
+            checkpoint.high_water_mark = started_at - timedelta(seconds=settings.ETL_CHECKPOINT_LAG)
+            checkpoint.rows_synced = synced
+            checkpoint.last_run_at = started_at
+            db.merge(checkpoint)
+            db.commit()
+            logger.info(f"✅ ETL {entity}: {synced} row(s) synced")
+            return synced
+        finally:
+            reader.close()
+            db.close()
+
+    @staticmethod
+    def _fan_out(reader, fanouts: MongoSyncBuffer, entity: str, rows) -> list:
+        """One update_many per changed dimension row over the facts that embed it (returns auto-flushed batches)."""
+        key = FANOUT_KEYS[entity]
+        if entity == "courses":
+            fields = dimensions_for(reader, (), (row.id for row in rows))[1]   # with the lecturer's
+        else:
+            to_fields = student_fact_fields if entity == "students" else lecturer_fact_fields
+            fields = {row.id: to_fields(row) for row in rows}
+        partitions = mongo_db.fact_partition_keys()
+        results = []
+        for doc_id, values in fields.items():
+            for partition in partitions:
+                results += fanouts.update_many(partition, {FANOUT[key]: doc_id}, {"$set": values}, tag=(key, doc_id))
+        return results
+
+    # --------------------------------------------------------
+    # Keyset scans
+    # --------------------------------------------------------
+    def _scan(self, db, table, since):
+        """
+        Yield chunks of rows. Full scans walk the primary key; incremental scans
+        walk (updated_at, id) so each chunk is an index range read. Rows that
+        predate the updated_at column (NULL) are only picked up by full scans.
+        """
+        last_ts, last_id = since, 0
+        while True:
+            stmt = select(table)
+            if since is None:
+                stmt = stmt.where(table.c.id > last_id).order_by(table.c.id)
+            else:
+                stmt = stmt.where(or_(
+                    table.c.updated_at > last_ts,
+                    and_(table.c.updated_at == last_ts, table.c.id > last_id),
+                )).order_by(table.c.updated_at, table.c.id)
+
+            rows = db.execute(stmt.limit(self.chunk_size)).all()
+            if not rows:
+                return
+            yield rows
+            last_id = rows[-1].id
+            if since is not None:
+                last_ts = rows[-1].updated_at
+            if len(rows) < self.chunk_size:
+                return
+
+
+def legacy_facts_present(reader) -> bool:
+    """Whether the unpartitioned fact collection still holds facts whose enrollment has a semester."""
+    ids = []
+    for doc in mongo_db.collection_for(FACTS).find({}, {"_id": 0, "id": 1}):
+        ids.append(doc["id"])
+        if len(ids) == settings.BULK_LOOKUP_CHUNK:
+            if _any_with_semester(reader, ids):
+                return True
+            ids = []
+    return bool(ids) and _any_with_semester(reader, ids)
+
+
+def _any_with_semester(reader, ids) -> bool:
+    return reader.execute(
+        select(Enrollment.id).where(Enrollment.id.in_(ids), Enrollment.semester.isnot(None)).limit(1)
+    ).first() is not None
+
+
+def move_legacy_facts(etl: EtlSync = None) -> bool:
+    """
+    Facts synced before semester partitions (migration 0003) sit in the
+    unpartitioned collection, where the all-semester reports would count
+    them next to their partitioned copies. Move them with a full
+    enrollments ETL. Returns False if some are left (rejected writes).
+    """
+    reader = ReadSessionLocal()
+    try:
+        if not legacy_facts_present(reader):
+            return True
+        logger.info("🗓 Moving unpartitioned facts into their semester partitions …")
+        (etl or EtlSync()).sync_entity(FACTS, full=True)
+        return not legacy_facts_present(reader)
+    finally:
+        reader.close()
+
+
+class EtlScheduler:
+    """Runs incremental ETL every ETL_INTERVAL_SECONDS in a daemon thread."""
+
+    def __init__(self, etl: EtlSync = None):
+        self.etl = etl or EtlSync()
+        self._thread = None
+        self._stop = threading.Event()
+
+    def start(self):
+        if settings.ETL_INTERVAL_SECONDS <= 0 or not settings.MONGO_URI:
+            return
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="etl-scheduler", daemon=True)
+        self._thread.start()
+        logger.info(f"⏱ ETL scheduled every {settings.ETL_INTERVAL_SECONDS}s.")
+
+    def stop(self):
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout=5)
+            self._thread = None
+
+    def _run(self):
+        while not self._stop.wait(settings.ETL_INTERVAL_SECONDS):
+            try:
+                self.etl.run()
+            except Exception:
+                logger.exception("Scheduled ETL run failed")
+
+
+etl_scheduler = EtlScheduler()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="SQL → Mongo star-schema ETL")
+    parser.add_argument("--full", action="store_true", help="rescan every row instead of changes only")
+    parser.add_argument("--entity", action="append", choices=list(ENTITIES),
+                        help="limit the run to one entity (repeatable)")
+    args = parser.parse_args(argv)
 
-class Student(Base):
-    __tablename__ = "Students"
+    started = time.perf_counter()
+    summary = EtlSync().run(full=args.full, entities=args.entity)
+    logger.info(f"🏁 ETL finished in {time.perf_counter() - started:.1f}s: {summary}")
 
-    id = Column(Integer, primary_key=True, index=True)
-    name = Column(String)
-    age = Column(Integer)
-    gender = Column(String)
-    email = Column(String, unique=True)
 
-Base.metadata.create_all(bind=engine)
+if __name__ == "__main__":
+    main()
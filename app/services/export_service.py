@@ -0,0 +1,89 @@
+# app/services/export_service.py
+
+import csv
+import io
+import json
+from typing import Iterator
+
+from fastapi import HTTPException
+from sqlalchemy import select
+
+from app.config import settings
+from app.db.sql_db import ReadSessionLocal
+from app.models.sqlalchemy_models import Course, Enrollment, Lecturer, Student
+
+# Public entity name → SQL model. Only these tables can be exported.
+EXPORTABLE = {
+    "students": Student,
+    "courses": Course,
+    "lecturers": Lecturer,
+    "enrollments": Enrollment,
+}
+
+MEDIA_TYPES = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv",
+}
+
+
+class ExportService:
+    """
+    Full-table exports for BI tools.
+
+    Rows are read as plain Core tuples (no ORM identity map, no Pydantic
+    models) in chunks of EXPORT_CHUNK_SIZE and encoded chunk by chunk, so
+    memory stays flat no matter how large the table is and the first bytes
+    leave as soon as the first chunk is fetched.
+    """
+
+    def __init__(self, entity: str, fmt: str = "ndjson"):
+        if entity not in EXPORTABLE:
+            raise HTTPException(status_code=404, detail=f"Unknown export entity '{entity}'")
+        if fmt not in MEDIA_TYPES:
+            raise HTTPException(status_code=400, detail=f"Unsupported export format '{fmt}'")
+        self.entity = entity
+        self.fmt = fmt
+        self.table = EXPORTABLE[entity].__table__
+
+    @property
+    def media_type(self) -> str:
+        return MEDIA_TYPES[self.fmt]
+
+    @property
+    def filename(self) -> str:
+        return f"{self.entity}.{self.fmt}"
+
+    def stream(self) -> Iterator[str]:
+        """
+        Yield encoded chunks. The generator owns its session because it keeps
+        running after the request handler (and its dependencies) returned.
+        """
+        db = ReadSessionLocal()
+        try:
+            columns = [c.name for c in self.table.columns]
+            stmt = (
+                select(self.table)
+                .order_by(self.table.c.id)
+                .execution_options(yield_per=settings.EXPORT_CHUNK_SIZE)
+            )
+            result = db.execute(stmt)
+
+            if self.fmt == "csv":
+                yield self._csv_chunk([columns])
+
+            for rows in result.partitions():
+                if self.fmt == "csv":
+                    yield self._csv_chunk(rows)
+                else:
+                    yield "".join(
+                        json.dumps(dict(zip(columns, row)), default=str) + "\n"
+                        for row in rows
+                    )
+        finally:
+            db.close()
+
+    @staticmethod
+    def _csv_chunk(rows) -> str:
+        buf = io.StringIO()
+        csv.writer(buf).writerows(rows)
+        return buf.getvalue()
@@ -0,0 +1,125 @@
+# app/services/fact_documents.py
+"""
+Denormalized factEnrollments documents.
+
+Each fact carries the dimension attributes the analytics pipelines report,
+so they are single-collection $group scans with no $lookup:
+
+    {id, student_id, course_id, grade, semester,
+     student_name, student_email, student_username,
+     course_title, course_code,
+     lecturer_id, lecturer_name, department}
+
+and lives in its semester's partition (app/db/fact_partitions.py): stage
+fact writes under `fact_key(semester)`.
+
+New facts read their dimensions with one SELECT (`fact_dimensions`) or, for
+bulk paths, one IN query per dimension table (`dimensions_for`). Grade
+updates only `$set` the grade, so the embedded attributes stay.
+
+A dimension write fans out to its facts with a single update_many: it
+stages an upsert on a fan-out key (FANOUT) whose payload is the changed
+attributes, and the dispatcher turns it into
+    UpdateMany({"<dimension>_id": id}, {"$set": payload})
+applied after the per-document writes of the same batch.
+
+Facts synced before this layout have no attributes (and sit in the
+unpartitioned collection); the outbox dispatcher moves and backfills them
+on its first connect (`move_legacy_facts`), as does
+    python -m app.services.etl_sync --full --entity enrollments
+"""
+
+from typing import Dict, Iterable, Tuple
+
+from sqlalchemy import select
+
+from app.config import settings
+from app.models.sqlalchemy_models import Course, Lecturer, Student
+
+# Fan-out key (outbox collection) → fact field holding the dimension id.
+FANOUT = {
+    "facts_by_student": "student_id",
+    "facts_by_course": "course_id",
+    "facts_by_lecturer": "lecturer_id",
+}
+
+_STUDENT_COLUMNS = (
+    Student.name.label("student_name"),
+    Student.email.label("student_email"),
+    Student.username.label("student_username"),
+)
+_COURSE_COLUMNS = (
+    Course.title.label("course_title"),
+    Course.code.label("course_code"),
+    Course.lecturer_id.label("lecturer_id"),
+    Lecturer.name.label("lecturer_name"),
+    Lecturer.department.label("department"),
+)
+
+
+# --------------------------------------------------------
+# Attributes of one dimension row
+# --------------------------------------------------------
+def student_fact_fields(student) -> dict:
+    return {"student_name": student.name, "student_email": student.email, "student_username": student.username}
+
+
+def course_fact_fields(course) -> dict:
+    return {"course_title": course.title, "course_code": course.code, "lecturer_id": course.lecturer_id}
+
+
+def lecturer_fact_fields(lecturer) -> dict:
+    if lecturer is None:
+        return {"lecturer_name": None, "department": None}
+    return {"lecturer_name": lecturer.name, "department": lecturer.department}
+
+
+def enqueue_fanout(outbox, key: str, doc_id: int, fields: dict):
+    """Stage one update_many over the facts of dimension row `doc_id`."""
+    outbox.enqueue_upsert(key, {**fields, "id": doc_id})
+
+
+# --------------------------------------------------------
+# Loading attributes for new facts
+# --------------------------------------------------------
+def fact_dimensions(db, student_id: int, course_id: int) -> dict:
+    """Student + course + lecturer attributes of one enrollment, in one SELECT ({} if either is gone)."""
+    row = db.execute(
+        select(*_STUDENT_COLUMNS, *_COURSE_COLUMNS)
+        .select_from(Student)
+        .join(Course, Course.id == course_id)
+        .outerjoin(Lecturer, Lecturer.id == Course.lecturer_id)
+        .where(Student.id == student_id)
+    ).first()
+    return dict(row._mapping) if row is not None else {}
+
+
+def dimensions_for(db, student_ids: Iterable[int], course_ids: Iterable[int]) -> Tuple[Dict[int, dict], Dict[int, dict]]:
+    """({student_id: attributes}, {course_id: attributes}) in IN (...) chunks of BULK_LOOKUP_CHUNK."""
+    students = _load(db, select(Student.id, *_STUDENT_COLUMNS), Student.id, student_ids)
+    courses = _load(
+        db,
+        select(Course.id, *_COURSE_COLUMNS).outerjoin(Lecturer, Lecturer.id == Course.lecturer_id),
+        Course.id, course_ids,
+    )
+    return students, courses
+
+
+def fact_document(values: dict, students: Dict[int, dict], courses: Dict[int, dict]) -> dict:
+    """`values` (id, student_id, course_id, grade, semester) plus the attributes from `dimensions_for`."""
+    return {
+        **students.get(values["student_id"], {}),
+        **courses.get(values["course_id"], {}),
+        **values,
+    }
+
+
+def _load(db, stmt, id_column, ids) -> Dict[int, dict]:
+    ids = sorted(set(ids))
+    found = {}
+    chunk = settings.BULK_LOOKUP_CHUNK
+    for start in range(0, len(ids), chunk):
+        for row in db.execute(stmt.where(id_column.in_(ids[start:start + chunk]))):
+            fields = dict(row._mapping)
+            found[fields.pop("id")] = fields
+    return found
@@ -0,0 +1,239 @@
+# app/services/gpa_summary.py
+"""
+Pre-aggregated GPA summaries maintained next to the star schema.
+
+    courseGpaSummary  {id, title, code, grade_sum, graded_count, enrollment_count, avg_gpa}
+    studentGpaSummary {id, name, email, username, grade_sum, graded_count, enrollment_count, gpa}
+
+Enrollment writes enqueue `inc` outbox events carrying the delta they cause;
+course/student writes keep the descriptive fields current. The dispatcher
+applies each document's deltas as one atomic pipeline update that also
+recomputes the average, so /analytics reads are O(courses) or O(k).
+
+`student_gpa_cache` fronts the per-username point reads behind
+/students/me/gpa; entries are tagged ("student", id) and dropped on writes.
+
+Repair (recompute everything from SQL):
+    python -m app.services.gpa_summary --rebuild
+queues a rebuild request in the outbox; the draining dispatcher runs it in
+order, so no delta is applied while the summaries are being replaced (the
+command drains the outbox itself when no worker is running). A rebuild
+that completes without errors writes a marker document ({"id": "_built"})
+to each collection; until then the reports use the fact pipelines, since
+deltas alone only cover enrollments written after the summaries were
+introduced.
+"""
+
+import argparse
+from datetime import datetime
+from typing import List, NamedTuple, Optional
+
+from sqlalchemy import func, select
+
+from app.config import settings
+from app.core.cache import make_cache
+from app.core.logger import logger
+from app.db.fact_partitions import fact_key
+
+# Summary collection key → field holding the derived average.
+AVERAGE_FIELD = {
+    "course_gpa": "avg_gpa",
+    "student_gpa": "gpa",
+}
+COUNTERS = ("grade_sum", "graded_count", "enrollment_count")
+
+# Outbox collection of rebuild requests (op "rebuild"), run by the dispatcher
+REBUILD = "gpa_summary"
+
+# username → {"student_id", "gpa", "graded_count"} (see AnalyticsService.get_student_gpa)
+student_gpa_cache = make_cache(
+    "student_gpa", settings.STUDENT_GPA_CACHE_SIZE, ttl=settings.STUDENT_GPA_CACHE_TTL, slot_bytes=256,
+)
+
+
+def invalidate_student_gpa(student_id: int):
+    student_gpa_cache.invalidate_tag(("student", student_id))
+
+
+# --------------------------------------------------------
+# Write path: deltas
+# --------------------------------------------------------
+def grade_delta(old_grade: Optional[float], new_grade: Optional[float], enrolled: int = 0) -> dict:
+    """
+    Counter changes for one enrollment whose grade goes from old to new.
+    `enrolled` is +1 for a new enrollment, -1 for a removed one, 0 otherwise.
+    """
+    delta = {"grade_sum": 0.0, "graded_count": 0, "enrollment_count": enrolled}
+    if old_grade is not None:
+        delta["grade_sum"] -= old_grade
+        delta["graded_count"] -= 1
+    if new_grade is not None:
+        delta["grade_sum"] += new_grade
+        delta["graded_count"] += 1
+    return {k: v for k, v in delta.items() if v}
+
+
+def enqueue_enrollment_delta(outbox, student_id: int, course_id: int, delta: dict):
+    """Stage the course- and student-side summary increments for one enrollment change."""
+    if not delta:
+        return
+    outbox.enqueue_inc("course_gpa", course_id, delta)
+    outbox.enqueue_inc("student_gpa", student_id, delta)
+
+
+def enqueue_enrollment_removals(outbox, enrollments):
+    """
+    Stage the fact deletes and negative deltas for enrollments removed by an
+    ORM cascade (student / course / lecturer deletes). Call before the delete.
+    """
+    for enr in enrollments:
+        outbox.enqueue_delete(fact_key(enr.semester), enr.id)
+        enqueue_enrollment_delta(outbox, enr.student_id, enr.course_id, grade_delta(enr.grade, None, -1))
+
+
+def course_summary_fields(course) -> dict:
+    return {"id": course.id, "title": course.title, "code": course.code}
+
+
+def student_summary_fields(student) -> dict:
+    return {"id": student.id, "name": student.name, "email": student.email, "username": student.username}
+
+
+# --------------------------------------------------------
+# Dispatcher side: Mongo updates
+# --------------------------------------------------------
+def summary_update(key: str, set_fields: dict, inc_fields: dict) -> list:
+    """
+    Pipeline update applying `$set` + counter increments and recomputing the
+    average in the same atomic write. Literal values are wrapped so strings
+    starting with '$' are never read as field paths.
+    """
+    stage = {k: {"$literal": v} for k, v in set_fields.items()}
+    for counter, amount in inc_fields.items():
+        stage[counter] = {"$add": [{"$ifNull": [f"${counter}", 0]}, amount]}
+    average = {
+        "$cond": [
+            {"$gt": [{"$ifNull": ["$graded_count", 0]}, 0]},
+            {"$divide": ["$grade_sum", "$graded_count"]},
+            None,
+        ]
+    }
+    return [{"$set": stage}, {"$set": {AVERAGE_FIELD[key]: average}}]
+
+
+def summary_document(key: str, doc_id: int, set_fields: dict, counters: dict) -> dict:
+    """Full replacement document (after a delete, or when rebuilding)."""
+    doc = {**set_fields, "id": doc_id}
+    for counter in COUNTERS:
+        doc[counter] = counters.get(counter, 0)
+    doc[AVERAGE_FIELD[key]] = doc["grade_sum"] / doc["graded_count"] if doc["graded_count"] else None
+    return doc
+
+
+# --------------------------------------------------------
+# Repair: recompute from SQL
+# --------------------------------------------------------
+class SummaryRebuild(NamedTuple):
+    counts: dict          # summary key → documents written
+    errors: int
+    covered: List[int]    # pending summary events already counted in the rebuild's snapshot
+
+
+def rebuild_summaries(db, mongo) -> SummaryRebuild:
+    """
+    Recompute every summary from one SQL snapshot, read through `db` (a fresh
+    read session on the primary). Summary events still pending in that
+    snapshot are already counted in it: the caller deletes `covered` instead
+    of applying them. Only the draining outbox dispatcher may call this: a
+    drain running alongside would have its deltas overwritten or repeated.
+    """
+    from app.db.mongo_db import MongoSyncBuffer
+    from app.models.sqlalchemy_models import Course, Enrollment, OutboxEvent, Student
+
+    def counters(grade_sum, graded, enrolled):
+        return {"grade_sum": float(grade_sum or 0), "graded_count": graded, "enrollment_count": enrolled}
+
+    if db.get_bind().dialect.name == "postgresql":
+        # one snapshot for every query below (SQLite's read transaction already is one)
+        db.connection(execution_options={"isolation_level": "REPEATABLE READ"})
+    pending = db.execute(
+        select(OutboxEvent.id, OutboxEvent.collection, OutboxEvent.doc_id)
+        .where(OutboxEvent.collection.in_(list(AVERAGE_FIELD)), OutboxEvent.status == "pending")
+    ).all()
+
+    buffer = MongoSyncBuffer(mongo)
+    seen = {"course_gpa": [], "student_gpa": []}
+
+    course_rows = db.execute(
+        select(Course.id, Course.title, Course.code,
+               func.sum(Enrollment.grade), func.count(Enrollment.grade), func.count(Enrollment.id))
+        .outerjoin(Enrollment, Enrollment.course_id == Course.id)
+        .group_by(Course.id, Course.title, Course.code)
+    )
+    for cid, title, code, total, graded, enrolled in course_rows:
+        fields = {"title": title, "code": code}
+        buffer.replace("course_gpa", summary_document("course_gpa", cid, fields, counters(total, graded, enrolled)),
+                       tag=("course_gpa", cid))
+        seen["course_gpa"].append(cid)
+
+    student_rows = db.execute(
+        select(Student.id, Student.name, Student.email, Student.username,
+               func.sum(Enrollment.grade), func.count(Enrollment.grade), func.count(Enrollment.id))
+        .outerjoin(Enrollment, Enrollment.student_id == Student.id)
+        .group_by(Student.id, Student.name, Student.email, Student.username)
+    )
+    for sid, name, email, username, total, graded, enrolled in student_rows:
+        fields = {"name": name, "email": email, "username": username}
+        buffer.replace("student_gpa", summary_document("student_gpa", sid, fields, counters(total, graded, enrolled)),
+                       tag=("student_gpa", sid))
+        seen["student_gpa"].append(sid)
+
+    failed = {tag for result in buffer.flush() for tag in result.errors}
+    errors = len(failed)
+    for key, ids in seen.items():
+        collection = mongo.collection_for(key)
+        collection.delete_many({"id": {"$nin": ids}})   # also drops the marker …
+        if not errors:                                   # … which only a clean rebuild writes back
+            marker = {"id": mongo.SUMMARY_BUILT, "built_at": datetime.utcnow()}
+            collection.replace_one({"id": mongo.SUMMARY_BUILT}, marker, upsert=True)
+
+    summary = {key: len(ids) for key, ids in seen.items()}
+    logger.info(f"✅ GPA summaries rebuilt: {summary}, {errors} error(s)")
+    covered = [event_id for event_id, key, doc_id in pending if (key, doc_id) not in failed]
+    return SummaryRebuild(summary, errors, covered)
+
+
+if __name__ == "__main__":
+    from app.db.mongo_db import mongo_db
+    from app.db.sql_db import SessionLocal
+    from app.repositories.outbox_repo import OutboxRepository
+    from app.services.outbox_dispatcher import OutboxDispatcher
+
+    parser = argparse.ArgumentParser(description="GPA summary collections")
+    parser.add_argument("--rebuild", action="store_true", help="recompute every summary from SQL")
+    args = parser.parse_args()
+    if not args.rebuild:
+        parser.print_help()
+        raise SystemExit(0)
+    if not settings.MONGO_URI:
+        raise SystemExit("MongoDB is not configured (MONGO_URI).")
+
+    session = SessionLocal()
+    try:
+        OutboxRepository(session).enqueue(REBUILD, "rebuild", 0)
+        session.commit()
+    finally:
+        session.close()
+
+    dispatcher = OutboxDispatcher()
+    if not dispatcher.lock.acquire():
+        print("Rebuild queued: the running outbox dispatcher applies it after the events before it.")
+        raise SystemExit(0)
+    try:
+        # No worker is draining: drain here, up to and including the request.
+        mongo_db.connect()
+        if not mongo_db.connected:
+            raise SystemExit("MongoDB is not available; the rebuild stays queued.")
+        dispatcher.drain()
+    finally:
+        dispatcher.lock.release()
@@ -0,0 +1,259 @@
+# app/services/grade_import_service.py
+
+import csv
+import io
+import json
+import math
+from collections import defaultdict
+from datetime import datetime
+from itertools import islice
+from typing import Any, BinaryIO, Dict, Iterator, List, Optional, Tuple
+
+from fastapi import HTTPException
+from sqlalchemy import select, tuple_
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+
+from app.config import settings
+from app.models.pydantic import BulkRowResult, GradeImportResult
+from app.db.fact_partitions import fact_key
+from app.models.sqlalchemy_models import Course, Enrollment, Student
+from app.repositories.columnar_analytics_repo import columnar_analytics
+from app.repositories.enrollment_repo import course_semester
+from app.repositories.outbox_repo import OutboxRepository
+from app.services.fact_documents import dimensions_for, fact_document
+from app.services.gpa_summary import grade_delta, invalidate_student_gpa
+from app.services.result_cache import invalidate_analytics
+from app.services.outbox_dispatcher import outbox_dispatcher
+
+# Dialects with INSERT ... ON CONFLICT (student_id, course_id) DO UPDATE.
+UPSERT_INSERT = {
+    "postgresql": pg_insert,
+    "sqlite": sqlite_insert,
+}
+
+IMPORT_FORMATS = ("csv", "ndjson")
+
+
+class GradeImportService:
+    """
+    Whole-class grade uploads.
+
+    The file is parsed row by row and applied in chunks of GRADE_IMPORT_CHUNK:
+    one IN (...) lookup resolves course codes / student emails, one
+    SELECT ... FOR UPDATE reads the current grades, and one
+    INSERT ... ON CONFLICT (student_id, course_id) DO UPDATE ... RETURNING
+    writes the chunk. Everything commits in a single transaction; the GPA
+    summary deltas are summed over the whole file and staged once, and the
+    columnar engine / GPA cache are updated once after the commit.
+
+    Each row carries `grade` plus either `student_id` + `course_id` or
+    `student_email` + `course_code`. An empty grade clears it.
+    """
+
+    def __init__(self, db):
+        self.db = db
+        self.outbox = OutboxRepository(db)
+        self.chunk_size = settings.GRADE_IMPORT_CHUNK
+        self._course_ids: Dict[str, int] = {}      # code → id, filled as chunks need them
+        self._student_ids: Dict[str, int] = {}     # email → id
+        self._known_courses: set = set()
+        self._known_students: set = set()
+
+    def import_file(self, stream: BinaryIO, fmt: str, create_missing: bool = False) -> GradeImportResult:
+        if fmt not in IMPORT_FORMATS:
+            raise HTTPException(status_code=400, detail=f"Unsupported import format '{fmt}'")
+        insert = UPSERT_INSERT.get(self.db.get_bind().dialect.name)
+        if insert is None:
+            raise HTTPException(status_code=501, detail="Grade import needs PostgreSQL or SQLite")
+
+        text = io.TextIOWrapper(stream, encoding="utf-8-sig", newline="")
+        rows = self._parse_csv(text) if fmt == "csv" else self._parse_ndjson(text)
+
+        errors: List[BulkRowResult] = []
+        failed = created = updated = 0
+        deltas = defaultdict(lambda: defaultdict(int))     # (summary key, id) → counter → amount
+        applied: Dict[int, tuple] = {}   # enrollment id → (student, course, grade, semester)
+
+        def reject(row: int, message: str):
+            nonlocal failed
+            failed += 1
+            if len(errors) < settings.GRADE_IMPORT_MAX_ERRORS:
+                errors.append(BulkRowResult(row=row, status="error", error=message))
+
+        while True:
+            chunk = list(islice(rows, self.chunk_size))
+            if not chunk:
+                break
+            keyed = self._resolve(chunk, reject)
+            if not keyed:
+                continue
+
+            current = self._current_grades(list(keyed))
+            values = []
+            for pair, (row, grade) in keyed.items():
+                if pair not in current and not create_missing:
+                    reject(row, f"student {pair[0]} is not enrolled in course {pair[1]}")
+                    continue
+                values.append({"student_id": pair[0], "course_id": pair[1], "grade": grade,
+                               # new enrollments take the course's semester (existing ones keep theirs)
+                               "semester": course_semester(pair[1]) if pair not in current else None,
+                               "updated_at": datetime.utcnow()})
+            if not values:
+                continue
+
+            stmt = insert(Enrollment.__table__).values(values)
+            stmt = stmt.on_conflict_do_update(
+                index_elements=["student_id", "course_id"],
+                set_={"grade": stmt.excluded.grade, "updated_at": stmt.excluded.updated_at},
+            ).returning(
+                Enrollment.id, Enrollment.student_id, Enrollment.course_id, Enrollment.grade, Enrollment.semester,
+            )
+
+            written = self.db.execute(stmt).all()
+            students, courses = ({}, {})
+            if self.outbox.enabled:
+                students, courses = dimensions_for(self.db, (r[1] for r in written), (r[2] for r in written))
+            docs = []
+            for enr_id, student_id, course_id, grade, semester in written:
+                existed = (student_id, course_id) in current
+                created += not existed
+                updated += existed
+                delta = grade_delta(current.get((student_id, course_id)), grade, 0 if existed else 1)
+                for key, doc_id in (("course_gpa", course_id), ("student_gpa", student_id)):
+                    for counter, amount in delta.items():
+                        deltas[(key, doc_id)][counter] += amount
+                applied[enr_id] = (student_id, course_id, grade, semester)
+                fact = {"id": enr_id, "student_id": student_id, "course_id": course_id, "grade": grade,
+                        "semester": semester}
+                docs.append((fact_key(semester), "upsert", enr_id, fact_document(fact, students, courses)))
+            self.outbox.enqueue_many(docs)
+
+        # One summed increment per course / student for the whole file.
+        self.outbox.enqueue_many(
+            (key, "inc", doc_id, {c: v for c, v in delta.items() if v})
+            for (key, doc_id), delta in deltas.items()
+            if any(delta.values())
+        )
+        self.db.commit()
+        outbox_dispatcher.notify()
+
+        for enr_id, (student_id, course_id, grade, semester) in applied.items():
+            columnar_analytics.upsert_enrollment(enr_id, student_id, course_id, grade, semester)
+        for student_id in {student_id for student_id, _, _, _ in applied.values()}:
+            invalidate_student_gpa(student_id)
+        if applied:
+            invalidate_analytics(*{semester for _, _, _, semester in applied.values()})
+
+        errors.sort(key=lambda r: r.row)
+        return GradeImportResult(created=created, updated=updated, failed=failed, errors=errors)
+
+    # --------------------------------------------------------
+    # Parsing (lazy: one row in memory at a time)
+    # --------------------------------------------------------
+    def _parse_csv(self, text) -> Iterator[Tuple[int, Any]]:
+        reader = csv.DictReader(text)
+        for i, record in enumerate(reader):
+            yield i, {k.strip(): (v.strip() if isinstance(v, str) else v) for k, v in record.items() if k}
+
+    def _parse_ndjson(self, text) -> Iterator[Tuple[int, Any]]:
+        i = 0
+        for line in text:
+            if not line.strip():
+                continue
+            try:
+                record = json.loads(line)
+            except ValueError:
+                record = None
+            yield i, record
+            i += 1
+
+    # --------------------------------------------------------
+    # Per-chunk checks
+    # --------------------------------------------------------
+    def _resolve(self, chunk, reject) -> Dict[Tuple[int, int], Tuple[int, Optional[float]]]:
+        """
+        (student_id, course_id) → (row, grade) for the valid rows of a chunk.
+        A pair repeated in the chunk keeps its last grade (one ON CONFLICT
+        statement may not touch a row twice).
+        """
+        parsed = []
+        for row, record in chunk:
+            if not isinstance(record, dict):
+                reject(row, "Row must be a JSON object")
+                continue
+            try:
+                grade = _parse_grade(record.get("grade"))
+                student = _parse_ref(record, "student_id", "student_email")
+                course = _parse_ref(record, "course_id", "course_code")
+            except ValueError as exc:
+                reject(row, str(exc))
+                continue
+            parsed.append((row, student, course, grade))
+
+        self._lookup(
+            Course.code, self._course_ids, self._known_courses, Course.id,
+            {c for _, _, c, _ in parsed if isinstance(c, str)}, {c for _, _, c, _ in parsed if isinstance(c, int)},
+        )
+        self._lookup(
+            Student.email, self._student_ids, self._known_students, Student.id,
+            {s for _, s, _, _ in parsed if isinstance(s, str)}, {s for _, s, _, _ in parsed if isinstance(s, int)},
+        )
+
+        keyed = {}
+        for row, student, course, grade in parsed:
+            student_id = self._student_ids.get(student) if isinstance(student, str) else student
+            course_id = self._course_ids.get(course) if isinstance(course, str) else course
+            if student_id is None or student_id not in self._known_students:
+                reject(row, f"Unknown student {student}")
+            elif course_id is None or course_id not in self._known_courses:
+                reject(row, f"Unknown course {course}")
+            else:
+                keyed.pop((student_id, course_id), None)
+                keyed[(student_id, course_id)] = (row, grade)
+        return keyed
+
+    def _lookup(self, natural_key, by_key: dict, known_ids: set, id_column, keys: set, ids: set):
+        """Fill the code/email → id map and the set of existing ids for what this chunk needs."""
+        keys = [k for k in keys if k not in by_key]
+        if keys:
+            for key, found_id in self.db.execute(select(natural_key, id_column).where(natural_key.in_(keys))):
+                by_key[key] = found_id
+                known_ids.add(found_id)
+        ids = [i for i in ids if i not in known_ids]
+        if ids:
+            known_ids.update(self.db.execute(select(id_column).where(id_column.in_(ids))).scalars())
+
+    def _current_grades(self, pairs) -> Dict[Tuple[int, int], Optional[float]]:
+        """Current grade per existing (student_id, course_id), locked until commit."""
+        stmt = (
+            select(Enrollment.student_id, Enrollment.course_id, Enrollment.grade)
+            .where(tuple_(Enrollment.student_id, Enrollment.course_id).in_(pairs))
+            .with_for_update()
+        )
+        return {(s, c): g for s, c, g in self.db.execute(stmt)}
+
+
+def _parse_grade(value) -> Optional[float]:
+    if value is None or value == "":
+        return None
+    try:
+        grade = float(value)
+    except (TypeError, ValueError):
+        raise ValueError(f"grade: not a number ({value!r})")
+    if not math.isfinite(grade):
+        raise ValueError(f"grade: not a number ({value!r})")
+    return grade
+
+
+def _parse_ref(record: dict, id_field: str, natural_field: str):
+    """The int id, or the code/email string to resolve; exactly one must be given."""
+    raw_id, natural = record.get(id_field), record.get(natural_field)
+    if raw_id not in (None, ""):
+        try:
+            return int(raw_id)
+        except (TypeError, ValueError):
+            raise ValueError(f"{id_field}: not an integer ({raw_id!r})")
+    if isinstance(natural, str) and natural:
+        return natural
+    raise ValueError(f"{id_field} or {natural_field}: Field required")
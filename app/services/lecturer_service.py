@@ -1,46 +1,62 @@
 from fastapi import HTTPException
 from app.repositories.lecturer_repo import LecturerRepository
-from app.models.pydantic import LecturerCreate, LecturerUpdate, LecturerOut
-from app.db.mongo_db import mongo_db
+from app.repositories.course_repo import CourseRepository
+from app.repositories.enrollment_repo import EnrollmentRepository
+from app.models.pydantic import LecturerCreate, LecturerUpdate, LecturerOut, Page
+from app.core.pagination import clamp_limit, decode_cursor, split_page
+from app.repositories.outbox_repo import OutboxRepository
+from app.services.unit_of_work import UnitOfWork
+from app.services.gpa_summary import enqueue_enrollment_removals, invalidate_student_gpa
+from app.services.entity_cache import course_cache, lecturer_cache
+from app.services.fact_documents import enqueue_fanout, lecturer_fact_fields
+from app.services.result_cache import invalidate_catalog
+from app.repositories.columnar_analytics_repo import columnar_analytics
 
 
 class LecturerService:
 
     def __init__(self, db):
+        self.db = db
         self.repo = LecturerRepository(db)
+        self.courses = CourseRepository(db)
+        self.enrollments = EnrollmentRepository(db)
+        self.outbox = OutboxRepository(db)
+        self.uow = UnitOfWork(db, conflicts={"email": "Email already registered"})
 
     # ---------------------------------------------
     # Create Lecturer (Admin)
     # ---------------------------------------------
     def create_lecturer(self, payload: LecturerCreate):
-        existing = self.repo.get_by_email(payload.email)
-        if existing:
-            raise HTTPException(status_code=400, detail="Email already registered")
+        with self.uow:
+            lecturer = self.repo.create(payload.name, payload.department, payload.email)
 
-        lecturer = self.repo.create(payload.name, payload.department, payload.email)
-
-        # 🔄 SYNC → MongoDB
-        mongo_db.sync_lecturer({
-            "id": lecturer.id,
-            "name": lecturer.name,
-            "department": lecturer.department,
-            "email": lecturer.email
-        })
+            # 🔄 SYNC → MongoDB (via outbox, same transaction)
+            self.outbox.enqueue_upsert("lecturers", lecturer.as_dict())
+            self.uow.after_commit(lecturer_cache.forget, lecturer)
 
         return LecturerOut.from_orm(lecturer)
 
     # ---------------------------------------------
-    # Fetch All Lecturers
+    # Fetch a Page of Lecturers
     # ---------------------------------------------
-    def get_all_lecturers(self):
-        lecturers = self.repo.get_all()
-        return [LecturerOut.from_orm(l) for l in lecturers]
+    def get_lecturers_page(self, limit: int = None, after: str = None):
+        limit = clamp_limit(limit)
+        rows = self.repo.get_page(limit, decode_cursor(after))
+        lecturers, next_cursor = split_page(rows, limit)
+        return Page[LecturerOut](
+            items=[LecturerOut.from_orm(l) for l in lecturers],
+            next_cursor=next_cursor,
+        )
+
+    # Same page as row tuples, for the binary formats (no LecturerOut per row)
+    def get_lecturers_rows(self, limit: int = None, after: str = None):
+        return self.repo.get_page_rows(tuple(LecturerOut.model_fields), clamp_limit(limit), decode_cursor(after))
 
     # ---------------------------------------------
     # Fetch One Lecturer
     # ---------------------------------------------
     def get_lecturer_by_id(self, lecturer_id: int):
-        lecturer = self.repo.get_by_id(lecturer_id)
+        lecturer = lecturer_cache.get(self.repo, "id", lecturer_id)
         if not lecturer:
             raise HTTPException(status_code=404, detail="Lecturer not found")
         return LecturerOut.from_orm(lecturer)
@@ -49,24 +65,20 @@ class LecturerService:
     # Update Lecturer (Admin)
     # ---------------------------------------------
     def update_lecturer(self, lecturer_id: int, payload: LecturerUpdate):
-        lecturer = self.repo.get_by_id(lecturer_id)
-        if not lecturer:
-            raise HTTPException(status_code=404, detail="Lecturer not found")
-
-        updated = self.repo.update(
-            lecturer_id,
-            payload.name,
-            payload.department,
-            payload.email,
-        )
-
-        # 🔄 SYNC → MongoDB
-        mongo_db.sync_lecturer({
-            "id": updated.id,
-            "name": updated.name,
-            "department": updated.department,
-            "email": updated.email
-        })
+        with self.uow:
+            updated = self.repo.update(
+                lecturer_id,
+                payload.name,
+                payload.department,
+                payload.email,
+            )
+            if not updated:
+                raise HTTPException(status_code=404, detail="Lecturer not found")
+
+            # 🔄 SYNC → MongoDB (via outbox, same transaction)
+            self.outbox.enqueue_upsert("lecturers", updated.as_dict())
+            enqueue_fanout(self.outbox, "facts_by_lecturer", lecturer_id, lecturer_fact_fields(updated))
+            self.uow.after_commit(lecturer_cache.forget, updated)
 
         return LecturerOut.from_orm(updated)
 
@@ -74,11 +86,26 @@ class LecturerService:
     # Delete Lecturer
     # ---------------------------------------------
     def delete_lecturer(self, lecturer_id: int):
-        lecturer = self.repo.delete(lecturer_id)
-        if not lecturer:
-            raise HTTPException(status_code=404, detail="Lecturer not found")
-
-        # 🔄 Soft-remove in MongoDB (set deleted flag)
-        mongo_db.sync_lecturer({"id": lecturer_id, "deleted": True})
+        with self.uow:
+            # courses (and their enrollments) go with the lecturer
+            removed = self.enrollments.delete_for_lecturer(lecturer_id)
+            course_ids = self.courses.delete_for_lecturer(lecturer_id)
+            if not self.repo.delete(lecturer_id):
+                raise HTTPException(status_code=404, detail="Lecturer not found")
+
+            enqueue_enrollment_removals(self.outbox, removed)
+            for course_id in course_ids:
+                self.outbox.enqueue_upsert("courses", {"id": course_id, "deleted": True})
+                self.outbox.enqueue_delete("course_gpa", course_id)
+                self.uow.after_commit(columnar_analytics.drop_course, course_id)
+                self.uow.after_commit(course_cache.invalidate, course_id)
+
+            # 🔄 Soft-remove in MongoDB (set deleted flag)
+            self.outbox.enqueue_upsert("lecturers", {"id": lecturer_id, "deleted": True})
+            self.uow.after_commit(lecturer_cache.invalidate, lecturer_id)
+            if course_ids:
+                self.uow.after_commit(invalidate_catalog)
+            for student_id in {enr.student_id for enr in removed}:
+                self.uow.after_commit(invalidate_student_gpa, student_id)
 
         return {"message": "Lecturer deleted successfully"}
@@ -0,0 +1,289 @@
+# app/services/outbox_dispatcher.py
+
+import threading
+import time
+
+from pymongo.errors import ConnectionFailure
+
+from app.config import settings
+from app.core.logger import logger
+from app.db.mongo_db import mongo_db, MongoSyncBuffer
+from app.db.leader_lock import LeaderLock
+from app.db.sql_db import PrimaryReadSessionLocal, SessionLocal, engine
+from app.repositories.outbox_repo import OutboxRepository
+from app.db.fact_partitions import is_fact_key, semester_of
+from app.services.result_cache import invalidate_analytics, invalidate_reports
+from app.services.fact_documents import FANOUT
+from app.services.etl_sync import move_legacy_facts
+from app.services.gpa_summary import (
+    AVERAGE_FIELD,
+    REBUILD,
+    invalidate_student_gpa,
+    rebuild_summaries,
+    student_gpa_cache,
+    summary_document,
+    summary_update,
+)
+
+
+class OutboxDispatcher:
+    """
+    Background worker that drains `sync_outbox` into MongoDB.
+
+    Each batch is folded into one write per document (see `_collapse`) and
+    sent as unordered bulk_write batches, so per-document order is preserved
+    while a rejected document only holds back its own events. When Mongo is
+    unreachable the whole queue waits (with exponential backoff) and nothing
+    is dropped; only events Mongo itself rejects count towards
+    OUTBOX_MAX_ATTEMPTS before being parked as `dead`.
+
+    Every worker process starts one, but only the holder of the outbox
+    LeaderLock drains; the others poll for the lock and take over when its
+    holder exits. Two drainers would apply each batch twice (counting `inc`
+    deltas twice) and could apply one document's events out of order.
+    """
+
+    def __init__(self, session_factory=SessionLocal, lock: LeaderLock = None):
+        self.session_factory = session_factory
+        self.lock = lock or LeaderLock(engine, "outbox")
+        self._thread = None
+        self._stop = threading.Event()
+        self._wake = threading.Event()
+        self._backoff = 0.0
+        self._legacy_checked = False   # unpartitioned facts moved (once per start, see move_legacy_facts)
+
+    # --------------------------------------------------------
+    # Lifecycle
+    # --------------------------------------------------------
+    def start(self):
+        if not settings.MONGO_URI:
+            logger.info("📭 Outbox dispatcher disabled (SQL-only mode).")
+            return
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._legacy_checked = False
+        self._thread = threading.Thread(target=self._run, name="outbox-dispatcher", daemon=True)
+        self._thread.start()
+        logger.info("📬 Outbox dispatcher started.")
+
+    def stop(self, flush: bool = True, timeout: float = None):
+        """Stop the worker; with `flush`, drain what is pending first (bounded by timeout)."""
+        timeout = settings.OUTBOX_SHUTDOWN_TIMEOUT if timeout is None else timeout
+        self._stop.set()
+        self._wake.set()
+        if self._thread:
+            self._thread.join(timeout)
+            if self._thread.is_alive():
+                # still inside a drain: a second one here would apply the same events concurrently
+                logger.warning("⚠ Outbox dispatcher did not stop in time; skipping the shutdown drain.")
+                return
+            self._thread = None
+        if flush and mongo_db.connected and self.lock.held:
+            self.drain(deadline=time.monotonic() + timeout)
+        self.lock.release()
+
+    def notify(self):
+        """Wake the worker right after a commit instead of waiting for the next poll."""
+        self._wake.set()
+
+    # --------------------------------------------------------
+    # Draining
+    # --------------------------------------------------------
+    def drain(self, deadline: float = None) -> int:
+        total = 0
+        while deadline is None or time.monotonic() < deadline:
+            try:
+                applied = self.run_once()
+            except ConnectionFailure as exc:
+                logger.warning(f"⚠ Outbox drain stopped, MongoDB unavailable: {exc}")
+                break
+            if not applied:
+                break
+            total += applied
+        if total:
+            logger.info(f"📬 Outbox drained {total} event(s).")
+        return total
+
+    def run_once(self) -> int:
+        """
+        Apply one batch of pending events. Returns how many were applied.
+        Raises ConnectionFailure when Mongo is down so the caller backs off.
+        """
+        db = self.session_factory()
+        repo = OutboxRepository(db)
+        applied = []
+        try:
+            events = repo.fetch_pending(settings.OUTBOX_BATCH_SIZE)
+            for position, event in enumerate(events):
+                if event.collection == REBUILD:
+                    if position == 0:
+                        applied = self._rebuild_summaries(repo, event)
+                        return len(applied)
+                    events = events[:position]   # everything before the rebuild goes first
+                    break
+            groups = self._collapse(events)
+            if not groups:
+                return 0
+
+            buffer = MongoSyncBuffer(mongo_db)
+            fanouts = []
+            for (key, doc_id), (mode, doc, inc, _) in groups.items():
+                tag = (key, doc_id)
+                if key in FANOUT:
+                    fanouts.append((tag, {k: v for k, v in (doc or {}).items() if k != "id"}))
+                elif mode == "delete":
+                    buffer.delete(key, doc_id, tag=tag)
+                elif mode == "replace" and key in AVERAGE_FIELD:
+                    buffer.replace(key, summary_document(key, doc_id, doc, inc or {}), tag=tag)
+                elif mode == "replace":
+                    buffer.replace(key, {**doc, "id": doc_id}, tag=tag)
+                elif inc:
+                    buffer.update(key, doc_id, summary_update(key, doc, inc), tag=tag)
+                else:
+                    buffer.upsert(key, {**doc, "id": doc_id}, tag=tag)
+
+            results = buffer.flush()
+            if fanouts:
+                try:
+                    results += self._fan_out(fanouts)
+                except ConnectionFailure as exc:
+                    # Keep what was applied above; the fan-out events stay pending.
+                    logger.warning(f"⚠ Fact fan-out deferred, MongoDB unavailable: {exc}")
+
+            # A fan-out writes every partition under one tag: it is applied only if all of them were.
+            succeeded, failed = set(), {}
+            for result in results:
+                succeeded.update(result.succeeded)
+                failed.update(result.errors)
+            for tag in succeeded - failed.keys():
+                applied.extend(e.id for e in groups[tag][3])
+                if tag[0] == "student_gpa":
+                    invalidate_student_gpa(tag[1])
+            for tag, error in failed.items():
+                oldest = groups[tag][3][0]
+                logger.error(f"❌ Outbox sync of {tag[0]}/{tag[1]} failed (event {oldest.id}): {error}")
+                repo.record_failure(oldest, error, settings.OUTBOX_MAX_ATTEMPTS)
+            if applied:
+                # Mongo-backed reports changed just now
+                applied_tags = succeeded - failed.keys()
+                invalidate_analytics(*(semester_of(key) for key, _ in applied_tags if is_fact_key(key)))
+                if any(key in FANOUT for key, _ in applied_tags):
+                    invalidate_reports()
+            return len(applied)
+        finally:
+            repo.remove(applied)
+            db.commit()
+            db.close()
+
+    @staticmethod
+    def _rebuild_summaries(repo, request) -> list:
+        """
+        Run a queued GPA summary rebuild. Nothing else drains meanwhile, so the
+        summary events it already counts (`covered`) are removed unapplied.
+        Returns the event ids to remove.
+        """
+        repo.db.commit()   # don't hold the SQLite write lock through the rebuild
+        snapshot = PrimaryReadSessionLocal()
+        try:
+            rebuild = rebuild_summaries(snapshot, mongo_db)
+        except ConnectionFailure:
+            raise
+        except Exception as exc:
+            logger.exception("GPA summary rebuild failed")
+            repo.record_failure(request, exc, settings.OUTBOX_MAX_ATTEMPTS)
+            return []
+        finally:
+            snapshot.close()
+        student_gpa_cache.clear()
+        invalidate_analytics()
+        return [request.id, *rebuild.covered]
+
+    @staticmethod
+    def _fan_out(fanouts) -> list:
+        """Dimension fan-outs, after the batch's fact writes so they reach new facts too."""
+        buffer = MongoSyncBuffer(mongo_db)
+        partitions = mongo_db.fact_partition_keys()
+        for (key, doc_id), fields in fanouts:
+            for partition in partitions:
+                buffer.update_many(partition, {FANOUT[key]: doc_id}, {"$set": fields}, tag=(key, doc_id))
+        return buffer.flush()
+
+    @staticmethod
+    def _collapse(events) -> dict:
+        """
+        Fold consecutive events per document into the single write that has the
+        same effect as applying them in order:
+            upsert+upsert → merged $set      upsert+delete → delete
+            delete+upsert → replace          (anything)+delete → delete
+            inc+inc       → summed deltas    (applied with the merged $set)
+        Returns {(collection, doc_id): (mode, doc, inc, [events…])} in first-seen order.
+        """
+        groups = {}
+        for event in events:
+            key = (event.collection, event.doc_id)
+            mode, doc, inc, members = groups.get(key, (None, None, None, []))
+            if event.op == "delete":
+                mode, doc, inc = "delete", None, None
+            else:
+                # after a delete (or a replace), the document starts over
+                mode = "replace" if mode in ("delete", "replace") else "upsert"
+                doc = dict(doc or {})
+                if event.op == "inc":
+                    inc = dict(inc or {})
+                    for counter, amount in event.document().items():
+                        inc[counter] = inc.get(counter, 0) + amount
+                else:
+                    doc.update(event.document())
+            groups[key] = (mode, doc, inc, members + [event])
+        return groups
+
+    def _run(self):
+        while not self._stop.is_set():
+            if not self._lead():
+                self._stop.wait(settings.OUTBOX_POLL_INTERVAL)   # another worker is draining
+                continue
+            if not mongo_db.connected:
+                mongo_db.connect()
+            try:
+                if not mongo_db.connected:
+                    raise ConnectionFailure("MongoDB is not connected")
+                if not self._legacy_checked:
+                    # same thread as the drain, so no outbox write races the move
+                    if not move_legacy_facts():
+                        logger.warning("⚠ Some unpartitioned facts could not be moved; see the ETL errors above.")
+                    self._legacy_checked = True
+                if self.run_once():
+                    self._backoff = 0.0
+                    continue
+                # Idle: sleep until the next poll or until a write notifies us.
+                self._wake.wait(settings.OUTBOX_POLL_INTERVAL)
+                self._wake.clear()
+                continue
+            except ConnectionFailure as exc:
+                delay = self._next_backoff()
+                logger.warning(f"⚠ MongoDB unavailable, outbox retry in {delay:.1f}s: {exc}")
+            except Exception:
+                delay = self._next_backoff()
+                logger.exception("Outbox dispatcher iteration failed")
+            # Backing off: writes must not cut the delay short.
+            self._stop.wait(delay)
+
+    def _lead(self) -> bool:
+        """Whether this worker drains the outbox (takes the lock when it is free)."""
+        was_leading = self.lock.held
+        leading = self.lock.acquire()
+        if leading != was_leading:
+            logger.info("📬 Outbox dispatcher draining in this worker." if leading
+                        else "📭 Outbox dispatcher lost its lock; standing by.")
+        return leading
+
+    def _next_backoff(self) -> float:
+        self._backoff = min(max(self._backoff * 2, 1.0), settings.OUTBOX_MAX_BACKOFF)
+        return self._backoff
+
+
+# --------------------------------------------------------
+# 🔥 EXPORT GLOBAL DISPATCHER
+# --------------------------------------------------------
+outbox_dispatcher = OutboxDispatcher()
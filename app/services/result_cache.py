@@ -0,0 +1,158 @@
+# app/services/result_cache.py
+"""
+Precomputed results: /analytics reports and course catalog pages.
+
+Computed by whichever worker misses first and, with CACHE_BACKEND=shared,
+read by every other worker on the host straight from shared memory. Writes
+invalidate by tag after commit; with the shared backend the bumped tag
+counter is what tells the other workers their copy is gone.
+
+    ANALYTICS  enrollment writes (grades), student / course renames, Mongo
+               summary updates applied by the outbox dispatcher
+    CATALOG    course writes (which also invalidate ANALYTICS: reports
+               carry course titles and codes)
+    semester_tag(s)  enrollment writes in semester s
+    HISTORY    student / course / lecturer renames (the only writes that
+               change reports of closed semesters)
+
+Reports of a semester in CLOSED_SEMESTERS are stored with no TTL and tagged
+[semester_tag(s), HISTORY] only, so grade traffic in the current term never
+evicts them.
+
+Within a worker, concurrent misses on one key share a single computation
+(`flights`); the others block their thread until it ends, so call these from
+sync code in the threadpool, never from the event loop (run_sync included).
+Analytics reports are also served stale-while-revalidate once their TTL
+runs out: next to the fresh entry, each report keeps a copy with the same
+tags that outlives the TTL by ANALYTICS_STALE_TTL. A reader that finds only
+that copy gets it at once and one background refresh replaces it. A write
+invalidation drops both, so the next read after a write (the writer's own
+included) waits for a report that reflects it.
+"""
+
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Hashable, Iterable, Optional
+
+from app.config import settings
+from app.core.cache import make_cache
+from app.core.logger import logger
+from app.core.single_flight import SingleFlight
+
+ANALYTICS = ("results", "analytics")
+CATALOG = ("results", "catalog")
+HISTORY = ("results", "history")
+
+_MISSING = object()
+
+result_cache = make_cache(
+    "results", settings.RESULT_CACHE_SIZE, ttl=settings.RESULT_CACHE_TTL,
+    slot_bytes=settings.RESULT_CACHE_SLOT_BYTES,
+)
+flights = SingleFlight()
+
+_lock = threading.Lock()
+_refresher: Optional[ThreadPoolExecutor] = None
+_invalidations = 0   # local invalidations; a computation that overlapped one is not stored as fresh
+stale_served = 0
+
+
+def semester_tag(semester: str) -> tuple:
+    return ("results", "semester", semester)
+
+
+def cached_result(key: Hashable, compute: Callable[[], Any], tags: Iterable[Hashable], ttl: float = None) -> Any:
+    """Cached `compute()`; `ttl` overrides RESULT_CACHE_TTL (0 = until invalidated)."""
+    value = result_cache.get(key, _MISSING)
+    if value is _MISSING:
+        value = flights.do(key, lambda: _compute(key, compute, tags, ttl))
+    return value
+
+
+def stale_while_revalidate(key: Hashable, compute: Callable[[], Any], tags: Iterable[Hashable],
+                           ttl: float, stale_ttl: float) -> Any:
+    """Fresh value, else the expired copy (refreshed in the background), else compute and wait."""
+    global stale_served
+    value = result_cache.get(key, _MISSING)
+    if value is not _MISSING:
+        return value
+    stale = result_cache.get(("stale", key), _MISSING)
+    if stale is not _MISSING:
+        with _lock:
+            stale_served += 1
+        flights.do_in_background(key, lambda: _refresh(key, compute, tags, ttl, stale_ttl), _executor())
+        return stale
+    return flights.do(key, lambda: _compute(key, compute, tags, ttl, stale_ttl))
+
+
+def invalidate_analytics(*semesters: Optional[str]):
+    """Enrollment data changed (in `semesters`, when known)."""
+    _bump()
+    result_cache.invalidate_tag(ANALYTICS)
+    for semester in set(semesters):
+        if semester:
+            result_cache.invalidate_tag(semester_tag(semester))
+
+
+def invalidate_reports():
+    """Attributes every report may show changed (names, titles): closed semesters included."""
+    _bump()
+    result_cache.invalidate_tag(ANALYTICS)
+    result_cache.invalidate_tag(HISTORY)
+
+
+def invalidate_catalog():
+    _bump()
+    result_cache.invalidate_tag(CATALOG)
+    result_cache.invalidate_tag(ANALYTICS)
+    result_cache.invalidate_tag(HISTORY)
+
+
+def result_cache_stats() -> dict:
+    return {"backend": result_cache.stats(), "flights": flights.stats(), "stale_served": stale_served}
+
+
+def shutdown_refresher():
+    global _refresher
+    with _lock:
+        pool, _refresher = _refresher, None
+    if pool:
+        pool.shutdown(wait=True)
+
+
+def _compute(key, compute, tags, ttl: float = None, stale_ttl: float = None):
+    value = result_cache.get(key, _MISSING)   # the previous leader may have just stored it
+    if value is not _MISSING:
+        return value
+    with _lock:
+        invalidations = _invalidations
+    value = compute()
+    with _lock:
+        fresh = invalidations == _invalidations
+    if not fresh:
+        return value   # overlapped a write: neither copy may outlive it
+    result_cache.set(key, value, tags=tags, ttl=ttl)
+    if stale_ttl:
+        result_cache.set(("stale", key), value, tags=tags, ttl=(ttl or settings.RESULT_CACHE_TTL) + stale_ttl)
+    return value
+
+
+def _refresh(key, compute, tags, ttl, stale_ttl):
+    try:
+        _compute(key, compute, tags, ttl, stale_ttl)
+    except Exception:
+        logger.exception(f"Background refresh of {key!r} failed; serving the stale copy")
+
+
+def _executor() -> ThreadPoolExecutor:
+    global _refresher
+    with _lock:
+        if _refresher is None:
+            _refresher = ThreadPoolExecutor(settings.RESULT_REFRESH_WORKERS, thread_name_prefix="result-refresh")
+        return _refresher
+
+
+def _bump():
+    global _invalidations
+    with _lock:
+        _invalidations += 1
@@ -0,0 +1,334 @@
+# app/services/snapshot_service.py
+"""
+Columnar snapshots of the star schema for BI tools.
+
+    python -m app.services.snapshot_service       # build a new version
+    GET  /export/snapshot                         # manifest of the latest version
+    GET  /export/snapshot/{version}/{file}        # download (HTTP Range supported)
+    POST /export/snapshot                         # build one in the background
+
+A version is a directory under SNAPSHOT_DIR holding dimStudents,
+dimCourses, dimLecturers and factEnrollments in each of SNAPSHOT_FORMATS
+(Parquet, Arrow IPC file) plus manifest.json. Tables are read from SQL in
+keyset chunks sized so one chunk is about SNAPSHOT_BATCH_MB of Arrow data,
+and every chunk is appended to the open writers (one Parquet row group /
+IPC record batch), so memory stays bounded whatever the table size. The
+version is written to a hidden directory and renamed into place when
+complete; the newest SNAPSHOT_KEEP versions are kept.
+
+Published files never change, so downloads are served from one shared
+read-only mmap per file: repeated downloads are page-cache reads, not
+database queries.
+"""
+
+import argparse
+import json
+import mmap
+import os
+import re
+import shutil
+import threading
+from datetime import datetime
+from typing import Dict, Iterator, Optional, Tuple
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+from fastapi import HTTPException
+from sqlalchemy import select
+
+from app.config import settings
+from app.core.content_negotiation import arrow_schema, record_batch
+from app.core.logger import logger
+from app.db.sql_db import ReadSessionLocal
+from app.models.sqlalchemy_models import Course, Enrollment, Lecturer, Student
+
+# Star-schema table name → SQL model (same names as the Mongo collections).
+SNAPSHOT_TABLES = {
+    settings.MONGO_COLLECTION_STUDENTS: Student,
+    settings.MONGO_COLLECTION_COURSES: Course,
+    settings.MONGO_COLLECTION_LECTURERS: Lecturer,
+    settings.MONGO_COLLECTION_FACTS: Enrollment,
+}
+
+FORMATS = {
+    "parquet": ("parquet", "application/vnd.apache.parquet"),
+    "arrow": ("arrow", "application/vnd.apache.arrow.file"),
+}
+
+_VERSION = re.compile(r"^\d{8}T\d{12}Z$")   # UTC build time, microseconds
+_MIN_BATCH_ROWS = 1024
+_MAX_BATCH_ROWS = 1_000_000
+_READ_CHUNK = 1 << 20   # bytes per streamed response chunk
+
+
+def snapshot_formats() -> Tuple[str, ...]:
+    formats = tuple(f.strip() for f in settings.SNAPSHOT_FORMATS.split(",") if f.strip())
+    unknown = [f for f in formats if f not in FORMATS]
+    if unknown:
+        raise ValueError(f"Unknown snapshot format(s): {', '.join(unknown)}")
+    return formats
+
+
+class SnapshotBuilder:
+    """Writes one snapshot version from SQL."""
+
+    def __init__(self, session_factory=ReadSessionLocal, store: "SnapshotStore" = None, batch_bytes: int = None):
+        self.session_factory = session_factory
+        self.store = store
+        self.batch_bytes = batch_bytes or settings.SNAPSHOT_BATCH_MB * 1024 * 1024
+
+    def build(self) -> dict:
+        """Write every table, publish the version and prune old ones. Returns the manifest."""
+        started = datetime.utcnow()
+        version = started.strftime("%Y%m%dT%H%M%S%fZ")
+        formats = snapshot_formats()
+        store = self.store or snapshot_store
+        os.makedirs(store.root, exist_ok=True)
+        staging = os.path.join(store.root, f".{version}")
+        os.makedirs(staging)
+        try:
+            tables = {}
+            db = self.session_factory()
+            try:
+                for name, model in SNAPSHOT_TABLES.items():
+                    tables[name] = self._write_table(db, name, model.__table__, staging, formats)
+            finally:
+                db.close()
+            manifest = {
+                "version": version,
+                "created_at": started.isoformat() + "Z",
+                "seconds": round((datetime.utcnow() - started).total_seconds(), 3),
+                "tables": tables,
+            }
+            with open(os.path.join(staging, "manifest.json"), "w") as f:
+                json.dump(manifest, f, indent=2)
+            os.rename(staging, os.path.join(store.root, version))
+        except BaseException:
+            shutil.rmtree(staging, ignore_errors=True)
+            raise
+        logger.info(
+            f"🧊 Snapshot {version}: "
+            + ", ".join(f"{name} {t['rows']}" for name, t in tables.items())
+            + f" row(s) in {manifest['seconds']}s"
+        )
+        store.prune(settings.SNAPSHOT_KEEP)
+        return manifest
+
+    def _write_table(self, db, name: str, table, directory: str, formats) -> dict:
+        schema = arrow_schema(table.columns)
+        paths = {fmt: os.path.join(directory, f"{name}.{FORMATS[fmt][0]}") for fmt in formats}
+        writers = []
+        if "parquet" in paths:
+            compression = settings.SNAPSHOT_PARQUET_COMPRESSION
+            writers.append(pq.ParquetWriter(paths["parquet"], schema, compression=compression))
+        if "arrow" in paths:
+            writers.append(pa.ipc.new_file(paths["arrow"], schema))
+        rows = 0
+        try:
+            for batch in self._batches(db, table, schema):
+                for writer in writers:
+                    writer.write_batch(batch)
+                rows += batch.num_rows
+        finally:
+            for writer in writers:
+                writer.close()
+        return {
+            "rows": rows,
+            "files": {
+                fmt: {
+                    "name": os.path.basename(path),
+                    "bytes": os.path.getsize(path),
+                    "media_type": FORMATS[fmt][1],
+                }
+                for fmt, path in paths.items()
+            },
+        }
+
+    def _batches(self, db, table, schema: pa.Schema) -> Iterator[pa.RecordBatch]:
+        """
+        Keyset chunks on the primary key. The chunk size adapts to the
+        measured Arrow bytes per row, so a chunk stays near batch_bytes.
+        """
+        limit, last_id = _MIN_BATCH_ROWS, 0
+        while True:
+            rows = db.execute(
+                select(table).where(table.c.id > last_id).order_by(table.c.id).limit(limit)
+            ).all()
+            if not rows:
+                return
+            batch = record_batch(schema, rows)
+            yield batch
+            if len(rows) < limit:
+                return
+            last_id = rows[-1].id
+            per_row = max(batch.nbytes // batch.num_rows, 1)
+            limit = min(max(self.batch_bytes // per_row, _MIN_BATCH_ROWS), _MAX_BATCH_ROWS)
+
+
+class SnapshotStore:
+    """Published versions on disk, and the shared read-only maps downloads are served from."""
+
+    def __init__(self, root: str = None):
+        self._root = root
+        self._lock = threading.Lock()
+        self._maps: Dict[str, mmap.mmap] = {}
+
+    @property
+    def root(self) -> str:
+        return self._root or settings.SNAPSHOT_DIR
+
+    def versions(self) -> list:
+        try:
+            names = os.listdir(self.root)
+        except FileNotFoundError:
+            return []
+        return sorted(n for n in names if _VERSION.match(n))
+
+    def manifest(self, version: Optional[str] = None) -> dict:
+        """A version's manifest (default: the latest); 404 when there is none."""
+        if version is None:
+            versions = self.versions()
+            if not versions:
+                raise HTTPException(status_code=404, detail="No snapshot has been built yet")
+            version = versions[-1]
+        if not _VERSION.match(version):
+            raise HTTPException(status_code=404, detail=f"Unknown snapshot version '{version}'")
+        try:
+            with open(os.path.join(self.root, version, "manifest.json")) as f:
+                return json.load(f)
+        except FileNotFoundError:
+            raise HTTPException(status_code=404, detail=f"Unknown snapshot version '{version}'")
+
+    def open(self, version: str, filename: str) -> Tuple[mmap.mmap, str]:
+        """(map, media type) of a file listed in the version's manifest."""
+        manifest = self.manifest(version)
+        media_type = next(
+            (f["media_type"] for t in manifest["tables"].values() for f in t["files"].values()
+             if f["name"] == filename),
+            None,
+        )
+        if media_type is None:
+            raise HTTPException(status_code=404, detail=f"No file '{filename}' in snapshot {version}")
+        path = os.path.join(self.root, version, filename)
+        with self._lock:
+            mapped = self._maps.get(path)
+            if mapped is None:
+                with open(path, "rb") as f:
+                    mapped = self._maps[path] = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        return mapped, media_type
+
+    def prune(self, keep: int):
+        """Delete all but the newest `keep` versions (and unmap their files)."""
+        for version in self.versions()[:-max(keep, 1)]:
+            directory = os.path.join(self.root, version)
+            with self._lock:
+                for path in [p for p in self._maps if os.path.dirname(p) == directory]:
+                    self._maps.pop(path).close()
+            shutil.rmtree(directory, ignore_errors=True)
+            logger.info(f"🧊 Snapshot {version} pruned")
+
+    def close(self):
+        with self._lock:
+            maps, self._maps = self._maps, {}
+        for mapped in maps.values():
+            mapped.close()
+
+
+def byte_range(header: Optional[str], size: int) -> Optional[Tuple[int, int]]:
+    """
+    (start, end inclusive) for a single-range `Range: bytes=...` header, or
+    None to send the whole file (no header, or several ranges). Raises 416
+    when the range lies outside the file.
+    """
+    if not header or not header.startswith("bytes=") or "," in header:
+        return None
+    first, _, last = header[len("bytes="):].strip().partition("-")
+    try:
+        if first:
+            start = int(first)
+            end = min(int(last), size - 1) if last else size - 1
+        else:
+            start, end = max(size - int(last), 0), size - 1   # suffix: the last N bytes
+    except ValueError:
+        return None
+    if start > end or start >= size:
+        raise HTTPException(
+            status_code=416, detail="Requested range not satisfiable", headers={"Content-Range": f"bytes */{size}"},
+        )
+    return start, end
+
+
+def iter_range(mapped: mmap.mmap, start: int, end: int) -> Iterator[bytes]:
+    """Slices of the map (copied per chunk, so a pruned map can be closed under a slow client)."""
+    position = start
+    while position <= end:
+        chunk_end = min(position + _READ_CHUNK, end + 1)
+        try:
+            yield mapped[position:chunk_end]
+        except ValueError:
+            return   # unmapped by prune mid-download
+        position = chunk_end
+
+
+class SnapshotJob:
+    """Builds snapshots on demand (one at a time) and every SNAPSHOT_INTERVAL_SECONDS if set."""
+
+    def __init__(self, builder: SnapshotBuilder = None):
+        self.builder = builder or SnapshotBuilder()
+        self._lock = threading.Lock()
+        self._building: Optional[threading.Thread] = None
+        self._thread = None
+        self._stop = threading.Event()
+
+    @property
+    def running(self) -> bool:
+        return self._building is not None and self._building.is_alive()
+
+    def build_in_background(self) -> bool:
+        """Start a build unless one is running. Returns whether it started."""
+        with self._lock:
+            if self.running:
+                return False
+            self._building = threading.Thread(target=self._safe_build, name="snapshot-build", daemon=True)
+            self._building.start()
+            return True
+
+    def start(self):
+        if settings.SNAPSHOT_INTERVAL_SECONDS <= 0:
+            return
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="snapshot-scheduler", daemon=True)
+        self._thread.start()
+        logger.info(f"⏱ Snapshots scheduled every {settings.SNAPSHOT_INTERVAL_SECONDS}s.")
+
+    def stop(self):
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout=5)
+            self._thread = None
+
+    def _run(self):
+        while not self._stop.wait(settings.SNAPSHOT_INTERVAL_SECONDS):
+            self.build_in_background()
+
+    def _safe_build(self):
+        try:
+            self.builder.build()
+        except Exception:
+            logger.exception("Snapshot build failed")
+
+
+snapshot_store = SnapshotStore()
+snapshot_job = SnapshotJob()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Write a Parquet / Arrow snapshot of the star schema")
+    parser.parse_args(argv)
+    SnapshotBuilder().build()
+
+
+if __name__ == "__main__":
+    main()
@@ -2,27 +2,56 @@
 
 from fastapi import HTTPException
 from app.repositories.student_repo import StudentRepository
-from app.repositories.mongo_repo import MongoRepository
-from app.models.pydantic import StudentCreate, StudentOut, StudentUpdate
+from app.repositories.enrollment_repo import EnrollmentRepository
+from app.repositories.outbox_repo import OutboxRepository
+from app.services.unit_of_work import UnitOfWork
+from app.services.analytics_service import AnalyticsService
+from app.services.entity_cache import student_cache
+from app.services.result_cache import invalidate_analytics, invalidate_reports
+from app.services.gpa_summary import (
+    enqueue_enrollment_removals,
+    invalidate_student_gpa,
+    student_summary_fields,
+)
+from app.services.fact_documents import enqueue_fanout, student_fact_fields
+from app.repositories.columnar_analytics_repo import columnar_analytics
+from app.models.pydantic import Page, StudentCreate, StudentOut, StudentUpdate
+from app.core.pagination import clamp_limit, decode_cursor, split_page
 
 
 class StudentService:
     def __init__(self, db):
+        self.db = db
         self.repo = StudentRepository(db)
-        self.mongo = MongoRepository()  # full-sync repo
+        self.enrollments = EnrollmentRepository(db)
+        self.outbox = OutboxRepository(db)
+        self.uow = UnitOfWork(db, conflicts={
+            "email": "Email already exists",
+            "username": "Username already exists",
+        })
+        self.analytics = AnalyticsService()  # GPA reads
 
     # ---------------------------------------------------------
-    # GET ALL
+    # GET PAGE
     # ---------------------------------------------------------
-    def get_all_students(self):
-        students = self.repo.get_all()
-        return [StudentOut.from_orm(s) for s in students]
+    def get_students_page(self, limit: int = None, after: str = None):
+        limit = clamp_limit(limit)
+        rows = self.repo.get_page(limit, decode_cursor(after))
+        students, next_cursor = split_page(rows, limit)
+        return Page[StudentOut](
+            items=[StudentOut.from_orm(s) for s in students],
+            next_cursor=next_cursor,
+        )
+
+    # Same page as row tuples, for the binary formats (no StudentOut per row)
+    def get_students_rows(self, limit: int = None, after: str = None):
+        return self.repo.get_page_rows(tuple(StudentOut.model_fields), clamp_limit(limit), decode_cursor(after))
 
     # ---------------------------------------------------------
     # GET BY ID
     # ---------------------------------------------------------
     def get_student_by_id(self, student_id: int):
-        student = self.repo.get_by_id(student_id)
+        student = student_cache.get(self.repo, "id", student_id)
         if not student:
             raise HTTPException(status_code=404, detail="Student not found")
         return StudentOut.from_orm(student)
@@ -31,19 +60,14 @@ class StudentService:
     # CREATE
     # ---------------------------------------------------------
     def create_student(self, payload: StudentCreate):
-        # avoid duplicate email
-        if self.repo.get_by_email(payload.email):
-            raise HTTPException(status_code=400, detail="Email already exists")
+        with self.uow:
+            # create in SQL (duplicate email/username → 400 from the unique constraints)
+            student = self.repo.create(payload)
 
-        # avoid duplicate username
-        if hasattr(payload, "username") and self.repo.get_by_username(payload.username):
-            raise HTTPException(status_code=400, detail="Username already exists")
-
-        # create in SQL
-        student = self.repo.create(payload)
-
-        # MIRROR TO MONGODB
-        self.mongo.upsert_student(student.as_dict())
+            # MIRROR TO MONGODB (outbox row commits with the student)
+            self.outbox.enqueue_upsert("students", student.as_dict())
+            self.outbox.enqueue_upsert("student_gpa", student_summary_fields(student))
+            self.uow.after_commit(student_cache.forget, student)
 
         return StudentOut.from_orm(student)
 
@@ -51,14 +75,17 @@ class StudentService:
     # UPDATE
     # ---------------------------------------------------------
     def update_student(self, student_id: int, payload: StudentUpdate):
-        student = self.repo.get_by_id(student_id)
-        if not student:
-            raise HTTPException(status_code=404, detail="Student not found")
-
-        updated = self.repo.update(student_id, payload.dict(exclude_unset=True))
-
-        # SYNC TO MONGO
-        self.mongo.upsert_student(updated.as_dict())
+        with self.uow:
+            updated = self.repo.update(student_id, payload.dict(exclude_unset=True))
+            if not updated:
+                raise HTTPException(status_code=404, detail="Student not found")
+
+            # SYNC TO MONGO
+            self.outbox.enqueue_upsert("students", updated.as_dict())
+            self.outbox.enqueue_upsert("student_gpa", student_summary_fields(updated))
+            enqueue_fanout(self.outbox, "facts_by_student", updated.id, student_fact_fields(updated))
+            self.uow.after_commit(student_cache.forget, updated)
+            self.uow.after_commit(invalidate_reports)   # names in top-students, closed semesters too
 
         return StudentOut.from_orm(updated)
 
@@ -66,23 +93,28 @@ class StudentService:
     # DELETE
     # ---------------------------------------------------------
     def delete_student(self, student_id: int):
-        student = self.repo.get_by_id(student_id)
-        if not student:
-            raise HTTPException(status_code=404, detail="Student not found")
-
-        # delete from SQL
-        self.repo.delete(student_id)
-
-        # delete from Mongo
-        self.mongo.delete_student(student_id)
+        with self.uow:
+            # delete from SQL (enrollments go with the student)
+            removed = self.enrollments.delete_for_student(student_id)
+            if not self.repo.delete(student_id):
+                raise HTTPException(status_code=404, detail="Student not found")
+            enqueue_enrollment_removals(self.outbox, removed)
+
+            # delete from Mongo
+            self.outbox.enqueue_delete("students", student_id)
+            self.outbox.enqueue_delete("student_gpa", student_id)
+            self.uow.after_commit(columnar_analytics.drop_student, student_id)
+            self.uow.after_commit(invalidate_student_gpa, student_id)
+            self.uow.after_commit(student_cache.invalidate, student_id)
+            self.uow.after_commit(invalidate_analytics, *(enr.semester for enr in removed))
 
         return {"message": "Student deleted successfully"}
 
     # ---------------------------------------------------------
-    # GPA (Mongo analytics only)
+    # GPA (cached point read on the analytics read model)
     # ---------------------------------------------------------
     def get_student_gpa(self, username: str):
-        gpa = self.mongo.gpa_for_student(username)
-        if gpa is None:
-            raise HTTPException(status_code=404, detail="GPA not found")
-        return gpa
+        record = self.analytics.get_student_gpa(username)
+        if record is None:
+            raise HTTPException(status_code=404, detail="GPA record not found")
+        return {"student": username, "gpa": record["gpa"]}
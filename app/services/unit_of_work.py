@@ -0,0 +1,98 @@
+# app/services/unit_of_work.py
+
+import re
+from typing import Callable, Dict, List, Tuple, Union
+
+from fastapi import HTTPException
+from sqlalchemy.exc import IntegrityError
+
+from app.services.outbox_dispatcher import outbox_dispatcher
+
+# Session.info key: when set to a list, after-commit callbacks are appended to
+# it instead of run inline (the async path runs them in the threadpool).
+DEFERRED_CALLBACKS = "uow_deferred_callbacks"
+
+
+class UnitOfWork:
+    """
+    One service write = one transaction.
+
+        with self.uow:                     # commit on success, rollback on any error
+            student = self.repo.create(payload)
+            self.outbox.enqueue_upsert("students", student.as_dict())
+            self.uow.after_commit(invalidate_student_gpa, student.id)
+
+    Duplicates are not looked up beforehand: the unique constraint rejects
+    them and the IntegrityError becomes a 400 whose detail comes from
+    `conflicts` ({column or (columns…): detail}). After the commit the outbox
+    dispatcher is woken and the after-commit callbacks run, so in-process
+    read models (columnar engine, GPA cache) never see uncommitted writes.
+    Under `AsyncSession.run_sync` the callbacks are handed back to the caller
+    instead (DEFERRED_CALLBACKS): they take locks and must not run on the
+    event loop.
+    """
+
+    def __init__(self, db, conflicts: Dict[Union[str, Tuple[str, ...]], str] = None):
+        self.db = db
+        self.conflicts = {
+            (key,) if isinstance(key, str) else tuple(key): detail
+            for key, detail in (conflicts or {}).items()
+        }
+        self._after_commit: List[Tuple[Callable, tuple]] = []
+
+    def after_commit(self, fn: Callable, *args):
+        self._after_commit.append((fn, args))
+
+    def __enter__(self):
+        self._after_commit = []
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is not None:
+            self.db.rollback()
+            self._after_commit = []
+            if isinstance(exc, IntegrityError):
+                raise self.conflict(exc) from exc
+            return False
+
+        try:
+            self.db.commit()
+        except IntegrityError as err:
+            self.db.rollback()
+            self._after_commit = []
+            raise self.conflict(err) from err
+
+        outbox_dispatcher.notify()
+        callbacks, self._after_commit = self._after_commit, []
+        deferred = self.db.info.get(DEFERRED_CALLBACKS)
+        if deferred is not None:
+            deferred.extend(callbacks)
+            return False
+        run_callbacks(callbacks)
+        return False
+
+    def conflict(self, err: IntegrityError) -> HTTPException:
+        message = str(err.orig)
+        columns = _violated_columns(message)
+        if columns in self.conflicts:
+            return HTTPException(status_code=400, detail=self.conflicts[columns])
+        if "foreign key" in message.lower():
+            return HTTPException(status_code=400, detail="Referenced record does not exist")
+        return HTTPException(status_code=400, detail="Request conflicts with existing data")
+
+
+def run_callbacks(callbacks: List[Tuple[Callable, tuple]]):
+    for fn, args in callbacks:
+        fn(*args)
+
+
+def _violated_columns(message: str) -> Tuple[str, ...]:
+    # SQLite:     UNIQUE constraint failed: enrollments.student_id, enrollments.course_id
+    found = re.search(r"constraint failed: ([\w., ]+)", message)
+    if found:
+        return tuple(part.strip().split(".")[-1] for part in found.group(1).split(","))
+    # PostgreSQL: DETAIL:  Key (student_id, course_id)=(1, 2) already exists.
+    found = re.search(r"Key \(([^)]+)\)=", message)
+    if found:
+        return tuple(part.strip() for part in found.group(1).split(","))
+    return ()
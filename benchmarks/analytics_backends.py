@@ -0,0 +1,185 @@
+"""
+Compare the analytics engines on a synthetic dataset.
+
+    python benchmarks/analytics_backends.py --students 20000 --courses 300 --per-student 8
+    python benchmarks/analytics_backends.py --students 125000 --per-student 8   # ~1M enrollments
+    python benchmarks/analytics_backends.py --mongo-uri mongodb://localhost:27017
+
+SQL runs against a throwaway SQLite file unless --sql-url is given. Mongo is
+benchmarked only when a URI is given (--mongo-uri or MONGO_URI); the data is
+loaded into a separate database (--mongo-db) that is dropped afterwards.
+Reports the median wall time per report over --repeat runs.
+"""
+
+import argparse
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+from types import SimpleNamespace
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--students", type=int, default=5000)
+    parser.add_argument("--courses", type=int, default=200)
+    parser.add_argument("--per-student", type=int, default=6, help="enrollments per student")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--sql-url", default=None)
+    parser.add_argument("--mongo-uri", default=os.environ.get("MONGO_URI", ""))
+    parser.add_argument("--mongo-db", default="school_analytics_bench")
+    parser.add_argument("--seed", type=int, default=42)
+    return parser.parse_args()
+
+
+def configure(args):
+    """Point the app settings at the benchmark databases before anything imports them."""
+    sql_url = args.sql_url or f"sqlite:///{tempfile.mkdtemp()}/analytics_bench.db"
+    os.environ["SQLALCHEMY_DATABASE_URL"] = sql_url
+    os.environ["MONGO_URI"] = args.mongo_uri
+    os.environ["MONGO_DB_NAME"] = args.mongo_db
+    os.environ["MONGO_ENSURE_INDEXES"] = "true"
+    os.environ.setdefault("SECRET_KEY", "benchmark")
+    return sql_url
+
+
+def generate(args):
+    rng = random.Random(args.seed)
+    students = [
+        {"id": i, "name": f"Student {i}", "email": f"student{i}@bench.test", "age": 18 + i % 10, "gender": "x"}
+        for i in range(1, args.students + 1)
+    ]
+    courses = [
+        {"id": i, "title": f"Course {i}", "code": f"C{i:05d}", "semester": "S1"}
+        for i in range(1, args.courses + 1)
+    ]
+    enrollments, next_id = [], 1
+    for student in students:
+        for course_id in rng.sample(range(1, args.courses + 1), min(args.per_student, args.courses)):
+            grade = None if rng.random() < 0.1 else round(rng.uniform(0, 5), 2)
+            enrollments.append({"id": next_id, "student_id": student["id"], "course_id": course_id, "grade": grade})
+            next_id += 1
+    return students, courses, enrollments
+
+
+def load_sql(students, courses, enrollments):
+    from app.db.sql_db import Base, engine
+    from app.models.sqlalchemy_models import Course, Enrollment, Student
+
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+    with engine.begin() as conn:
+        conn.execute(Student.__table__.insert(), students)
+        conn.execute(Course.__table__.insert(), courses)
+        conn.execute(Enrollment.__table__.insert(), enrollments)
+        if engine.dialect.name == "sqlite":
+            conn.exec_driver_sql("ANALYZE")
+
+
+def load_mongo(students, courses, enrollments):
+    from app.db.mongo_db import mongo_db
+    from app.db.sql_db import SessionLocal
+    from app.services.fact_documents import (
+        course_fact_fields,
+        fact_document,
+        lecturer_fact_fields,
+        student_fact_fields,
+    )
+    from app.services.gpa_summary import rebuild_summaries
+
+    mongo_db.connect()
+    if not mongo_db.connected:
+        return None
+    mongo_db.bulk_upsert("students", students)
+    mongo_db.bulk_upsert("courses", courses)
+    # Facts carry their dimension attributes, as the sync writes them.
+    student_fields = {s["id"]: student_fact_fields(SimpleNamespace(username=None, **s)) for s in students}
+    course_fields = {c["id"]: {**course_fact_fields(SimpleNamespace(lecturer_id=None, **c)),
+                               **lecturer_fact_fields(None)} for c in courses}
+    mongo_db.bulk_upsert("enrollments", [fact_document(e, student_fields, course_fields) for e in enrollments])
+    db = SessionLocal()
+    try:
+        rebuild_summaries(db, mongo_db)
+    finally:
+        db.close()
+    return mongo_db
+
+
+def timed(fn, repeat):
+    fn()  # warm caches / plans
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        rows = fn()
+        samples.append((time.perf_counter() - started) * 1000)
+    return statistics.median(samples), len(rows)
+
+
+def main():
+    args = parse_args()
+    sql_url = configure(args)
+
+    students, courses, enrollments = generate(args)
+    print(f"Dataset: {len(students)} students, {len(courses)} courses, {len(enrollments)} enrollments")
+    print(f"SQL: {sql_url}")
+    load_sql(students, courses, enrollments)
+
+    from app.repositories.columnar_analytics_repo import ColumnarAnalyticsRepository
+    from app.repositories.mongo_repo import MongoRepository
+    from app.repositories.sql_analytics_repo import SqlAnalyticsRepository
+
+    sql = SqlAnalyticsRepository()
+    engines = {
+        "sql": {
+            "gpa_by_course": sql.gpa_by_course,
+            "top_students(10)": lambda: sql.top_students(10),
+            "course_enrollment_count": sql.course_enrollment_count,
+        },
+    }
+
+    columnar = ColumnarAnalyticsRepository()
+    started = time.perf_counter()
+    columnar.load()
+    stats = columnar.stats()
+    print(f"Columnar: loaded in {time.perf_counter() - started:.2f}s, {stats['bytes'] / 1e6:.1f} MB")
+    engines["columnar"] = {
+        "gpa_by_course": columnar.gpa_by_course,
+        "top_students(10)": lambda: columnar.top_students(10),
+        "course_enrollment_count": columnar.course_enrollment_count,
+        "upsert_enrollment": lambda: columnar.upsert_enrollment(1, 1, 1, 3.5) or [None],
+    }
+
+    mongo = load_mongo(students, courses, enrollments) if args.mongo_uri else None
+    if mongo is not None:
+        repo = MongoRepository()
+        engines["mongo (summaries)"] = {
+            "gpa_by_course": repo.gpa_by_course,
+            "top_students(10)": lambda: repo.top_students(10),
+            "course_enrollment_count": repo.course_enrollment_count,
+        }
+        engines["mongo (fact pipelines)"] = {
+            "gpa_by_course": repo._gpa_by_course_from_facts,
+            "top_students(10)": lambda: repo._top_students_from_facts(10),
+            "course_enrollment_count": repo._course_enrollment_count_from_facts,
+        }
+    else:
+        print("Mongo: skipped (no --mongo-uri / MONGO_URI, or not reachable)")
+
+    print(f"\n{'engine':<24} {'report':<26} {'median ms':>10} {'rows':>7}")
+    try:
+        for engine_name, reports in engines.items():
+            for report, fn in reports.items():
+                ms, rows = timed(fn, args.repeat)
+                print(f"{engine_name:<24} {report:<26} {ms:>10.2f} {rows:>7}")
+    finally:
+        if mongo is not None:
+            mongo.client.drop_database(args.mongo_db)
+
+
+if __name__ == "__main__":
+    main()
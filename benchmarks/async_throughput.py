@@ -0,0 +1,173 @@
+"""
+Throughput of the sync (threadpool) and async (event loop) SQL paths under concurrent load.
+
+    python benchmarks/async_throughput.py
+    python benchmarks/async_throughput.py --concurrency 200 --requests 4000 --slow-ms 20
+
+Serves the same reads two ways in one process:
+    /sync/students/{id}    `def` handler, Session + StudentService (anyio threadpool)
+    /async/students/{id}   `async def` handler, AsyncSession + AsyncStudentService
+and drives each with --concurrency clients over ASGI (no network). While the
+load runs, a probe hits a trivial `def` route every few ms: under the sync
+load it queues behind the saturated threadpool, under the async load it
+does not. --slow-ms adds a blocking SQL-side wait to every student read
+(SQLite's own sleep is not available, so a recursive CTE burns that long).
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--students", type=int, default=2000)
+    parser.add_argument("--requests", type=int, default=3000, help="requests per variant")
+    parser.add_argument("--concurrency", type=int, default=100)
+    parser.add_argument("--slow-ms", type=float, default=0.0, help="extra SQL time per read")
+    parser.add_argument("--sql-url", default=None)
+    return parser.parse_args()
+
+
+def configure(args):
+    sql_url = args.sql_url or f"sqlite:///{tempfile.mkdtemp()}/async_bench.db"
+    os.environ["SQLALCHEMY_DATABASE_URL"] = sql_url
+    os.environ["MONGO_URI"] = ""
+    os.environ.setdefault("SECRET_KEY", "benchmark")
+    return sql_url
+
+
+def build_app(args):
+    from fastapi import Depends, FastAPI
+    from sqlalchemy import text
+    from sqlalchemy.ext.asyncio import AsyncSession
+    from sqlalchemy.orm import Session
+
+    from app.db.async_db import get_async_db
+    from app.db.sql_db import get_db
+    from app.services.async_services import AsyncStudentService
+    from app.services.student_service import StudentService
+
+    burn = None
+    if args.slow_ms:
+        # Roughly calibrated below; counts up inside SQLite so the wait is on the DB side.
+        burn = text("WITH RECURSIVE c(x) AS (SELECT 1 UNION ALL SELECT x + 1 FROM c WHERE x < :n) "
+                    "SELECT count(*) FROM c")
+
+    app = FastAPI()
+    app.state.burn_n = 0
+
+    @app.get("/sync/students/{student_id}")
+    def sync_student(student_id: int, db: Session = Depends(get_db)):
+        if burn is not None:
+            db.execute(burn, {"n": app.state.burn_n})
+        return StudentService(db).get_student_by_id(student_id)
+
+    @app.get("/async/students/{student_id}")
+    async def async_student(student_id: int, db: AsyncSession = Depends(get_async_db)):
+        if burn is not None:
+            await db.execute(burn, {"n": app.state.burn_n})
+        return await AsyncStudentService(db).get_student_by_id(student_id)
+
+    @app.get("/probe")
+    def probe():
+        return {"ok": True}
+
+    return app
+
+
+def calibrate(app, slow_ms):
+    """Pick the CTE length that takes about `slow_ms` on this machine."""
+    from sqlalchemy import text
+
+    from app.db.sql_db import engine
+
+    n = 10_000
+    with engine.connect() as conn:
+        started = time.perf_counter()
+        conn.execute(text("WITH RECURSIVE c(x) AS (SELECT 1 UNION ALL SELECT x + 1 FROM c WHERE x < :n) "
+                          "SELECT count(*) FROM c"), {"n": n}).scalar()
+        per_row = (time.perf_counter() - started) / n
+    app.state.burn_n = max(1, int(slow_ms / 1000 / per_row))
+
+
+def load(args):
+    from app.db.migrations import migrate
+    from app.db.sql_db import Base, engine
+    from app.models.sqlalchemy_models import Student
+
+    Base.metadata.drop_all(bind=engine)
+    migrate(engine)
+    with engine.begin() as conn:
+        conn.execute(Student.__table__.insert(), [
+            {"name": f"Student {i}", "email": f"student{i}@bench.org", "age": 20}
+            for i in range(1, args.students + 1)
+        ])
+
+
+async def run_variant(app, prefix, args):
+    import httpx
+
+    transport = httpx.ASGITransport(app=app)
+    latencies, probe_latencies = [], []
+    done = asyncio.Event()
+
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        queue = iter(range(args.requests))
+
+        async def worker():
+            for i in queue:
+                started = time.perf_counter()
+                response = await client.get(f"{prefix}/students/{i % args.students + 1}")
+                response.raise_for_status()
+                latencies.append(time.perf_counter() - started)
+
+        async def prober():
+            while not done.is_set():
+                started = time.perf_counter()
+                await client.get("/probe")
+                probe_latencies.append(time.perf_counter() - started)
+                await asyncio.sleep(0.005)
+
+        probe_task = asyncio.create_task(prober())
+        started = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(args.concurrency)))
+        elapsed = time.perf_counter() - started
+        done.set()
+        await probe_task
+
+    return elapsed, latencies, probe_latencies
+
+
+def pct(samples, q):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))] * 1000
+
+
+def main():
+    args = parse_args()
+    sql_url = configure(args)
+    load(args)
+    app = build_app(args)
+    if args.slow_ms:
+        calibrate(app, args.slow_ms)
+
+    print(f"SQL: {sql_url}")
+    print(f"{args.requests} requests per variant, {args.concurrency} concurrent clients, "
+          f"+{args.slow_ms:g} ms SQL per read\n")
+    print(f"{'variant':<8} {'req/s':>9} {'p50 ms':>9} {'p99 ms':>9} {'probe p50':>10} {'probe p99':>10}")
+    for prefix in ("/sync", "/async"):
+        elapsed, latencies, probes = asyncio.run(run_variant(app, prefix, args))
+        print(f"{prefix[1:]:<8} {args.requests / elapsed:>9.0f} {statistics.median(latencies) * 1000:>9.2f} "
+              f"{pct(latencies, 0.99):>9.2f} {statistics.median(probes) * 1000:>10.2f} {pct(probes, 0.99):>10.2f}")
+
+
+if __name__ == "__main__":
+    main()
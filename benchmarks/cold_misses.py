@@ -0,0 +1,122 @@
+"""
+Concurrent cold misses on the cached catalog pages.
+
+    python benchmarks/cold_misses.py
+    python benchmarks/cold_misses.py --concurrency 64 --rounds 20
+
+Sends --concurrency simultaneous GET /courses/ requests (JSON, msgpack and
+Arrow) through the real app over ASGI, right after clearing the result
+cache, for --rounds rounds per page size and format. Every response must
+arrive (a waiter blocking the event loop would freeze them all; the run is
+aborted after --timeout seconds) and each round must be computed about
+once: the other callers wait for that computation instead of repeating it.
+Exits non-zero when a round times out or a response is not 200.
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+PAGES = ["/courses/?limit=50", "/courses/?limit=3"]
+FORMATS = {
+    "json": {},
+    "msgpack": {"Accept": "application/msgpack"},
+    "arrow": {"Accept": "application/vnd.apache.arrow.stream"},   # the cached row pages
+}
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--courses", type=int, default=500)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--rounds", type=int, default=5)
+    parser.add_argument("--timeout", type=float, default=30.0)
+    parser.add_argument("--sql-url", default=None)
+    return parser.parse_args()
+
+
+def configure(args):
+    sql_url = args.sql_url or f"sqlite:///{tempfile.mkdtemp()}/cold_misses.db"
+    os.environ["SQLALCHEMY_DATABASE_URL"] = sql_url
+    os.environ["MONGO_URI"] = ""
+    os.environ.setdefault("SECRET_KEY", "benchmark")
+    return sql_url
+
+
+def load(args):
+    from app.db.migrations import migrate
+    from app.db.sql_db import Base, engine
+    from app.models.sqlalchemy_models import Course
+
+    Base.metadata.drop_all(bind=engine)
+    migrate(engine)
+    with engine.begin() as conn:
+        conn.execute(Course.__table__.insert(), [
+            {"title": f"Course {i}", "code": f"C{i:05d}", "semester": f"202{i % 4}A"}
+            for i in range(1, args.courses + 1)
+        ])
+
+
+async def burst(app, path, headers, concurrency):
+    import httpx
+
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench") as client:
+        return await asyncio.gather(*(client.get(path, headers=headers) for _ in range(concurrency)))
+
+
+def run_round(app, path, headers, args):
+    """One burst on its own loop and thread: a blocked loop cannot time itself out."""
+    outcome = {}
+    thread = threading.Thread(
+        target=lambda: outcome.update(responses=asyncio.run(burst(app, path, headers, args.concurrency))),
+        daemon=True,
+    )
+    thread.start()
+    thread.join(args.timeout)
+    return outcome.get("responses")
+
+
+def main():
+    args = parse_args()
+    sql_url = configure(args)
+    load(args)
+
+    from app.main import app
+    from app.services.result_cache import flights, result_cache
+
+    print(f"SQL: {sql_url}")
+    print(f"{args.concurrency} concurrent cold requests, {args.rounds} rounds\n")
+    print(f"{'format':<8} {'page':<22} {'round ms':>9} {'computations':>13} {'coalesced':>10}")
+    failed = False
+    for name, headers in FORMATS.items():
+        for path in PAGES:
+            before = flights.stats()
+            samples = []
+            for _ in range(args.rounds):
+                result_cache.clear()
+                started = time.perf_counter()
+                responses = run_round(app, path, headers, args)
+                if responses is None:
+                    print(f"{name:<8} {path:<22} timed out after {args.timeout:g}s: the event loop is blocked")
+                    os._exit(1)   # the stuck loop thread cannot be joined
+                samples.append((time.perf_counter() - started) * 1000)
+                failed |= any(r.status_code != 200 for r in responses)
+            after = flights.stats()
+            print(f"{name:<8} {path:<22} {sum(samples) / len(samples):>9.1f} "
+                  f"{after['executions'] - before['executions']:>13} {after['coalesced'] - before['coalesced']:>10}")
+
+    if failed:
+        print("\nSome responses were not 200.")
+        sys.exit(1)
+    print("\nAll cold bursts completed.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,141 @@
+"""
+Compare the list response formats on one large page of enrollments.
+
+    python benchmarks/response_formats.py                       # 100k enrollments
+    python benchmarks/response_formats.py --enrollments 500000 --repeat 3
+
+Loads a throwaway SQLite file (or --sql-url) and encodes the whole table as
+one page in each format the list routes negotiate:
+
+    json      ORM rows → Page[EnrollmentOut] → JSONResponse (the default path)
+    msgpack   row tuples → application/msgpack
+    arrow     row tuples → application/vnd.apache.arrow.stream
+
+Reports the median query and encode times over --repeat runs and the body size.
+"""
+
+import argparse
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--enrollments", type=int, default=100_000)
+    parser.add_argument("--courses", type=int, default=200)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--sql-url", default=None)
+    parser.add_argument("--seed", type=int, default=42)
+    return parser.parse_args()
+
+
+def configure(args):
+    """Point the app settings at the benchmark database before anything imports them."""
+    sql_url = args.sql_url or f"sqlite:///{tempfile.mkdtemp()}/response_bench.db"
+    os.environ["SQLALCHEMY_DATABASE_URL"] = sql_url
+    os.environ["MONGO_URI"] = ""
+    os.environ.setdefault("SECRET_KEY", "benchmark")
+    return sql_url
+
+
+def load_sql(args):
+    from app.db.sql_db import Base, engine
+    from app.models.sqlalchemy_models import Course, Enrollment, Student
+
+    rng = random.Random(args.seed)
+    students = -(-args.enrollments // args.courses)   # every student takes every course
+    enrollments = [
+        {
+            "id": i + 1,
+            "student_id": i // args.courses + 1,
+            "course_id": i % args.courses + 1,
+            "grade": None if rng.random() < 0.1 else round(rng.uniform(0, 5), 2),
+            "semester": f"202{(i % args.courses + 1) % 4}A",   # the course's semester
+        }
+        for i in range(args.enrollments)
+    ]
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+    with engine.begin() as conn:
+        conn.execute(Student.__table__.insert(), [
+            {"id": i, "name": f"Student {i}", "email": f"student{i}@bench.test"} for i in range(1, students + 1)
+        ])
+        conn.execute(Course.__table__.insert(), [
+            {"id": i, "title": f"Course {i}", "code": f"C{i:05d}", "semester": f"202{i % 4}A"}
+            for i in range(1, args.courses + 1)
+        ])
+        conn.execute(Enrollment.__table__.insert(), enrollments)
+
+
+def timed(fn, repeat):
+    fn()  # warm caches / plans
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        value = fn()
+        samples.append((time.perf_counter() - started) * 1000)
+    return statistics.median(samples), value
+
+
+def main():
+    args = parse_args()
+    sql_url = configure(args)
+    print(f"SQL: {sql_url}")
+    load_sql(args)
+
+    from fastapi.responses import JSONResponse
+
+    from app.core.content_negotiation import ARROW_STREAM, MSGPACK, page_response
+    from app.core.pagination import split_page
+    from app.db.sql_db import SessionLocal
+    from app.models.pydantic import EnrollmentOut, Page
+    from app.models.sqlalchemy_models import Enrollment
+    from app.repositories.enrollment_repo import EnrollmentRepository
+
+    n = args.enrollments
+    db = SessionLocal()
+    repo = EnrollmentRepository(db)
+    fields = tuple(EnrollmentOut.model_fields)
+
+    def query_orm():
+        db.expunge_all()   # the identity map would otherwise make repeats free
+        return repo.get_page(n, None)
+
+    def encode_json(rows):
+        items, next_cursor = split_page(rows, n)
+        page = Page[EnrollmentOut](items=[EnrollmentOut.from_orm(e) for e in items], next_cursor=next_cursor)
+        return JSONResponse(page.model_dump(mode="json")).body
+
+    def query_rows():
+        return repo.get_page_rows(fields, n)
+
+    def encoder(media_type):
+        return lambda page: page_response(media_type, page, Enrollment.__table__).body
+
+    formats = {
+        "json": (query_orm, encode_json),
+        "msgpack": (query_rows, encoder(MSGPACK)),
+        "arrow": (query_rows, encoder(ARROW_STREAM)),
+    }
+
+    print(f"\n{n} enrollments in one page, median of {args.repeat}")
+    print(f"{'format':<10} {'query ms':>10} {'encode ms':>10} {'total ms':>10} {'bytes':>12}")
+    try:
+        for name, (query, encode) in formats.items():
+            query_ms, rows = timed(query, args.repeat)
+            encode_ms, body = timed(lambda: encode(rows), args.repeat)
+            total = query_ms + encode_ms
+            print(f"{name:<10} {query_ms:>10.1f} {encode_ms:>10.1f} {total:>10.1f} {len(body):>12,}")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
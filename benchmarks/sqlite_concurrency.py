@@ -0,0 +1,153 @@
+"""
+Read throughput of the SQLite path while a write burst is running.
+
+    python benchmarks/sqlite_concurrency.py
+    python benchmarks/sqlite_concurrency.py --readers 16 --writers 4 --writes 500
+
+Runs the same workload twice, each in a fresh process and database file:
+    default   SQLITE_PROFILE=false (rollback journal, synchronous=FULL, one pool)
+    profile   SQLITE_PROFILE=true  (WAL, single writer, read-only reader pool,
+              background checkpoints; see app/db/sqlite_profile.py)
+Reader threads do primary-key lookups through ReadSessionLocal (what GET
+routes use) for as long as the writer threads are committing small update
+transactions through SessionLocal. Lock errors are counted, not retried.
+"""
+
+import argparse
+import json
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--students", type=int, default=20000)
+    parser.add_argument("--readers", type=int, default=8)
+    parser.add_argument("--writers", type=int, default=4)
+    parser.add_argument("--writes", type=int, default=300, help="transactions per writer thread")
+    parser.add_argument("--run", choices=["default", "profile"], help=argparse.SUPPRESS)
+    return parser.parse_args(argv)
+
+
+def run_one(args):
+    """Child process: env is already set for one mode; print one JSON line."""
+    from sqlalchemy import select, update
+    from sqlalchemy.exc import OperationalError
+
+    from app.db.migrations import migrate
+    from app.db.sql_db import ReadSessionLocal, SessionLocal, engine
+    from app.db.sqlite_profile import wal_checkpointer
+    from app.models.sqlalchemy_models import Student
+
+    migrate(engine)
+    with engine.begin() as conn:
+        conn.execute(Student.__table__.insert(), [
+            {"name": f"Student {i}", "email": f"student{i}@bench.org", "age": 20}
+            for i in range(1, args.students + 1)
+        ])
+    wal_checkpointer.start()
+
+    burst_over = threading.Event()
+    lock = threading.Lock()
+    stats = {"reads": 0, "read_errors": 0, "writes": 0, "write_errors": 0}
+    read_latencies = []
+
+    def reader():
+        rng = random.Random()
+        local, errors = [], 0
+        while not burst_over.is_set():
+            started = time.perf_counter()
+            db = ReadSessionLocal()
+            try:
+                db.execute(select(Student).where(Student.id == rng.randint(1, args.students))).first()
+                local.append(time.perf_counter() - started)
+            except OperationalError:
+                errors += 1
+            finally:
+                db.close()
+        with lock:
+            stats["reads"] += len(local)
+            stats["read_errors"] += errors
+            read_latencies.extend(local)
+
+    def writer():
+        rng = random.Random()
+        done, errors = 0, 0
+        for _ in range(args.writes):
+            db = SessionLocal()
+            try:
+                db.execute(update(Student).where(Student.id == rng.randint(1, args.students))
+                           .values(age=rng.randint(18, 40)))
+                db.commit()
+                done += 1
+            except OperationalError:
+                db.rollback()
+                errors += 1
+            finally:
+                db.close()
+        with lock:
+            stats["writes"] += done
+            stats["write_errors"] += errors
+
+    readers = [threading.Thread(target=reader) for _ in range(args.readers)]
+    writers = [threading.Thread(target=writer) for _ in range(args.writers)]
+    for t in readers:
+        t.start()
+    started = time.perf_counter()
+    for t in writers:
+        t.start()
+    for t in writers:
+        t.join()
+    elapsed = time.perf_counter() - started
+    burst_over.set()
+    for t in readers:
+        t.join()
+    wal_checkpointer.stop()
+
+    read_latencies.sort()
+    p99 = read_latencies[int(0.99 * (len(read_latencies) - 1))] * 1000 if read_latencies else float("nan")
+    print(json.dumps({**stats, "seconds": elapsed, "read_p99_ms": p99}))
+
+
+def spawn(mode, args):
+    env = dict(os.environ)
+    env.update({
+        "SQLALCHEMY_DATABASE_URL": f"sqlite:///{tempfile.mkdtemp()}/concurrency.db",
+        "MONGO_URI": "",
+        "SQLITE_PROFILE": "true" if mode == "profile" else "false",
+        "SQLITE_CHECKPOINT_INTERVAL": "1",
+        "SECRET_KEY": env.get("SECRET_KEY", "benchmark"),
+        "PYTHONWARNINGS": "ignore",
+    })
+    cmd = [sys.executable, __file__, "--run", mode, "--students", str(args.students),
+           "--readers", str(args.readers), "--writers", str(args.writers), "--writes", str(args.writes)]
+    out = subprocess.run(cmd, env=env, cwd=ROOT, capture_output=True, text=True, check=True).stdout
+    return json.loads(out.strip().splitlines()[-1])
+
+
+def main():
+    args = parse_args()
+    if args.run:
+        return run_one(args)
+
+    print(f"{args.readers} readers during {args.writers} writers × {args.writes} update transactions "
+          f"on {args.students} students\n")
+    print(f"{'mode':<8} {'burst s':>8} {'reads/s':>9} {'read p99 ms':>12} {'writes/s':>9} "
+          f"{'read errs':>10} {'write errs':>11}")
+    for mode in ("default", "profile"):
+        r = spawn(mode, args)
+        print(f"{mode:<8} {r['seconds']:>8.2f} {r['reads'] / r['seconds']:>9.0f} {r['read_p99_ms']:>12.2f} "
+              f"{r['writes'] / r['seconds']:>9.0f} {r['read_errors']:>10} {r['write_errors']:>11}")
+
+
+if __name__ == "__main__":
+    main()
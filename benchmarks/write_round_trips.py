@@ -0,0 +1,124 @@
+"""
+Count the SQL statements each write endpoint issues.
+
+    python benchmarks/write_round_trips.py
+    python benchmarks/write_round_trips.py --sql-url postgresql://…/scratch
+
+Runs every POST / PUT / DELETE once against a throwaway SQLite database
+(or --sql-url, whose tables are recreated) through the real app and
+counts the statements per request (the same count the X-Query-Count header
+reports). The sync_outbox INSERT is reported on its own: all outbox rows of
+a request go out in a single statement.
+Exits non-zero when an endpoint goes over its budget.
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+# Entity statements allowed per request; the outbox INSERT may add one more.
+BUDGET = 2
+# Cascading deletes issue one DELETE per table they empty.
+CASCADE_BUDGET = {
+    "DELETE /students/{id}": 3,    # enrollments, users.student_id unlink, student
+    "DELETE /lecturers/{id}": 3,   # enrollments, courses, lecturer
+}
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sql-url", default=None)
+    return parser.parse_args()
+
+
+def configure(args):
+    sql_url = args.sql_url or f"sqlite:///{tempfile.mkdtemp()}/round_trips.db"
+    os.environ["SQLALCHEMY_DATABASE_URL"] = sql_url
+    # Outbox rows are staged (and counted) but nothing drains them.
+    os.environ["MONGO_URI"] = "mongodb://outbox-only.invalid"
+    os.environ["QUERY_COUNT_HEADER"] = "true"
+    os.environ.setdefault("SECRET_KEY", "benchmark")
+    return sql_url
+
+
+def main():
+    args = parse_args()
+    sql_url = configure(args)
+
+    from fastapi.testclient import TestClient
+    from sqlalchemy import event, text
+
+    from app.core.security import create_access_token
+    from app.db.async_db import async_engine
+    from app.db.migrations import migrate
+    from app.db.sql_db import Base, engine
+    from app.main import app
+
+    Base.metadata.drop_all(bind=engine)
+    migrate(engine)
+
+    # The app runs in TestClient's own thread, so record statements engine-wide
+    # (requests are sequential here) and cross-check with X-Query-Count.
+    statements = []
+    for target in (engine, async_engine.sync_engine):   # CRUD routes run on the async engine
+        event.listen(target, "before_cursor_execute",
+                     lambda *a: a[2].startswith("BEGIN") or statements.append(a[2]))
+
+    client = TestClient(app)   # no `with`: startup hooks (Mongo, dispatcher) stay off
+    admin = {"Authorization": "Bearer " + create_access_token({"sub": "bench-admin", "role": "admin"})}
+
+    calls = [
+        ("POST /lecturers/", "post", "/lecturers/", {"name": "L", "department": "D", "email": "l@bench.org"}),
+        ("PUT /lecturers/{id}", "put", "/lecturers/1", {"name": "L2"}),
+        ("POST /courses/", "post", "/courses/", {"title": "C", "code": "C1", "semester": "S1", "lecturer_id": 1}),
+        ("PUT /courses/{id}", "put", "/courses/1", {"title": "C one"}),
+        ("POST /students/", "post", "/students/", {"name": "S", "email": "s@bench.org"}),
+        ("PUT /students/{id}", "put", "/students/1", {"name": "S one"}),
+        ("link username (setup)", None, None, None),
+        ("POST /auth/register", "post", "/auth/register", {"username": "s1", "password": "pw-123456"}),
+        ("POST /auth/admin/register", "post", "/auth/admin/register",
+         {"username": "lect", "password": "pw-123456", "role": "lecturer"}),
+        ("POST /enrollments/", "post", "/enrollments/", {"student_id": 1, "course_id": 1, "grade": 3.0}),
+        ("PUT /enrollments/{id}", "put", "/enrollments/1", {"grade": 4.0}),
+        ("POST /enrollments/ (duplicate → 400)", "post", "/enrollments/", {"student_id": 1, "course_id": 1}),
+        ("DELETE /enrollments/{id}", "delete", "/enrollments/1", None),
+        ("POST /enrollments/", "post", "/enrollments/", {"student_id": 1, "course_id": 1, "grade": 2.0}),
+        ("DELETE /students/{id}", "delete", "/students/1", None),
+        ("DELETE /courses/{id}", "delete", "/courses/1", None),
+        ("POST /courses/", "post", "/courses/", {"title": "C", "code": "C2", "semester": "S1", "lecturer_id": 1}),
+        ("DELETE /lecturers/{id}", "delete", "/lecturers/1", None),
+    ]
+
+    print(f"SQL: {sql_url}\n")
+    print(f"{'endpoint':<40} {'status':>6} {'entity':>7} {'outbox':>7} {'budget':>7}")
+    over = []
+    for label, method, path, body in calls:
+        if method is None:
+            # Students get their username out of band (registration matches on it).
+            with engine.begin() as conn:
+                conn.execute(text("UPDATE students SET username = 's1' WHERE id = 1"))
+            continue
+        statements.clear()
+        response = client.request(method.upper(), path, json=body, headers=admin)
+        assert response.headers["X-Query-Count"] == str(len(statements)), label
+        outbox = sum("sync_outbox" in s for s in statements)
+        entity = len(statements) - outbox
+        budget = CASCADE_BUDGET.get(label, BUDGET)
+        flag = "" if entity <= budget and outbox <= 1 else "  ✗ over budget"
+        print(f"{label:<40} {response.status_code:>6} {entity:>7} {outbox:>7} {budget:>7}{flag}")
+        if flag:
+            over.append(label)
+            for statement in statements:
+                print("    " + " ".join(statement.split())[:160])
+
+    if over:
+        raise SystemExit(f"\n{len(over)} endpoint(s) over budget")
+    print("\nAll write endpoints within budget.")
+
+
+if __name__ == "__main__":
+    main()
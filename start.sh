@@ -1,4 +1,5 @@
 #!/usr/bin/env bash
 # start.sh
 pip install -r requirements.txt
+python -m app.db.migrations
 uvicorn app.main:app --host 0.0.0.0 --port 10000